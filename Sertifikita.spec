@@ -6,6 +6,20 @@ ROOT_DIR = Path.cwd()          # build_py.sh memastikan CWD = root proyek
 APP_DIR  = ROOT_DIR / "app"
 MAIN_PY  = APP_DIR / "main.py"
 
+# Pillow: hanya plugin format yang dipakai (template & output PNG / JPEG / WEBP).
+# Hook PIL bawaan PyInstaller ikut membawa semua *ImagePlugin → sisanya di-exclude;
+# Pillow melewati plugin yang tidak ada (ImportError ditangkap di Image.preinit/init).
+# MpoImagePlugin wajib: banyak JPEG kamera / HP dikenali Pillow sebagai MPO.
+# TiffImagePlugin wajib: Image.Exif.load meng-import-nya (JPEG ber-EXIF tanpa density JFIF),
+# MpoImagePlugin juga meng-import-nya di level modul. Dicek oleh scripts/check_bundle.py.
+PIL_PLUGINS = ["PIL.PngImagePlugin", "PIL.JpegImagePlugin", "PIL.MpoImagePlugin", "PIL.WebPImagePlugin",
+               "PIL.TiffImagePlugin"]
+PIL_UNUSED = [m for m in collect_submodules("PIL", filter=lambda n: n.endswith("ImagePlugin"))
+              if m not in PIL_PLUGINS]
+
+# modul yang tidak dipakai GUI: toolkit lain, viewer Pillow, engine numpy (hanya CLI --engine numpy)
+EXCLUDES = ["tkinter", "PIL.ImageTk", "PIL.ImageQt", "PIL.ImageShow", "numpy", *PIL_UNUSED]
+
 datas = [
     (str(APP_DIR / "resources" / "templates"), "resources/templates"),
     (str(APP_DIR / "resources" / "fonts"),     "resources/fonts"),
@@ -18,10 +32,11 @@ a = Analysis(
     pathex=[str(APP_DIR)],
     binaries=[],
     datas=datas,
-    hiddenimports=collect_submodules("PIL"),
+    # renderer/batch di-import lazy di main.py (tetap terdeteksi analisis); plugin Pillow dimuat lewat __import__
+    hiddenimports=PIL_PLUGINS,
     hookspath=[],
     runtime_hooks=[],
-    excludes=[],
+    excludes=EXCLUDES,
     noarchive=False
 )
 
@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from formats import COMBINED_PDF, default_workers  # di-export ulang (cli / kode lama import dari batch)
+from manifest import Manifest, config_hash
+from renderer import (
+    STAGES, CombinedPdf, FieldsLike, RenderPlan, StageTimer, check_engine, compile_plan, draw_certificate,
+    output_extension, render_bytes, warm_caches,
+)
+
+# satu job = (nomor baris 1-based, data baris, path output)
+Job = Tuple[int, Dict[str, str], str]
+
+log = logging.getLogger(__name__)
+
+
+# ========= Result =========
+@dataclass
+class RowResult:
+    index: int
+    out_path: str
+    error: str = ""
+    stages: Optional[Dict[str, float]] = None  # detik per tahap (lihat renderer.STAGES)
+    skipped: bool = False  # tidak berubah sejak run sebelumnya (manifest) → tidak di-render
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+@dataclass
+class BatchResult:
+    results: List[RowResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    cancelled: bool = False
+    finalize: float = 0.0  # kerja di luar baris (mis. encode + tulis PDF gabungan), detik
+
+    @property
+    def done(self) -> int:
+        return sum(1 for r in self.results if r.ok and not r.skipped)
+
+    @property
+    def skipped(self) -> int:
+        return sum(1 for r in self.results if r.skipped)
+
+    @property
+    def failed(self) -> List[RowResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def rows_per_sec(self) -> float:
+        rendered = len(self.results) - self.skipped
+        return rendered / self.elapsed if self.elapsed > 0 else 0.0
+
+
+# ========= Worker =========
+# State per proses worker: diisi sekali oleh _worker_init, bukan per baris
+_W: Dict[str, Any] = {}
+
+def _warm(template_path: str, plan: RenderPlan, fmt: str, engine: str):
+    try:
+        warm_caches(template_path, plan, fmt, engine)
+    except Exception as e:
+        # best-effort: error di initializer mematikan semua worker (BrokenProcessPool);
+        # biarkan baris pertama yang melaporkan error aslinya lewat RowResult.error
+        log.warning("warm-up cache gagal: %s", e)
+
+def _new_pipeline(template_path: str, plan: RenderPlan, fmt: str, quality: Optional[int], timing: bool,
+                  to_bytes: bool, engine: str):
+    from pipeline import RenderPipeline
+    return RenderPipeline(template_path, plan, fmt, quality, keep_bytes=to_bytes, timing=timing, engine=engine)
+
+def _worker_init(template_path: str, plan: RenderPlan, fmt: str, quality: Optional[int] = None, timing: bool = True,
+                 to_bytes: bool = False, pipeline: bool = False, engine: str = "pil", tasks=None, results=None,
+                 stop=None):
+    # tasks / results / stop: antrian bersama + tanda batal mode pipeline (lihat _pipeline_worker)
+    _W.update(template_path=template_path, plan=plan, fmt=fmt, quality=quality, timing=timing, to_bytes=to_bytes,
+              engine=engine, pipe=None, tasks=tasks, results=results, stop=stop)
+    if pipeline:
+        _W["pipe"] = _new_pipeline(template_path, plan, fmt, quality, timing, to_bytes, engine)
+    _warm(template_path, plan, fmt, engine)
+
+def _pipeline_worker() -> None:
+    """
+    Satu task per worker selama batch (mode pipeline): chunk diambil dari antrian bersama dan
+    mengalir ke satu RenderPipeline.run, jadi thread encode / write tetap hidup dan antriannya
+    tetap terisi di batas chunk. Hasil dikirim per baris; None = worker ini selesai.
+    Setelah stop di-set (batal), chunk yang baru diambil dilewati: chunk diambil FIFO, jadi
+    baris yang di-render tetap awalan urutan jobs (tanpa lubang).
+    """
+    tasks, results, stop = _W["tasks"], _W["results"], _W["stop"]
+
+    def _jobs():
+        while True:
+            chunk = tasks.get()
+            if chunk is None:
+                return
+            if not stop.is_set():
+                yield from chunk
+
+    try:
+        _W["pipe"].run(_jobs(), on_result=results.put)
+    finally:
+        results.put(None)
+
+def _render_chunk(jobs: List[Job]) -> List[Tuple[RowResult, Optional[bytes]]]:
+    # to_bytes: hasil dikirim balik ke proses utama (untuk sink), bukan ditulis di worker
+    out = []
+    for idx, row, path in jobs:
+        timer = StageTimer() if _W["timing"] else None
+        data = None
+        try:
+            if _W["to_bytes"]:
+                data = render_bytes(_W["template_path"], _W["plan"], row, fmt=_W["fmt"], quality=_W["quality"], timer=timer,
+                                    engine=_W["engine"])
+            else:
+                draw_certificate(_W["template_path"], _W["plan"], row, path, fmt=_W["fmt"], quality=_W["quality"], timer=timer,
+                                 engine=_W["engine"])
+            err = ""
+        except Exception as e:
+            err = str(e) or e.__class__.__name__
+        out.append((RowResult(idx, path, err, timer.totals if timer else None), data))
+    return out
+
+def _chunks(jobs: Iterable[Tuple[Dict[str, str], str]], size: int) -> Iterable[List[Job]]:
+    buf: List[Job] = []
+    for idx, (row, path) in enumerate(jobs, start=1):
+        buf.append((idx, row, path))
+        if len(buf) >= size:
+            yield buf; buf = []
+    if buf:
+        yield buf
+
+
+# ========= Public API =========
+def run_batch(
+    template_path: str,
+    fields: FieldsLike,
+    jobs: Iterable[Tuple[Dict[str, str], str]],
+    fmt: str = "png",
+    quality: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+    progress: Optional[Callable[[RowResult], None]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    timing: bool = True,
+    manifest: Optional[str] = None,
+    sink: Optional[Any] = None,
+    pipeline: bool = False,
+    engine: str = "pil",
+) -> BatchResult:
+    """
+    Render banyak baris sekaligus memakai process pool.
+    - fields: RenderPlan atau list dict field (dikompilasi sekali di sini)
+    - jobs: iterable (row, out_path); dibaca bertahap, tidak dimuat semua ke memori
+    - fmt / quality: 'pdf' atau profil encoder raster (lihat renderer.ENCODER_PROFILES)
+    - workers: jumlah proses (None = jumlah core; 1 = jalan di proses ini)
+    - progress: dipanggil per baris, urut sesuai urutan jobs
+    - cancel: dicek antar chunk; bila True, sisa job dibatalkan (cancelled=True)
+    - timing: catat durasi per tahap tiap baris di RowResult.stages (lihat timing_report)
+    - manifest: path manifest (lihat manifest.py); baris yang tidak berubah & file-nya ada
+      di-skip (RowResult.skipped), manifest ditulis ulang di akhir (juga saat dibatalkan)
+    - sink: tujuan bytes hasil render (lihat sinks.py, mis. ZipSink); out_path dipakai sebagai
+      nama entry. Worker hanya render + encode, penulisan di proses ini. Manifest diabaikan.
+      sink tidak ditutup di sini (pemanggil yang close())
+    - pipeline: di tiap worker, render / encode / write jadi tahap terpisah yang berjalan
+      bersamaan (lihat pipeline.py) → CPU tetap sibuk selagi disk / network share lambat
+    - engine: engine raster "pil" / "numpy" (lihat renderer.ENGINES); hasil pixel identik
+    Error per baris dikumpulkan di BatchResult, tidak menghentikan batch.
+    """
+    workers = max(1, int(workers or default_workers()))
+    engine = check_engine(engine)
+    chunksize = max(1, int(chunksize))
+    plan = compile_plan(fields)
+    result = BatchResult()
+    t0 = time.perf_counter()
+
+    to_bytes = sink is not None
+    ext = output_extension(fmt)
+    man = Manifest.load(manifest, config_hash(template_path, plan, fmt, quality)) if manifest and not to_bytes else None
+
+    def _split(chunk: List[Job]) -> Tuple[List[Job], List[RowResult]]:
+        if man is None: return chunk, []
+        todo, same = man.split(chunk)
+        return todo, [RowResult(idx, path, skipped=True) for idx, _, path in same]
+
+    def _collect(rendered: List[Tuple[RowResult, Optional[bytes]]], skipped: List[RowResult] = ()):
+        rows = [r for r, _ in rendered]
+        if to_bytes:
+            for r, data in rendered:
+                if data is None: continue
+                # sama dengan draw_certificate: pastikan ekstensi sesuai format
+                if not r.out_path.lower().endswith(ext): r.out_path = os.path.splitext(r.out_path)[0] + ext
+                try: sink.write(r.out_path, data)
+                except Exception as e: r.error = str(e) or e.__class__.__name__
+        if skipped:
+            rows = sorted([*rows, *skipped], key=lambda r: r.index)
+        for r in rows:
+            result.results.append(r)
+            if man is not None and r.ok and not r.skipped: man.record(r.out_path)
+            if progress: progress(r)
+
+    def _cancelled() -> bool:
+        if cancel and cancel():
+            result.cancelled = True
+        return result.cancelled
+
+    # mode pipeline: hasil datang per baris dari banyak worker → disusun ulang sesuai urutan jobs
+    ready: Dict[int, Tuple[RowResult, Optional[bytes]]] = {}
+    nxt = 1
+
+    def _ordered(pairs: Iterable[Tuple[RowResult, Optional[bytes]]], flush: bool = False):
+        nonlocal nxt
+        for r, data in pairs:
+            ready[r.index] = (r, data)
+        out = []
+        while nxt in ready or (flush and ready):
+            if nxt not in ready: nxt = min(ready)  # baris hilang (worker gagal) → jangan macet
+            out.append(ready.pop(nxt)); nxt += 1
+        if out: _collect(out)
+
+    def _pipelined_local():
+        # satu aliran job → satu RenderPipeline.run; hasil dikumpulkan di thread ini antar baris
+        pipe = _new_pipeline(template_path, plan, fmt, quality, timing, to_bytes, engine)
+        done: Deque = deque()
+        warmed = False
+
+        def _drain():
+            out = []
+            while done: out.append(done.popleft())
+            _ordered(out)
+
+        def _jobs():
+            nonlocal warmed
+            for chunk in _chunks(jobs, chunksize):
+                _drain()
+                if _cancelled(): return
+                todo, skipped = _split(chunk)
+                _ordered((r, None) for r in skipped)
+                if todo and not warmed:
+                    _warm(template_path, plan, fmt, engine); warmed = True
+                yield from todo
+
+        pipe.run(_jobs(), on_result=done.append)
+        _drain(); _ordered((), flush=True)
+
+    def _pipelined_pool():
+        ctx = multiprocessing.get_context()
+        tasks, results, stop = ctx.Queue(maxsize=workers * 2), ctx.Queue(), ctx.Event()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_worker_init,
+                                 initargs=(template_path, plan, fmt, quality, timing, to_bytes, True, engine,
+                                           tasks, results, stop)) as pool:
+            futs = [pool.submit(_pipeline_worker) for _ in range(workers)]
+            running = workers
+
+            def _pump(wait: bool):
+                nonlocal running
+                out = []
+                while running:
+                    try:
+                        item = results.get(timeout=0.05) if wait and not out else results.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None: running -= 1
+                    else: out.append(item)
+                _ordered(out)
+                for f in futs:  # proses worker mati → jangan menunggu hasil selamanya
+                    if f.done() and f.exception() is not None: raise f.exception()
+
+            def _put(item):
+                while True:
+                    _pump(False)
+                    try:
+                        tasks.put(item, timeout=0.05); return
+                    except queue.Full:
+                        pass
+
+            def _drop_tasks():
+                # chunk yang belum diambil worker dilewati; yang sedang jalan diselesaikan.
+                # get_nowait saja tidak cukup: chunk yang masih di feeder thread Queue lolos
+                stop.set()
+                try:
+                    while True: tasks.get_nowait()
+                except queue.Empty:
+                    pass
+
+            try:
+                for chunk in _chunks(jobs, chunksize):
+                    if _cancelled(): break
+                    todo, skipped = _split(chunk)
+                    _ordered((r, None) for r in skipped)
+                    if todo: _put(todo)
+                if result.cancelled: _drop_tasks()
+                for _ in range(workers): _put(None)
+                while running:
+                    _pump(True)
+            except BaseException:
+                # error di sini / worker mati: hentikan worker lain, buang hasilnya supaya proses
+                # worker tidak tertahan pipe antrian yang penuh saat pool ditutup
+                _drop_tasks()
+                for _ in range(workers):
+                    try: tasks.put_nowait(None)
+                    except queue.Full: break
+                while not all(f.done() for f in futs):
+                    try: results.get(timeout=0.05)
+                    except queue.Empty: pass
+                raise
+            _ordered((), flush=True)
+
+    try:
+        if pipeline and workers == 1:
+            _pipelined_local()
+        elif pipeline:
+            _pipelined_pool()
+        elif workers == 1:
+            warmed = False
+            for chunk in _chunks(jobs, chunksize):
+                if _cancelled(): break
+                todo, skipped = _split(chunk)
+                if todo and not warmed:
+                    _worker_init(template_path, plan, fmt, quality, timing, to_bytes, pipeline, engine); warmed = True
+                _collect(_render_chunk(todo) if todo else [], skipped)
+        else:
+            # jendela submit terbatas → urutan hasil terjaga & memori tidak membengkak
+            max_inflight = workers * 4
+            with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init,
+                                     initargs=(template_path, plan, fmt, quality, timing, to_bytes, pipeline, engine)) as pool:
+                pending: Deque = deque()
+                for chunk in _chunks(jobs, chunksize):
+                    if _cancelled(): break
+                    todo, skipped = _split(chunk)
+                    pending.append((pool.submit(_render_chunk, todo) if todo else None, skipped))
+                    if len(pending) >= max_inflight:
+                        fut, skipped = pending.popleft()
+                        _collect(fut.result() if fut else [], skipped)
+                while pending:
+                    fut, skipped = pending.popleft()
+                    if _cancelled():
+                        # chunk yang sudah jalan tetap diselesaikan, sisanya dibuang
+                        if fut is None or fut.cancel(): continue
+                    _collect(fut.result() if fut else [], skipped)
+    finally:
+        if man is not None:
+            try: man.save()
+            except OSError: pass  # manifest hanya optimasi run berikutnya
+
+    result.elapsed = time.perf_counter() - t0
+    return result
+
+
+def run_combined_pdf(
+    template_path: str,
+    fields: FieldsLike,
+    rows: Iterable[Dict[str, str]],
+    out_path: str,
+    progress: Optional[Callable[[RowResult], None]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    timing: bool = True,
+) -> BatchResult:
+    """
+    Semua baris → satu PDF (satu halaman per baris, background disimpan sekali).
+    Berjalan di proses ini karena semua halaman ditulis ke satu canvas.
+    """
+    result = BatchResult()
+    t0 = time.perf_counter()
+    doc = CombinedPdf(template_path, fields, out_path)
+    try:
+        for idx, row in enumerate(rows, start=1):
+            if cancel and cancel():
+                result.cancelled = True; break
+            timer = StageTimer() if timing else None
+            try:
+                doc.add_page(row, timer); err = ""
+            except Exception as e:
+                err = str(e) or e.__class__.__name__
+            r = RowResult(idx, out_path, err, timer.totals if timer else None)
+            result.results.append(r)
+            if progress: progress(r)
+    finally:
+        t_close = time.perf_counter()
+        doc.close()
+        result.finalize = time.perf_counter() - t_close
+    result.elapsed = time.perf_counter() - t0
+    return result
+
+
+# ========= Timing report =========
+TIMING_REPORT = "sertifikita_timing.json"
+
+def percentile(sorted_vals: List[float], p: float) -> float:
+    # nearest-rank: nilai ke-ceil(p/100 * n) (1-based); dipakai juga oleh scripts/bench_render.py
+    if not sorted_vals: return 0.0
+    k = min(len(sorted_vals) - 1, max(0, math.ceil(p / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+def timing_report(result: BatchResult, **meta: Any) -> Dict[str, Any]:
+    """
+    Ringkasan durasi per tahap dari RowResult.stages (baris tanpa data timing dilewati).
+    Dengan banyak worker, total per tahap adalah jumlah waktu semua proses (bisa > elapsed).
+    """
+    rows = [r for r in result.results if r.stages]
+    per_stage = {s: sorted(r.stages.get(s, 0.0) for r in rows) for s in STAGES}
+    busy = sum(sum(v) for v in per_stage.values())
+    stages = {}
+    for s, vals in per_stage.items():
+        tot = sum(vals)
+        if not tot: continue
+        stages[s] = {
+            "total_sec": round(tot, 4), "share": round(tot / busy, 4) if busy else 0.0,
+            "mean_ms": round(tot / len(vals) * 1000, 3), "p50_ms": round(percentile(vals, 50) * 1000, 3),
+            "p95_ms": round(percentile(vals, 95) * 1000, 3), "max_ms": round(vals[-1] * 1000, 3),
+        }
+    slowest = sorted(rows, key=lambda r: sum(r.stages.values()), reverse=True)[:10]
+    return {
+        **meta,
+        "rows": len(result.results), "failed": len(result.failed), "cancelled": result.cancelled,
+        "elapsed_sec": round(result.elapsed, 4), "rows_per_sec": round(result.rows_per_sec, 2),
+        "busy_sec": round(busy, 4), "finalize_sec": round(result.finalize, 4), "stages": stages,
+        "slowest_rows": [{"index": r.index, "out_path": r.out_path, "total_ms": round(sum(r.stages.values()) * 1000, 3),
+                          "stages_ms": {k: round(v * 1000, 3) for k, v in r.stages.items() if v}} for r in slowest],
+    }
+
+def write_timing_report(result: BatchResult, path: str, **meta: Any) -> str:
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(timing_report(result, **meta), fp, indent=2, ensure_ascii=False)
+    return path
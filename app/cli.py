@@ -0,0 +1,162 @@
+"""
+Sertifikita headless — batch generate tanpa GUI (tidak meng-import Qt).
+
+Contoh:
+    python app/cli.py --template bg.jpg --fields fields.json --csv data.csv \
+        --pattern "{index:03}_{Name}" --out hasil/ --format pdf --workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Any
+
+from PIL import Image
+
+from batch import run_batch, run_combined_pdf, default_workers, write_timing_report, COMBINED_PDF, TIMING_REPORT
+from dataset import Dataset, load_csv
+from manifest import MANIFEST_NAME
+from naming import OutputPlanner
+from renderer import ENCODER_PROFILES, ENGINES, numpy_available, output_extension
+from sinks import ZipSink
+
+
+def load_fields(path: str) -> List[Dict[str, Any]]:
+    # format sama dengan hasil "Save Fields JSON" (list of TextField)
+    with open(path, "r", encoding="utf-8") as fp:
+        data = json.load(fp)
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: fields JSON harus berupa list")
+    return data
+
+def load_rows(path: str, names: List[str]) -> Dataset:
+    # sama seperti import CSV di GUI: hanya kolom yang dipakai field; CSV besar → SQLite (di-stream)
+    return load_csv(path, names)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="sertifikita-cli", description="Generate sertifikat secara headless.")
+    p.add_argument("--template", required=True, help="gambar template (PNG/JPG/WEBP)")
+    p.add_argument("--fields", required=True, help="fields.json dari Save Fields JSON")
+    p.add_argument("--csv", required=True, help="data penerima (CSV dengan header)")
+    p.add_argument("--out", required=True, help="folder output, atau file .zip (semua file langsung masuk ZIP); "
+                                                   "untuk pdf-combined: file .pdf atau folder")
+    p.add_argument("--pattern", default="{index}_{Text-1}", help="pattern nama file, mis. {index:03}_{Name}")
+    p.add_argument("--name-field", default="", help="kolom fallback bila pattern kosong (default: field pertama)")
+    p.add_argument("--shard", default="", help="subfolder output: hash / hash:N (N digit hex) / field:Kolom (default: satu folder)")
+    p.add_argument("--format", default="png", choices=[*ENCODER_PROFILES, "pdf", COMBINED_PDF],
+                   help="png / png-fast / png-small / jpeg / webp / pdf / pdf-combined")
+    p.add_argument("--quality", type=int, default=None, help="quality 1-100 untuk jpeg/webp")
+    p.add_argument("--workers", type=int, default=default_workers())
+    p.add_argument("--engine", default="pil", choices=ENGINES,
+                   help="engine raster: pil (default) / numpy (lebih cepat untuk template besar, butuh numpy)")
+    p.add_argument("--force", action="store_true", help=f"render ulang semua baris (abaikan {MANIFEST_NAME})")
+    p.add_argument("--pipeline", action="store_true",
+                   help="render / encode / tulis file berjalan bersamaan di tiap worker (output di disk lambat / network share)")
+    p.add_argument("--timing-report", default="", help=f"path JSON durasi per tahap (default: <out>/{TIMING_REPORT})")
+    p.add_argument("--no-timing", action="store_true", help="matikan pencatatan durasi per tahap")
+    p.add_argument("-q", "--quiet", action="store_true", help="tanpa progress per baris")
+    return p
+
+
+def _check_inputs(p: argparse.ArgumentParser, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    # salah ketik path → pesan satu baris + exit 2 (p.error), bukan traceback dari hash / decode
+    for opt, path in (("--template", args.template), ("--fields", args.fields), ("--csv", args.csv)):
+        if not os.path.isfile(path):
+            p.error(f"{opt}: file tidak ditemukan: {path}")
+        if not os.access(path, os.R_OK):
+            p.error(f"{opt}: file tidak bisa dibaca: {path}")
+    try:
+        with Image.open(args.template):
+            pass  # hanya header, decode penuh tetap di worker
+    except OSError as e:
+        p.error(f"--template: bukan gambar yang bisa dibuka: {args.template} ({e})")
+    try:
+        return load_fields(args.fields)
+    except json.JSONDecodeError as e:
+        p.error(f"--fields: bukan JSON valid: {args.fields} ({e})")
+    except (OSError, ValueError) as e:
+        p.error(f"--fields: {e}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = build_parser()
+    args = p.parse_args(argv)
+    if args.engine == "numpy" and not numpy_available():
+        print("--engine numpy butuh paket numpy (pip install numpy)", file=sys.stderr)
+        return 1
+    fields = _check_inputs(p, args)
+    names = [str(f.get("name", "")) for f in fields]
+    rows = load_rows(args.csv, names)
+    try:
+        if not rows:
+            print("CSV kosong, tidak ada yang di-generate.", file=sys.stderr)
+            return 1
+        return _generate(args, fields, names, rows)
+    finally:
+        rows.close()
+
+
+def _generate(args: argparse.Namespace, fields: List[Dict[str, Any]], names: List[str], rows: Dataset) -> int:
+    fmt = args.format
+    total = len(rows)
+    def _progress(r):
+        if args.quiet: return
+        if not r.ok or r.index == total or r.index % 100 == 0:
+            print(f"[{r.index}/{total}] {r.out_path if r.ok else 'ERROR: ' + r.error}", file=sys.stderr)
+
+    if fmt == COMBINED_PDF:
+        out = args.out if args.out.lower().endswith(".pdf") else os.path.join(args.out, "certificates.pdf")
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        res = run_combined_pdf(args.template, fields, rows.iter_rows(), out, progress=_progress, timing=not args.no_timing)
+        out_dir = os.path.dirname(os.path.abspath(out))
+    else:
+        to_zip = args.out.lower().endswith(".zip")
+        out_dir = os.path.dirname(os.path.abspath(args.out)) if to_zip else args.out
+        os.makedirs(out_dir, exist_ok=True)
+        fallback_field = args.name_field or (names[0] if names else "output")
+        try:
+            planner = OutputPlanner(args.pattern, fallback_field, output_extension(fmt), shard=args.shard)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        paths = planner.plan(rows.iter_rows())
+        if planner.renamed:
+            print(f"{planner.renamed} nama file duplikat → diberi akhiran -2, -3, ...", file=sys.stderr)
+        # ZIP: path = nama entry di dalam arsip
+        if not to_zip:
+            OutputPlanner.make_dirs(args.out, paths)
+        # baris dibaca per halaman selagi batch berjalan, tidak dimuat semua ke memori
+        jobs = ((row, rel if to_zip else os.path.join(args.out, rel)) for row, rel in zip(rows.iter_rows(), paths))
+        kw = dict(fmt=fmt, quality=args.quality, workers=args.workers, progress=_progress,
+                  timing=not args.no_timing, pipeline=args.pipeline, engine=args.engine)
+        if to_zip:
+            with ZipSink(args.out) as sink:
+                res = run_batch(args.template, fields, jobs, sink=sink, **kw)
+                t_close = time.perf_counter()
+            # sisa antrian ZIP + central directory
+            res.finalize = time.perf_counter() - t_close
+            res.elapsed += res.finalize
+        else:
+            res = run_batch(args.template, fields, jobs, **kw,
+                            manifest=None if args.force else os.path.join(args.out, MANIFEST_NAME))
+    for r in res.failed:
+        print(f"Row {r.index}: {r.error}", file=sys.stderr)
+    print(f"Generated {res.done}/{total} file(s) ke {args.out} "
+          f"dalam {res.elapsed:.2f}s ({res.rows_per_sec:.1f} rows/sec)"
+          + (f", {res.skipped} tidak berubah (di-skip)" if res.skipped else ""))
+    if not args.no_timing:
+        report = args.timing_report or os.path.join(out_dir, TIMING_REPORT)
+        try:
+            write_timing_report(res, report, format=fmt, workers=args.workers, template=args.template)
+            if not args.quiet: print(f"Timing report: {report}")
+        except OSError as e:
+            print(f"Gagal menulis timing report: {e}", file=sys.stderr)
+    return 0 if not res.failed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
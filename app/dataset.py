@@ -0,0 +1,562 @@
+"""
+Data penerima (baris × kolom) di balik satu interface, tanpa Qt.
+
+- ColumnarDataset: di memori, satu array per kolom + nilai di-intern (data kecil / input manual)
+- SqliteDataset: file SQLite lokal; tabel & renderer membaca per halaman, jadi memori
+  tetap datar walau jutaan baris. Hanya kolom yang dipakai field yang di-import.
+- load_csv(): pilih backend otomatis berdasarkan ukuran file
+"""
+from __future__ import annotations
+
+import csv
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Row = Dict[str, str]
+
+PAGE_SIZE = 256                          # baris per halaman cache tabel
+SQLITE_THRESHOLD = 8 * 1024 * 1024       # CSV ≥ ini → SqliteDataset
+_IMPORT_BATCH = 5000
+_GAP = 1 << 20                           # celah ord antar baris (SqliteDataset)
+_MIN_STEP = 1 << 10                      # celah minimum setelah _respace
+
+
+class Dataset(ABC):
+    """
+    Interface tabel data. Posisi baris 0-based, nilai selalu str ("" bila kosong).
+    - len(ds), ds[i] (dict satu baris), iter(ds) / iter_rows() (dibaca per halaman)
+    - edit: set_value / insert_rows / remove_rows / ensure_columns / rename_column / drop_column
+    - begin_edit / commit_edit / rollback_edit: sesi edit yang bisa dibatalkan (dialog Manage Data)
+    """
+    columns: List[str]
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+    @abstractmethod
+    def value(self, i: int, col: str) -> str: ...
+    @abstractmethod
+    def set_value(self, i: int, col: str, value: str): ...
+    @abstractmethod
+    def page(self, start: int, count: int, columns: Optional[Sequence[str]] = None) -> List[Row]: ...
+    @abstractmethod
+    def insert_rows(self, at: int, count: int): ...
+    @abstractmethod
+    def remove_rows(self, at: int, count: int): ...
+    @abstractmethod
+    def ensure_columns(self, names: Iterable[str]): ...
+    @abstractmethod
+    def drop_column(self, name: str): ...
+    @abstractmethod
+    def _rename(self, old: str, new: str): ...
+    @abstractmethod
+    def begin_edit(self): ...
+    @abstractmethod
+    def commit_edit(self): ...
+    @abstractmethod
+    def rollback_edit(self): ...
+
+    def close(self):
+        pass
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, i: int) -> Row:
+        n = len(self)
+        if i < 0: i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return self.page(i, 1)[0]
+
+    def __iter__(self) -> Iterator[Row]:
+        return self.iter_rows()
+
+    def iter_rows(self, columns: Optional[Sequence[str]] = None, page_size: int = 2000) -> Iterator[Row]:
+        n = len(self)
+        for start in range(0, n, page_size):
+            yield from self.page(start, min(page_size, n - start), columns)
+
+    def rename_column(self, old: str, new: str):
+        # sama dengan perilaku lama: bila kolom baru sudah ada, kolom lama dibuang
+        if old == new or old not in self.columns: return
+        if new in self.columns: self.drop_column(old)
+        else: self._rename(old, new)
+
+    def write_csv(self, path: str, columns: Optional[Sequence[str]] = None):
+        cols = list(columns or self.columns)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=cols, extrasaction="ignore"); w.writeheader()
+            for row in self.iter_rows(cols):
+                w.writerow(row)
+
+
+# ========= Kolom (memori) =========
+class _Column:
+    """Satu kolom, dictionary-encoded: codes[i] → values[code]; nilai berulang disimpan sekali."""
+    __slots__ = ("codes", "values", "index")
+
+    def __init__(self, codes: Optional[array] = None, values: Optional[List[str]] = None,
+                 index: Optional[Dict[str, int]] = None):
+        self.codes = codes              # None = semua baris "" (kolom baru, belum pernah diisi)
+        self.values = values if values is not None else [""]
+        self.index = index if index is not None else {"": 0}
+
+    def code(self, value: str) -> int:
+        c = self.index.get(value)
+        if c is None:
+            c = self.index[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+
+def _zeros(n: int) -> array:
+    return array("I", bytes(4 * n))
+
+
+class RowView(Mapping):
+    """
+    Satu baris ColumnarDataset tanpa salinan (hasil ds[i] / iter_rows()).
+    - baca saja, nilai dibaca saat diakses; dict(view) untuk salinan tetap
+    - di-pickle sebagai dict biasa (dikirim ke worker process)
+    """
+    __slots__ = ("_ds", "_i", "_names")
+
+    def __init__(self, ds: "ColumnarDataset", i: int, names: Tuple[str, ...]):
+        self._ds, self._i, self._names = ds, i, names
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self._names:
+            raise KeyError(key)
+        return self._ds.value(self._i, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def __repr__(self) -> str:
+        return f"RowView({dict(self)!r})"
+
+
+class ColumnarDataset(Dataset):
+    """
+    Data di memori, satu array per kolom (lihat _Column).
+    - tambah / rename / hapus kolom O(1): tidak menyentuh baris
+    - ds[i] / iter_rows() → RowView, bukan dict per baris
+    - sesi edit: snapshot array codes (memcpy); tabel nilai hanya bertambah, jadi dipakai bersama
+    """
+
+    def __init__(self, columns: Optional[Sequence[str]] = None, count: int = 0):
+        self._cols: Dict[str, _Column] = {c: _Column() for c in (columns or [])}
+        self._count = count
+        self._snapshot = None
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._cols)
+
+    @classmethod
+    def from_csv(cls, path: str, columns: Sequence[str]) -> "ColumnarDataset":
+        """CSV → kolom; hanya `columns` yang disimpan, nilai kembar di-intern per kolom."""
+        cols = list(dict.fromkeys(columns))
+        ds = cls(cols)
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rdr = csv.reader(f)
+            header = next(rdr, [])
+            pos = {h: i for i, h in enumerate(header)}  # header kembar: kolom terakhir (sama dengan DictReader)
+            width = len(header)
+            enc = [(pos[c], ds._cols[c], array("I")) for c in cols if c in pos]
+            n = 0
+            for rec in rdr:
+                if not rec: continue  # DictReader juga melewati baris kosong
+                if len(rec) < width: rec += [""] * (width - len(rec))
+                for i, col, codes in enc:
+                    codes.append(col.code(rec[i]))
+                n += 1
+        for _, col, codes in enc:
+            col.codes = codes
+        ds._count = n
+        return ds
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> RowView:
+        n = self._count
+        if i < 0: i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return RowView(self, i, tuple(self._cols))
+
+    def value(self, i: int, col: str) -> str:
+        c = self._cols.get(col)
+        if c is None or c.codes is None or not 0 <= i < self._count: return ""
+        return c.values[c.codes[i]]
+
+    def set_value(self, i: int, col: str, value: str):
+        if not 0 <= i < self._count: return
+        c = self._cols.get(col)
+        if c is None:
+            self.ensure_columns([col]); c = self._cols[col]
+        code = c.code(str(value or ""))
+        if c.codes is None:
+            if not code: return
+            c.codes = _zeros(self._count)
+        c.codes[i] = code
+
+    def page(self, start: int, count: int, columns: Optional[Sequence[str]] = None) -> List[Row]:
+        cols = list(columns or self._cols)
+        return [{k: self.value(i, k) for k in cols} for i in range(max(0, start), min(self._count, start + count))]
+
+    def iter_rows(self, columns: Optional[Sequence[str]] = None, page_size: int = 2000) -> Iterator[RowView]:
+        names = tuple(columns or self._cols)
+        for i in range(self._count):
+            yield RowView(self, i, names)
+
+    def insert_rows(self, at: int, count: int):
+        if count <= 0: return
+        at = max(0, min(at, self._count))
+        for c in self._cols.values():
+            if c.codes is not None: c.codes[at:at] = _zeros(count)
+        self._count += count
+
+    def remove_rows(self, at: int, count: int):
+        count = min(count, self._count - at)
+        if count <= 0 or at < 0: return
+        for c in self._cols.values():
+            if c.codes is not None: del c.codes[at:at + count]
+        self._count -= count
+
+    def ensure_columns(self, names: Iterable[str]):
+        for n in names:
+            if n not in self._cols: self._cols[n] = _Column()
+
+    def drop_column(self, name: str):
+        self._cols.pop(name, None)
+
+    def _rename(self, old: str, new: str):
+        self._cols = {(new if k == old else k): v for k, v in self._cols.items()}
+
+    def begin_edit(self):
+        self._snapshot = ({k: _Column(array("I", c.codes) if c.codes is not None else None, c.values, c.index)
+                           for k, c in self._cols.items()}, self._count)
+
+    def commit_edit(self):
+        self._snapshot = None
+
+    def rollback_edit(self):
+        if self._snapshot is not None:
+            self._cols, self._count = self._snapshot
+            self._snapshot = None
+
+
+# ========= SQLite (out-of-core) =========
+class SqliteDataset(Dataset):
+    """
+    Tabel rows(ord, c0, c1, ...) di file SQLite sementara.
+    - ord = kunci urutan (PRIMARY KEY) dengan celah _GAP antar baris: sisip di tengah cukup
+      mengisi celah, hapus = DELETE range; tidak ada pergeseran jutaan baris
+    - posisi → ord lewat anchor per halaman (ord baris pertama tiap halaman); anchor setelah
+      posisi yang diedit dibuang dan dihitung ulang dari anchor terdekat sebelumnya
+    - nama kolom dipetakan ke kolom fisik cN: rename O(1), tambah kolom = ALTER TABLE (O(1))
+    - cache LRU beberapa halaman untuk QTableView; dibuang saat struktur berubah
+    - iter_rows() memakai koneksi baca sendiri → aman dipanggil dari thread generate; selama
+      sesi edit lewat koneksi utama (perubahan yang belum di-commit ikut terbaca)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._temp = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="sertifikita-data-", suffix=".sqlite")
+            os.close(fd)
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")  # file sementara: durability tidak perlu
+        self._db.execute("DROP TABLE IF EXISTS rows")
+        self._db.execute("CREATE TABLE rows (ord INTEGER PRIMARY KEY)")
+        self._lock = threading.RLock()
+        self._map: "OrderedDict[str, str]" = OrderedDict()  # nama kolom → kolom fisik
+        self._next_col = 0
+        self._count = 0
+        self._anchors: Dict[int, int] = {}  # halaman → ord baris pertamanya
+        self._cache: "OrderedDict[int, List[List[str]]]" = OrderedDict()
+        self._cache_cols: Tuple[str, ...] = ()
+        self._snapshot = None
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._map)
+
+    # ---------- import ----------
+    @classmethod
+    def from_csv(cls, path: str, columns: Sequence[str], db_path: Optional[str] = None,
+                 progress: Optional[Callable[[int], None]] = None) -> "SqliteDataset":
+        """Stream CSV → SQLite per batch (hanya kolom `columns`); memori tidak tergantung jumlah baris."""
+        columns = list(dict.fromkeys(columns))
+        ds = cls(db_path)
+        ds.ensure_columns(columns)
+        phys = [ds._map[c] for c in columns]
+        sql = f"INSERT INTO rows (ord, {', '.join(phys)}) VALUES ({', '.join('?' * (len(phys) + 1))})"
+        n = 0
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rdr = csv.reader(f)
+            header = next(rdr, [])
+            pos = {h: i for i, h in enumerate(header)}  # header kembar: kolom terakhir (sama dengan DictReader)
+            idx = [pos.get(c, -1) for c in columns]
+            width = len(header)
+            with ds._lock:
+                ds._db.execute("BEGIN")
+                try:
+                    batch = []
+                    for rec in rdr:
+                        if not rec: continue  # DictReader juga melewati baris kosong
+                        if len(rec) < width: rec += [""] * (width - len(rec))
+                        batch.append((n * _GAP, *[rec[i] if i >= 0 else "" for i in idx])); n += 1
+                        if len(batch) >= _IMPORT_BATCH:
+                            ds._db.executemany(sql, batch); batch.clear()
+                            if progress: progress(n)
+                    if batch: ds._db.executemany(sql, batch)
+                    ds._db.execute("COMMIT")
+                except BaseException:
+                    ds._db.execute("ROLLBACK"); ds.close()
+                    raise
+        ds._count = n
+        ds._anchors = {p: p * PAGE_SIZE * _GAP for p in range((n + PAGE_SIZE - 1) // PAGE_SIZE)}
+        if progress: progress(n)
+        return ds
+
+    # ---------- posisi → ord ----------
+    def _anchor(self, p: int) -> int:
+        # dipanggil dengan lock; p < jumlah halaman
+        a = self._anchors.get(p)
+        if a is None:
+            q = max((k for k in self._anchors if k < p), default=None)
+            if q is None:
+                a = self._db.execute("SELECT ord FROM rows ORDER BY ord LIMIT 1 OFFSET ?",
+                                     (p * PAGE_SIZE,)).fetchone()[0]
+            else:
+                a = self._db.execute("SELECT ord FROM rows WHERE ord >= ? ORDER BY ord LIMIT 1 OFFSET ?",
+                                     (self._anchors[q], (p - q) * PAGE_SIZE)).fetchone()[0]
+            self._anchors[p] = a
+        return a
+
+    def _ord(self, i: int) -> int:
+        p, r = divmod(i, PAGE_SIZE)
+        a = self._anchor(p)
+        if not r: return a
+        return self._db.execute("SELECT ord FROM rows WHERE ord >= ? ORDER BY ord LIMIT 1 OFFSET ?",
+                                (a, r)).fetchone()[0]
+
+    def _invalidate(self, at: int):
+        # posisi ≥ at bergeser: anchor & cache halaman sesudahnya tidak berlaku lagi
+        p0 = at // PAGE_SIZE
+        self._anchors = {p: a for p, a in self._anchors.items() if p < p0}
+        for p in [p for p in self._cache if p >= p0]:
+            del self._cache[p]
+
+    def _respace(self, at: int, count: int):
+        # celah di posisi `at` habis (banyak sisip di titik yang sama) → sebar ulang ord baris
+        # di jendela sekitar `at`; jendela melebar sampai ada ruang (paling jauh: seluruh tabel)
+        n, w = self._count, PAGE_SIZE
+        while True:
+            lo_i, hi_i = max(0, at - w), min(n, at + w)
+            slots = hi_i - lo_i + count + 1
+            lo_b = self._ord(lo_i - 1) if lo_i > 0 else self._ord(0) - slots * _GAP
+            hi_b = self._ord(hi_i) if hi_i < n else self._ord(n - 1) + slots * _GAP
+            step = (hi_b - lo_b) // slots
+            if step >= max(_MIN_STEP, count + 1) or (lo_i == 0 and hi_i == n): break
+            w *= 4
+        a, b = self._ord(lo_i), self._ord(hi_i - 1)
+        cols = "".join(f", {r[1]}" for r in self._db.execute("PRAGMA table_info(rows)") if r[1] != "ord")
+        # lewat tabel sementara supaya PRIMARY KEY tidak bentrok selama pindah
+        self._db.execute(f"CREATE TEMP TABLE respace AS SELECT ? + ROW_NUMBER() OVER (ORDER BY ord) * ? AS new{cols} "
+                         f"FROM rows WHERE ord >= ? AND ord <= ?", (lo_b, step, a, b))
+        self._db.execute("DELETE FROM rows WHERE ord >= ? AND ord <= ?", (a, b))
+        self._db.execute(f"INSERT INTO rows (ord{cols}) SELECT new{cols} FROM respace")
+        self._db.execute("DROP TABLE respace")
+        self._invalidate(lo_i)
+
+    # ---------- baca ----------
+    def __len__(self) -> int:
+        return self._count
+
+    def _page(self, p: int) -> List[List[str]]:
+        # dipanggil dengan lock
+        cols = tuple(self._map.values())
+        if cols != self._cache_cols:
+            self._cache.clear(); self._cache_cols = cols
+        rows = self._cache.get(p)
+        if rows is None:
+            sel = ", ".join(("ord",) + cols)
+            recs = self._db.execute(f"SELECT {sel} FROM rows WHERE ord >= ? ORDER BY ord LIMIT ?",
+                                    (self._anchor(p), PAGE_SIZE + 1)).fetchall()
+            if len(recs) > PAGE_SIZE:
+                self._anchors[p + 1] = recs.pop()[0]  # sekalian anchor halaman berikutnya
+            rows = [list(r[1:]) for r in recs]
+            self._cache[p] = rows
+            while len(self._cache) > 64:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(p)
+        return rows
+
+    def value(self, i: int, col: str) -> str:
+        with self._lock:
+            if col not in self._map or not 0 <= i < self._count: return ""
+            row = self._page(i // PAGE_SIZE)[i % PAGE_SIZE]
+            return row[list(self._map).index(col)] or ""
+
+    def page(self, start: int, count: int, columns: Optional[Sequence[str]] = None) -> List[Row]:
+        cols = list(columns or self.columns)
+        with self._lock:
+            count = min(count, self._count - start)
+            if count <= 0: return []
+            phys = [self._map.get(c) for c in cols]
+            sel = ", ".join(p for p in phys if p) or "NULL"
+            out = []
+            for rec in self._db.execute(f"SELECT {sel} FROM rows WHERE ord >= ? ORDER BY ord LIMIT ?",
+                                        (self._ord(start), count)):
+                it = iter(rec)
+                out.append({c: ((next(it) or "") if p else "") for c, p in zip(cols, phys)})
+            return out
+
+    def iter_rows(self, columns: Optional[Sequence[str]] = None, page_size: int = 2000) -> Iterator[Row]:
+        cols = list(columns or self.columns)
+        with self._lock:
+            phys = [self._map.get(c) for c in cols]
+            in_edit = self._db.in_transaction
+        sel = ", ".join(["ord"] + [p for p in phys if p])
+        # koneksi baca sendiri: generate berjalan di thread lain, GUI tetap bisa membaca.
+        # Selama sesi edit (BEGIN di self._db) perubahan & kolom baru belum di-commit → hanya
+        # terlihat dari self._db, jadi halaman dibaca lewat koneksi itu (dengan lock)
+        db = None if in_edit else sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            last = None
+            while True:
+                # keyset pagination: lanjut dari ord terakhir, tanpa OFFSET
+                q = f"SELECT {sel} FROM rows {'' if last is None else 'WHERE ord > ?'} ORDER BY ord LIMIT ?"
+                args = (page_size,) if last is None else (last, page_size)
+                if db is not None:
+                    recs = db.execute(q, args).fetchall()
+                else:
+                    with self._lock:
+                        recs = self._db.execute(q, args).fetchall()
+                if not recs: return
+                last = recs[-1][0]
+                for rec in recs:
+                    it = iter(rec[1:])
+                    yield {c: ((next(it) or "") if p else "") for c, p in zip(cols, phys)}
+        finally:
+            if db is not None: db.close()
+
+    # ---------- tulis ----------
+    def set_value(self, i: int, col: str, value: str):
+        value = str(value or "")
+        with self._lock:
+            if not 0 <= i < self._count: return
+            if col not in self._map: self.ensure_columns([col])
+            self._db.execute(f"UPDATE rows SET {self._map[col]} = ? WHERE ord = ?", (value, self._ord(i)))
+            cached = self._cache.get(i // PAGE_SIZE)
+            if cached is not None:
+                cached[i % PAGE_SIZE][list(self._map).index(col)] = value
+
+    def _new_ords(self, at: int, count: int) -> List[int]:
+        prev = self._ord(at - 1) if at > 0 else None
+        nxt = self._ord(at) if at < self._count else None
+        if prev is None and nxt is None: return [i * _GAP for i in range(count)]
+        if nxt is None: return [prev + (i + 1) * _GAP for i in range(count)]
+        if prev is None: return [nxt - (count - i) * _GAP for i in range(count)]
+        step = (nxt - prev) // (count + 1)
+        if step < 1:
+            self._respace(at, count)
+            return self._new_ords(at, count)
+        return [prev + (i + 1) * step for i in range(count)]
+
+    def insert_rows(self, at: int, count: int):
+        if count <= 0: return
+        with self._lock:
+            at = max(0, min(at, self._count))
+            self._tx(lambda: self._db.executemany("INSERT INTO rows (ord) VALUES (?)",
+                                                  [(o,) for o in self._new_ords(at, count)]))
+            self._count += count; self._invalidate(at)
+
+    def remove_rows(self, at: int, count: int):
+        count = min(count, self._count - at)
+        if count <= 0 or at < 0: return
+        with self._lock:
+            lo, hi = self._ord(at), self._ord(at + count - 1)
+            self._tx(lambda: self._db.execute("DELETE FROM rows WHERE ord >= ? AND ord <= ?", (lo, hi)))
+            self._count -= count; self._invalidate(at)
+
+    def ensure_columns(self, names: Iterable[str]):
+        with self._lock:
+            for n in names:
+                if n in self._map: continue
+                phys = f"c{self._next_col}"; self._next_col += 1
+                self._db.execute(f"ALTER TABLE rows ADD COLUMN {phys} TEXT NOT NULL DEFAULT ''")
+                self._map[n] = phys
+
+    def drop_column(self, name: str):
+        # kolom fisik dibiarkan (tanpa rewrite tabel), hanya dilepas dari pemetaan
+        with self._lock:
+            self._map.pop(name, None)
+
+    def _rename(self, old: str, new: str):
+        with self._lock:
+            self._map = OrderedDict((new if k == old else k, v) for k, v in self._map.items())
+
+    def _tx(self, fn):
+        if self._db.in_transaction:
+            fn(); return
+        self._db.execute("BEGIN")
+        try:
+            fn(); self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK"); raise
+
+    # ---------- sesi edit ----------
+    def begin_edit(self):
+        with self._lock:
+            if not self._db.in_transaction: self._db.execute("BEGIN")
+            self._snapshot = (OrderedDict(self._map), self._count)
+
+    def commit_edit(self):
+        with self._lock:
+            if self._db.in_transaction: self._db.execute("COMMIT")
+            self._snapshot = None
+
+    def rollback_edit(self):
+        with self._lock:
+            if self._db.in_transaction: self._db.execute("ROLLBACK")
+            if self._snapshot is not None:
+                self._map, self._count = self._snapshot
+                self._snapshot = None
+            self._anchors.clear(); self._cache.clear()
+
+    def close(self):
+        with self._lock:
+            try: self._db.close()
+            except sqlite3.Error: pass
+            if self._temp:
+                for suffix in ("", "-wal", "-shm"):
+                    try: os.remove(self.path + suffix)
+                    except OSError: pass
+
+
+def load_csv(path: str, columns: Sequence[str], progress: Optional[Callable[[int], None]] = None) -> Dataset:
+    """CSV → Dataset; file besar langsung ke SQLite (di-stream), file kecil ke memori."""
+    if os.path.getsize(path) >= SQLITE_THRESHOLD:
+        return SqliteDataset.from_csv(path, columns, progress=progress)
+    return ColumnarDataset.from_csv(path, columns)
@@ -0,0 +1,237 @@
+"""
+Index font sistem: nama family → file .ttf/.otf (tanpa Qt).
+
+- Dibangun sekali di background thread (start_font_index) saat aplikasi dibuka
+- Disimpan ke cache user (font_index.json), divalidasi dengan mtime tiap folder font
+- Lookup family O(1) dari dict; fallback substring (perilaku lama) di memori, tanpa os.walk
+- GUI tidak menunggu build: resolve(timeout=0) + on_ready untuk resolve ulang
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+_INDEX_VERSION = 1
+_FONT_EXTS = (".ttf", ".otf")
+FONT_WAIT_SEC = 30.0  # batas tunggu index (cold scan) sebelum batch/preview jalan dengan font fallback
+# akhiran style yang dibuang dari nama file supaya "DejaVuSans-Bold" & "arialbd" → family-nya
+_STYLE_WORDS = (
+    "regular", "book", "normal", "roman", "bolditalic", "boldoblique", "bold", "italic", "oblique",
+    "semibold", "demibold", "extrabold", "ultrabold", "black", "heavy", "medium", "light",
+    "extralight", "ultralight", "thin", "condensed", "semicondensed", "expanded", "narrow",
+)
+
+
+def _simp(s: str) -> str: return "".join(ch.lower() for ch in s if ch.isalnum())
+
+def _is_preferred(path: str) -> bool:
+    # sama dengan aturan lama: file "Regular"/"Book" diutamakan
+    b = _simp(os.path.basename(path))
+    return "regular" in b or "book" in b
+
+def _rank(key: str, stem: str, path: str) -> int:
+    # 0: nama file persis family ("DejaVuSans.ttf"), 1: Regular/Book, 2: style lain
+    return 0 if stem == key else (1 if _is_preferred(path) else 2)
+
+def _family_key(stem: str) -> str:
+    key = _simp(stem.split("-", 1)[0])
+    stripped = True
+    while stripped:
+        stripped = False
+        for w in _STYLE_WORDS:
+            if key.endswith(w) and len(key) > len(w):
+                key = key[: -len(w)]; stripped = True
+                break
+    return key
+
+
+def font_dirs() -> List[str]:
+    dirs = [
+        "/System/Library/Fonts", "/System/Library/Fonts/Supplemental",
+        "/Library/Fonts", os.path.expanduser("~/Library/Fonts"),
+        "/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+        os.path.expanduser("~/.local/share/fonts"),
+    ]
+    win = os.environ.get("WINDIR") or os.environ.get("SystemRoot")
+    if win: dirs.append(os.path.join(win, "Fonts"))
+    local = os.environ.get("LOCALAPPDATA")
+    if local: dirs.append(os.path.join(local, "Microsoft", "Windows", "Fonts"))
+    return [d for d in dirs if os.path.isdir(d)]
+
+def default_cache_path() -> str:
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "Sertifikita", "font_index.json")
+
+
+def _scan(dirs: List[str]) -> Tuple[Dict[str, int], List[str]]:
+    """Walk semua folder font sekali: mtime tiap folder (untuk invalidasi) + daftar file font."""
+    mtimes: Dict[str, int] = {}
+    files: List[str] = []
+    for d in dirs:
+        for root, _, names in os.walk(d):
+            try:
+                mtimes[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            files.extend(os.path.join(root, fn) for fn in names if fn.lower().endswith(_FONT_EXTS))
+    files.sort()
+    return mtimes, files
+
+def _dirs_unchanged(mtimes: Dict[str, int]) -> bool:
+    # file baru/hapus di sub-folder mana pun mengubah mtime folder itu
+    for d, mt in mtimes.items():
+        try:
+            if os.stat(d).st_mtime_ns != mt:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+class FontIndex:
+    """
+    Index family → path. Thread-safe.
+    - resolve(timeout=None) menunggu build pertama selesai; GUI memakai timeout=0
+      (langsung "" = font fallback) lalu resolve ulang lewat on_ready
+    """
+
+    def __init__(self, cache_path: Optional[str] = None, dirs: Optional[List[str]] = None):
+        self.cache_path = cache_path or default_cache_path()
+        self._dirs = dirs
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._files: List[str] = []
+        self._stems: List[str] = []          # _simp(stem) sejajar dengan _files
+        self._by_key: Dict[str, str] = {}    # family key / stem → path terbaik
+        self._memo: Dict[str, str] = {}      # hasil fallback substring
+        self._on_ready: List[Callable[[], None]] = []
+
+    # ---------- build ----------
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._build, name="font-index", daemon=True)
+            self._thread.start()
+
+    def _build(self) -> None:
+        try:
+            dirs = self._dirs if self._dirs is not None else font_dirs()
+            cached = self._load_cache(dirs)
+            if cached is not None:
+                self._set_files(cached)
+                return
+            mtimes, files = _scan(dirs)
+            self._set_files(files)
+            self._save_cache(dirs, mtimes, files)
+        finally:
+            with self._lock:
+                self._ready.set()
+                callbacks, self._on_ready = self._on_ready, []
+            for cb in callbacks:
+                try: cb()
+                except Exception: pass  # mis. window sudah ditutup
+
+    def _load_cache(self, dirs: List[str]) -> Optional[List[str]]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != _INDEX_VERSION or data.get("dirs") != dirs:
+            return None
+        mtimes, files = data.get("mtimes"), data.get("files")
+        if not isinstance(mtimes, dict) or not isinstance(files, list) or not _dirs_unchanged(mtimes):
+            return None
+        return [str(p) for p in files]
+
+    def _save_cache(self, dirs: List[str], mtimes: Dict[str, int], files: List[str]) -> None:
+        # cache hanya optimasi: gagal tulis (read-only, permission) diabaikan
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp = self.cache_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fp:
+                json.dump({"version": _INDEX_VERSION, "dirs": dirs, "mtimes": mtimes, "files": files}, fp)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass
+
+    def _set_files(self, files: List[str]) -> None:
+        stems = [_simp(os.path.splitext(os.path.basename(p))[0]) for p in files]
+        by_key: Dict[str, str] = {}
+        rank: Dict[str, int] = {}
+        for p, stem in zip(files, stems):
+            for k in {stem, _family_key(os.path.splitext(os.path.basename(p))[0])}:
+                r = _rank(k, stem, p)
+                if k and r < rank.get(k, 3):
+                    by_key[k], rank[k] = p, r
+        with self._lock:
+            self._files, self._stems, self._by_key, self._memo = files, stems, by_key, {}
+
+    # ---------- lookup ----------
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def on_ready(self, callback: Callable[[], None]) -> None:
+        """callback() sekali saat index siap (dari thread build); langsung bila sudah siap."""
+        with self._lock:
+            if not self._ready.is_set():
+                self._on_ready.append(callback)
+                return
+        callback()
+
+    def fill_missing(self, fields: List[Dict], timeout: Optional[float] = None) -> List[Dict]:
+        """
+        font_path kosong (field dibuat selagi index belum siap) di-resolve ulang dari font_family.
+        Dipanggil di thread worker sebelum render: boleh blok sampai index siap (maks timeout).
+        """
+        for f in fields:
+            if f.get("font_family") and not f.get("font_path"):
+                f["font_path"] = self.resolve(f["font_family"], timeout)
+        return fields
+
+    def resolve(self, family: str, timeout: Optional[float] = None) -> str:
+        if not family: return ""
+        self.start()
+        if not self._ready.wait(timeout):
+            return ""
+        key = _simp(family)
+        hit = self._by_key.get(key)
+        if hit is not None:
+            return hit
+        memo = self._memo.get(key)
+        if memo is not None:
+            return memo
+        # fallback: family sebagai substring nama file (perilaku resolver lama), di memori
+        cand = [p for p, stem in zip(self._files, self._stems) if key in stem]
+        pref = [p for p in cand if _is_preferred(p)]
+        best = pref[0] if pref else (cand[0] if cand else "")
+        self._memo[key] = best
+        return best
+
+
+_INDEX = FontIndex()
+
+def start_font_index() -> None:
+    _INDEX.start()
+
+def on_font_index_ready(callback: Callable[[], None]) -> None:
+    _INDEX.on_ready(callback)
+
+def resolve_font_path(family: str, timeout: Optional[float] = None) -> str:
+    # timeout=0: jangan blok (GUI); "" selama index belum siap → renderer pakai font fallback
+    return _INDEX.resolve(family, timeout)
+
+def fill_missing_font_paths(fields: List[Dict], timeout: Optional[float] = FONT_WAIT_SEC) -> List[Dict]:
+    # worker (batch/preview): tunggu index, supaya field tidak ter-render dengan font fallback
+    return _INDEX.fill_missing(fields, timeout)
@@ -0,0 +1,56 @@
+"""
+Format output & konstanta batch — tanpa PIL / ReportLab / Qt.
+
+Cukup ringan untuk di-import saat GUI start (combo format, spin worker); renderer dan
+batch di-import baru saat preview / generate pertama.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# format khusus: semua baris → satu file PDF multi-halaman
+COMBINED_PDF = "pdf-combined"
+
+
+# ========= Encoder =========
+@dataclass(frozen=True)
+class EncoderProfile:
+    """Cara menyimpan hasil raster: format Pillow, ekstensi, dan parameter save()."""
+    name: str
+    pil_format: str
+    ext: str
+    params: Tuple[Tuple[str, Any], ...] = ()
+    quality: Optional[int] = None   # None → format tanpa setting quality
+
+    def save_params(self, quality: Optional[int] = None) -> Dict[str, Any]:
+        params = dict(self.params)
+        if self.quality is not None:
+            params["quality"] = max(1, min(100, int(quality or self.quality)))
+        return params
+
+
+ENCODER_PROFILES: Dict[str, EncoderProfile] = {
+    p.name: p for p in (
+        EncoderProfile("png", "PNG", ".png"),                                   # default Pillow (level 6)
+        EncoderProfile("png-fast", "PNG", ".png", (("compress_level", 1),)),    # encode cepat, file lebih besar
+        EncoderProfile("png-small", "PNG", ".png", (("optimize", True),)),      # file terkecil, encode paling lambat
+        EncoderProfile("jpeg", "JPEG", ".jpg", (("subsampling", 0),), quality=92),
+        EncoderProfile("webp", "WEBP", ".webp", (("method", 4),), quality=90),
+    )
+}
+
+def get_encoder_profile(fmt: str) -> EncoderProfile:
+    # format tak dikenal → PNG (perilaku lama)
+    return ENCODER_PROFILES.get((fmt or "png").lower().strip(), ENCODER_PROFILES["png"])
+
+def output_extension(fmt: str) -> str:
+    """Ekstensi file output (dengan titik) untuk format/profil tertentu."""
+    fmt = (fmt or "png").lower().strip()
+    return ".pdf" if fmt.startswith("pdf") else get_encoder_profile(fmt).ext
+
+
+# ========= Batch =========
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
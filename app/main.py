@@ -1,23 +1,29 @@
 from __future__ import annotations
 
-import os, json, re
+import os, json, time, threading, itertools
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Optional, Callable
 
-from PySide6.QtCore import Qt, QSize, Signal
+from PySide6.QtCore import Qt, QSize, Signal, QAbstractTableModel, QModelIndex, QObject, QThread, QTimer
 from PySide6.QtGui import (
-    QPixmap, QFont, QColor, QAction, QPen, QPalette, QIcon, QPainter, QBrush
+    QPixmap, QImage, QImageReader, QFont, QColor, QAction, QPen, QPalette, QIcon, QPainter, QBrush
 )
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QFileDialog, QLabel, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem,
     QGraphicsTextItem, QGraphicsRectItem, QSpinBox, QComboBox, QLineEdit,
-    QMessageBox, QColorDialog, QDialog, QTableWidget, QTableWidgetItem,
+    QMessageBox, QColorDialog, QDialog, QTableView,
     QHeaderView, QScrollArea, QCheckBox, QStyle, QToolBar, QGroupBox, QSlider,
-    QFormLayout, QFontComboBox, QFrame, QSizePolicy, QSplitter, QGraphicsDropShadowEffect
+    QFormLayout, QFontComboBox, QFrame, QSizePolicy, QSplitter, QGraphicsDropShadowEffect,
+    QProgressDialog
 )
 
-from renderer import draw_certificate, render_to_image
+# renderer / batch (PIL, ReportLab, multiprocessing) di-import saat preview / generate pertama → start lebih cepat
+from formats import COMBINED_PDF, ENCODER_PROFILES, default_workers, output_extension
+from dataset import ColumnarDataset, Dataset, SQLITE_THRESHOLD, load_csv
+from naming import OutputPlanner, render_filename
+from fontindex import fill_missing_font_paths, on_font_index_ready, resolve_font_path, start_font_index
+from tiledimage import TiledImageItem, should_tile
 
 
 # ===================== Model =====================
@@ -41,37 +47,6 @@ def qfont_from_field(f: TextField) -> QFont:
     return QFont(fam or "Arial", f.size)
 
 
-# ------------- font resolver -------------
-_FONT_CACHE: Dict[str, str] = {}
-def _font_dirs() -> List[str]:
-    dirs = [
-        "/System/Library/Fonts", "/System/Library/Fonts/Supplemental",
-        "/Library/Fonts", os.path.expanduser("~/Library/Fonts"),
-        "/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
-    ]
-    win = os.environ.get("WINDIR") or os.environ.get("SystemRoot")
-    if win: dirs.append(os.path.join(win, "Fonts"))
-    return [d for d in dirs if os.path.isdir(d)]
-def _simp(s: str) -> str: return "".join(ch.lower() for ch in s if ch.isalnum())
-def resolve_font_path(family: str) -> str:
-    if not family: return ""
-    key=_simp(family)
-    if key in _FONT_CACHE: return _FONT_CACHE[key]
-    cand=[]
-    for d in _font_dirs():
-        for root,_,files in os.walk(d):
-            for fn in files:
-                if not fn.lower().endswith((".ttf",".otf")): continue
-                if _simp(family) in _simp(os.path.splitext(fn)[0]):
-                    cand.append(os.path.join(root,fn))
-    best=""
-    if cand:
-        pref=[p for p in cand if "regular" in _simp(os.path.basename(p)) or "book" in _simp(os.path.basename(p))]
-        best=pref[0] if pref else cand[0]
-    _FONT_CACHE[key]=best
-    return best
-
-
 # ===================== Theme =====================
 def build_fresh_stylesheet(mode="dark")->str:
     if mode=="light":
@@ -92,7 +67,7 @@ def build_fresh_stylesheet(mode="dark")->str:
     }}
     QFontComboBox {{ background:{input_bg}; border:1px solid {input_border}; border-radius:10px; padding:4px 8px; color:{text}; font-size:12.5pt; }}
     QComboBox QAbstractItemView {{ background:{card}; color:{text}; border:1px solid {border}; selection-background-color:{hover}; }}
-    QTableWidget {{ background:{card}; color:{text}; gridline-color:{border}; border:1px solid {border}; border-radius:10px; }}
+    QTableView {{ background:{card}; color:{text}; gridline-color:{border}; border:1px solid {border}; border-radius:10px; }}
     QHeaderView::section {{ background:{hdr}; color:{sub}; border:0; padding:8px 10px; font-weight:600; }}
     QPushButton {{ background:{card}; border:1px solid {border}; color:{text}; border-radius:10px; padding:8px 12px; font-weight:600; }}
     QPushButton:hover {{ border-color:{input_border}; background:{hover}; }}
@@ -198,22 +173,59 @@ class CanvasView(QGraphicsView):
             super().wheelEvent(e)
 
 
+# --------------- DatasetTableModel ---------------
+class DatasetTableModel(QAbstractTableModel):
+    """Model tabel yang membaca langsung dari Dataset (per halaman, tanpa item per sel)."""
+    def __init__(self,keys:List[str],dataset:Dataset,parent=None):
+        super().__init__(parent); self.keys=list(keys); self.ds=dataset
+    def rowCount(self,parent=QModelIndex()): return 0 if parent.isValid() else len(self.ds)
+    def columnCount(self,parent=QModelIndex()): return 0 if parent.isValid() else len(self.keys)
+    def data(self,index,role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole,Qt.EditRole): return None
+        return self.ds.value(index.row(),self.keys[index.column()])
+    def setData(self,index,value,role=Qt.EditRole):
+        if not index.isValid() or role!=Qt.EditRole: return False
+        self.ds.set_value(index.row(),self.keys[index.column()],str(value or "")); self.dataChanged.emit(index,index,[role]); return True
+    def flags(self,index):
+        if not index.isValid(): return Qt.NoItemFlags
+        return Qt.ItemIsSelectable|Qt.ItemIsEnabled|Qt.ItemIsEditable
+    def headerData(self,section,orientation,role=Qt.DisplayRole):
+        if role!=Qt.DisplayRole: return None
+        if orientation==Qt.Horizontal: return self.keys[section] if 0<=section<len(self.keys) else None
+        return str(section+1)
+    def insertRows(self,row,count,parent=QModelIndex()):
+        self.beginInsertRows(parent,row,row+count-1); self.ds.insert_rows(row,count); self.endInsertRows(); return True
+    def removeRows(self,row,count,parent=QModelIndex()):
+        if count<=0 or row<0 or row+count>len(self.ds): return False
+        self.beginRemoveRows(parent,row,row+count-1); self.ds.remove_rows(row,count); self.endRemoveRows(); return True
+    def set_dataset(self,dataset:Dataset):
+        self.beginResetModel(); self.ds=dataset; self.endResetModel()
+
+
+def import_csv_dataset(parent,path:str,names:List[str])->Dataset:
+    """CSV → Dataset (hanya kolom field); file besar di-stream ke SQLite dengan progress dialog."""
+    if os.path.getsize(path)<SQLITE_THRESHOLD: ds=load_csv(path,names)
+    else:
+        dlg=QProgressDialog(f"Import {os.path.basename(path)}…",None,0,0,parent)
+        dlg.setWindowTitle("Import CSV"); dlg.setWindowModality(Qt.WindowModal); dlg.setMinimumDuration(0)
+        def _progress(n): dlg.setLabelText(f"Import {os.path.basename(path)}… {n:,} baris"); QApplication.processEvents()
+        try: ds=load_csv(path,names,_progress)
+        finally: dlg.close(); dlg.deleteLater()
+    if not ds: ds.insert_rows(0,1)  # sama dengan perilaku lama: minimal satu baris kosong
+    return ds
+
+
 # --------------- EnterAdvancingTable ---------------
-class EnterAdvancingTable(QTableWidget):
+class EnterAdvancingTable(QTableView):
     def keyPressEvent(self,e):
-        key,mods=e.key(),e.modifiers()
-        if key in (Qt.Key_Return,Qt.Key_Enter) and not (mods & (Qt.ControlModifier|Qt.AltModifier)):
-            r,c=self.currentRow(),self.currentColumn()
+        key,mods=e.key(),e.modifiers(); m=self.model()
+        if m is not None and key in (Qt.Key_Return,Qt.Key_Enter) and not (mods & (Qt.ControlModifier|Qt.AltModifier)):
+            cur=self.currentIndex(); r,c=max(0,cur.row()),max(0,cur.column())
             if mods & Qt.ShiftModifier: nr=max(0,r-1)
             else:
                 nr=r+1
-                if nr>=self.rowCount():
-                    self.insertRow(self.rowCount())
-                    for k in range(self.columnCount()):
-                        if not self.item(nr,k): self.setItem(nr,k,QTableWidgetItem(""))
-            self.setCurrentCell(nr,c)
-            it=self.item(nr,c) or QTableWidgetItem("")
-            self.setItem(nr,c,it); self.editItem(it); return
+                if nr>=m.rowCount(): m.insertRows(m.rowCount(),1)
+            idx=m.index(nr,c); self.setCurrentIndex(idx); self.edit(idx); return
         super().keyPressEvent(e)
 
 
@@ -241,12 +253,16 @@ class DraggableText(QGraphicsTextItem):
 
 # --------------- ManageDataDialog ---------------
 class ManageDataDialog(QDialog):
-    def __init__(self,parent,keys:List[str],dataset:List[Dict[str,str]]):
+    """Edit langsung di Dataset milik Main dalam satu sesi edit: OK = commit, Cancel = rollback."""
+    def __init__(self,parent,keys:List[str],dataset:Dataset):
         super().__init__(parent); self.setWindowTitle("Manage Data"); self.resize(900,520)
-        self.keys=list(keys)
-        self.dataset=[{k:r.get(k,"") for k in self.keys} for r in (dataset or [])] or [{k:"" for k in self.keys}]
-        self.table=EnterAdvancingTable(self); self.table.setColumnCount(len(self.keys))
-        self.table.setHorizontalHeaderLabels(self.keys); self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.keys=list(keys); self._orig=dataset; self.dataset=dataset
+        dataset.ensure_columns(self.keys); dataset.begin_edit()
+        if not dataset: dataset.insert_rows(0,1)
+        self.model=DatasetTableModel(self.keys,self.dataset,self)
+        self.table=EnterAdvancingTable(self); self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectRows); self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.btn_add, self.btn_del = QPushButton("+ Add Row"), QPushButton("Delete Row")
         self.btn_import, self.btn_export = QPushButton("Import CSV"), QPushButton("Export CSV")
         self.btn_ok, self.btn_cancel = QPushButton("OK"), QPushButton("Cancel")
@@ -256,71 +272,165 @@ class ManageDataDialog(QDialog):
         self.btn_add.clicked.connect(self._add); self.btn_del.clicked.connect(self._del)
         self.btn_import.clicked.connect(self._imp); self.btn_export.clicked.connect(self._exp)
         self.btn_ok.clicked.connect(self.accept); self.btn_cancel.clicked.connect(self.reject)
-        self._reload()
-    def _reload(self):
-        self.table.setColumnCount(len(self.keys)); self.table.setHorizontalHeaderLabels(self.keys)
-        self.table.setRowCount(len(self.dataset))
-        for r,row in enumerate(self.dataset):
-            for c,k in enumerate(self.keys): self.table.setItem(r,c,QTableWidgetItem(row.get(k,"")))
-    def _sync(self):
-        out=[]; 
-        for r in range(self.table.rowCount()):
-            row={}
-            for c,k in enumerate(self.keys):
-                it=self.table.item(r,c); row[k]=it.text() if it else ""
-            out.append(row)
-        self.dataset=out
     def _add(self):
-        self._sync(); self.dataset.append({k:"" for k in self.keys}); self._reload()
-        nr=self.table.rowCount()-1
-        if nr>=0: self.table.setCurrentCell(nr,0); it=self.table.item(nr,0) or QTableWidgetItem(""); self.table.setItem(nr,0,it); self.table.editItem(it)
+        nr=self.model.rowCount(); self.model.insertRows(nr,1)
+        idx=self.model.index(nr,0); self.table.setCurrentIndex(idx); self.table.scrollTo(idx); self.table.edit(idx)
     def _del(self):
-        sel = sorted([i.row() for i in self.table.selectionModel().selectedRows()], reverse=True) or []
-        self._sync()
-        for i in sel:
-            if 0<=i<len(self.dataset): self.dataset.pop(i)
-        if not self.dataset: self.dataset=[{k:"" for k in self.keys}]
-        self._reload()
+        sel=sorted({i.row() for i in self.table.selectionModel().selectedRows()}, reverse=True)
+        # hapus per blok berurutan → sekali beginRemoveRows per blok, bukan per baris
+        while sel:
+            end=sel.pop(0); start=end
+            while sel and sel[0]==start-1: start=sel.pop(0)
+            self.model.removeRows(start,end-start+1)
+        if not self.dataset: self.model.insertRows(0,1)
     def _imp(self):
         path,_=QFileDialog.getOpenFileName(self,"Import CSV","","CSV (*.csv)")
         if not path: return
-        import csv
-        try:
-            with open(path,"r",encoding="utf-8-sig") as f:
-                rdr=csv.DictReader(f); self.dataset=[{k:rec.get(k,"") for k in self.keys} for rec in rdr] or [{k:"" for k in self.keys}]
-            self._reload()
-        except Exception as e: QMessageBox.critical(self,"CSV error",str(e))
+        try: ds=import_csv_dataset(self,path,self.keys)
+        except Exception as e: QMessageBox.critical(self,"CSV error",str(e)); return
+        if self.dataset is not self._orig: self.dataset.close()  # hasil import sebelumnya di dialog ini
+        self.dataset=ds; self.model.set_dataset(ds)
     def _exp(self):
         path,_=QFileDialog.getSaveFileName(self,"Export CSV","dataset.csv","CSV (*.csv)")
         if not path: return
-        import csv
-        self._sync()
         try:
-            with open(path,"w",encoding="utf-8",newline="") as f:
-                w=csv.DictWriter(f,fieldnames=self.keys); w.writeheader(); [w.writerow(row) for row in self.dataset]
+            self.dataset.write_csv(path,self.keys)
             QMessageBox.information(self,"Saved",f"Exported to {path}")
         except Exception as e: QMessageBox.critical(self,"CSV error",str(e))
-    def get_dataset(self)->List[Dict[str,str]]: self._sync(); return self.dataset
+    def accept(self):
+        # hasil import menggantikan dataset lama → edit pada dataset lama tidak dipakai
+        if self.dataset is self._orig: self._orig.commit_edit()
+        else: self._orig.rollback_edit()
+        super().accept()
+    def reject(self):
+        self._orig.rollback_edit()
+        if self.dataset is not self._orig: self.dataset.close(); self.dataset=self._orig
+        super().reject()
+    def get_dataset(self)->Dataset: return self.dataset
 
 
 # --------------- Preview ---------------
+class PreviewRenderer(QObject):
+    """Render preview (draft/full) di thread terpisah; request yang sudah tertimpa request baru dilewati."""
+    done=Signal(int,object,str); _request=Signal(int,str,object,object,object,bool)
+    def __init__(self):
+        super().__init__(); self._latest=0; self._request.connect(self._render)
+    def submit(self,req_id:int,template_path:str,fields:List[Dict],row:Dict[str,str],size,full:bool):
+        self._latest=req_id; self._request.emit(req_id,template_path,fields,row,size,full)
+    def _render(self,req_id,template_path,fields,row,size,full):
+        if req_id!=self._latest: return
+        try:
+            from renderer import render_to_image, render_draft
+            fill_missing_font_paths(fields)  # index font belum siap saat field dibuat → tunggu di sini, bukan di GUI
+            img=render_to_image(template_path,fields,row) if full else render_draft(template_path,fields,row,size)
+            # QImage boleh dibuat di thread lain (QPixmap tidak); copy() → lepas dari buffer bytes
+            qimg=QImage(img.tobytes("raw","RGB"),img.width,img.height,img.width*3,QImage.Format_RGB888).copy()
+            self.done.emit(req_id,qimg,"")
+        except Exception as e: self.done.emit(req_id,None,str(e))
+
+
 class PreviewDialog(QDialog):
-    def __init__(self,pixmap:QPixmap,parent=None):
-        super().__init__(parent); self.setWindowTitle("Preview"); self.resize(1000,700)
-        lbl=QLabel(); lbl.setPixmap(pixmap); lbl.setAlignment(Qt.AlignCenter)
-        sc=QScrollArea(); sc.setWidgetResizable(True); sc.setWidget(lbl)
-        lay=QVBoxLayout(self); lay.addWidget(sc)
+    """Preview live (non-modal): draft seukuran layar, refresh otomatis saat field/data berubah."""
+    def __init__(self,main:"Main"):
+        super().__init__(main); self.setWindowTitle("Preview"); self.resize(1000,700); self.main=main
+        self._req=0; self._t0=0.0; self._pix=None
+        self.spin_row=QSpinBox(); self.spin_row.setRange(1,1); self.spin_row.setPrefix("Row ")
+        self.chk_full=QCheckBox("Full quality"); self.chk_full.setToolTip("Render resolusi penuh (lebih lambat)")
+        self.lbl_status=QLabel(""); self.lbl_status.setStyleSheet("color:#94A3B8;")
+        top=QHBoxLayout(); top.addWidget(self.spin_row); top.addWidget(self.chk_full); top.addStretch(1); top.addWidget(self.lbl_status)
+        self.lbl=QLabel(); self.lbl.setAlignment(Qt.AlignCenter)
+        self.sc=QScrollArea(); self.sc.setWidgetResizable(True); self.sc.setWidget(self.lbl)
+        lay=QVBoxLayout(self); lay.addLayout(top); lay.addWidget(self.sc)
+        # debounce: ketik/drag beruntun → satu render
+        self._timer=QTimer(self); self._timer.setSingleShot(True); self._timer.setInterval(120); self._timer.timeout.connect(self._request)
+        self._thread=QThread(self); self._worker=PreviewRenderer(); self._worker.moveToThread(self._thread)
+        self._worker.done.connect(self._on_done); self._thread.finished.connect(self._worker.deleteLater); self._thread.start()
+        self.spin_row.valueChanged.connect(lambda _v: self.schedule()); self.chk_full.toggled.connect(lambda _v: self.schedule())
+        self.finished.connect(self._stop)
+    def schedule(self): self._timer.start()
+    def _request(self):
+        m=self.main
+        if not m.template_path or not m.dataset: self.lbl.clear(); self.lbl_status.setText("Template/data kosong"); return
+        self.spin_row.setMaximum(len(m.dataset)); row=dict(m.dataset[self.spin_row.value()-1])
+        vp=self.sc.viewport().size(); dpr=self.devicePixelRatioF()
+        self._req+=1; self._t0=time.perf_counter()
+        self._worker.submit(self._req,m.template_path,[asdict(f) for f in m.fields],row,(int(vp.width()*dpr),int(vp.height()*dpr)),self.chk_full.isChecked())
+    def _on_done(self,req_id:int,qimg,err:str):
+        if req_id!=self._req: return  # hasil request lama
+        if err: self.lbl_status.setText(f"Error: {err}"); return
+        self._pix=QPixmap.fromImage(qimg); self._show_pixmap()
+        self.lbl_status.setText(f"{'Full' if self.chk_full.isChecked() else 'Draft'} {qimg.width()}×{qimg.height()} · {(time.perf_counter()-self._t0)*1000:.0f} ms")
+    def _show_pixmap(self):
+        if self._pix is None: return
+        if self.chk_full.isChecked(): self.lbl.setPixmap(self._pix); return
+        # draft: muat di viewport (base draft dibulatkan ke atas, jadi bisa sedikit lebih besar)
+        dpr=self.devicePixelRatioF(); vp=self.sc.viewport().size()
+        pm=self._pix.scaled(int(vp.width()*dpr),int(vp.height()*dpr),Qt.KeepAspectRatio,Qt.SmoothTransformation); pm.setDevicePixelRatio(dpr)
+        self.lbl.setPixmap(pm)
+    def resizeEvent(self,e):
+        super().resizeEvent(e); self._show_pixmap()
+        if not self.chk_full.isChecked(): self.schedule()
+    def _stop(self,*_):
+        self._timer.stop(); self._thread.quit(); self._thread.wait()
+
+
+# --------------- Generate worker ---------------
+class GenerateWorker(QObject):
+    """Menjalankan run_batch di QThread terpisah supaya GUI tetap responsif.
+    jobs boleh berupa callable → dipanggil di thread worker (mis. plan path output atas seluruh dataset)."""
+    progress=Signal(int,int); finished=Signal(object)
+    def __init__(self,template_path:str,fields:List[Dict],jobs:list,fmt:str,workers:int,quality:Optional[int]=None,report_path:str="",manifest:Optional[str]=None,zip_path:str="",pipeline:bool=False,total:Optional[int]=None):
+        super().__init__(); self.template_path=template_path; self.fields=fields; self.jobs=jobs; self.total=total
+        self.fmt=fmt; self.quality=quality; self.workers=workers; self.report_path=report_path; self.manifest=manifest; self.zip_path=zip_path; self.pipeline=pipeline; self._cancel=threading.Event()
+    def cancel(self): self._cancel.set()
+    def run(self):
+        from batch import run_batch, run_combined_pdf, write_timing_report
+        from sinks import ZipSink
+        total=self.total if self.total is not None else len(self.jobs); done=0; last=0.0
+        def _progress(_r):
+            nonlocal done,last
+            done+=1; now=time.perf_counter()
+            # throttle: cukup ~20x per detik ke GUI thread
+            if now-last>=0.05 or done==total: last=now; self.progress.emit(done,total)
+        try:
+            fill_missing_font_paths(self.fields)  # jangan render batch dengan font fallback hanya karena index belum siap
+            if callable(self.jobs): self.jobs=self.jobs()
+            if self.fmt==COMBINED_PDF:
+                # jobs bisa berupa generator (baris dibaca per halaman) → path dari job pertama
+                jobs=iter(self.jobs); first=next(jobs,None); out=first[1] if first else ""
+                rows=itertools.chain([first[0]] if first else [],(row for row,_ in jobs))
+                res=run_combined_pdf(self.template_path,self.fields,rows,out,progress=_progress,cancel=self._cancel.is_set)
+            elif self.zip_path:
+                # path job = nama entry; ZIP ditulis paralel dengan render, .part → rename saat close
+                with ZipSink(self.zip_path) as sink:
+                    res=run_batch(self.template_path,self.fields,self.jobs,fmt=self.fmt,quality=self.quality,workers=self.workers,progress=_progress,cancel=self._cancel.is_set,sink=sink,pipeline=self.pipeline)
+                    if res.cancelled: sink.abort()  # ZIP terpotong tidak boleh terlihat lengkap
+            else:
+                res=run_batch(self.template_path,self.fields,self.jobs,fmt=self.fmt,quality=self.quality,workers=self.workers,progress=_progress,cancel=self._cancel.is_set,manifest=self.manifest,pipeline=self.pipeline)
+        except Exception as e: res=e
+        if self.report_path and not isinstance(res,Exception):
+            # ringkasan durasi per tahap (decode/font/layout/draw/convert/encode/write)
+            try: write_timing_report(res,self.report_path,format=self.fmt,workers=self.workers,template=self.template_path)
+            except OSError: self.report_path=""
+        self.finished.emit(res)
+
+
+def _fmt_eta(sec:float)->str:
+    sec=max(0,int(sec)); h,rem=divmod(sec,3600); m,s=divmod(rem,60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
 
 
 # ================= Main =================
 class Main(QMainWindow):
+    _fontIndexReady=Signal()  # dari thread index font → slot di GUI thread (queued)
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Sertifikita"); self.resize(1280,860)
 
         self.template_path=""; self.img_w=self.img_h=1; self.sf=1.0; self.view_zoom=1.0
-        self.fields: List[TextField]=[]; self.dataset: List[Dict[str,str]]=[]
+        self.fields: List[TextField]=[]; self.dataset: Dataset=ColumnarDataset()
         self.overlay_box=None; self.bg_item=None
+        self._gen_thread=None; self._gen_worker=None; self._gen_progress=None; self._gen_planner=None; self._preview_dlg=None
 
         self.setAcceptDrops(True)
         self._build_menu()
@@ -397,7 +507,19 @@ class Main(QMainWindow):
         self.pattern_edit=QLineEdit("{index}_{Text-1}")
         self.pattern_help=QLabel("Pattern: gunakan {index} / {index:03} / {FieldName}."); self.pattern_help.setStyleSheet("color:#94A3B8; font-size:11pt;")
         self.pattern_preview=QLabel("Preview: -"); self.pattern_preview.setStyleSheet("color:#94A3B8; font-size:11pt;")
-        self.format_combo=QComboBox(); self.format_combo.addItems(["png","pdf"])
+        self.format_combo=QComboBox(); self.format_combo.addItems([*ENCODER_PROFILES,"pdf",COMBINED_PDF])
+        self.spin_quality=QSpinBox(); self.spin_quality.setRange(1,100); self.spin_quality.setValue(90); self.spin_quality.setEnabled(False)
+        self.spin_quality.setToolTip("Quality untuk jpeg/webp")
+        self.spin_workers=QSpinBox(); self.spin_workers.setRange(1,max(64,default_workers())); self.spin_workers.setValue(default_workers())
+        self.shard_combo=QComboBox()
+        for label,key in (("None (one folder)",""),("Hashed (00–ff)","hash"),("Group by column","field")): self.shard_combo.addItem(label,key)
+        self.shard_combo.setToolTip("Bagi output ke subfolder supaya satu folder tidak berisi puluhan ribu file")
+        # kolom pengelompokan terpisah dari filename field (nama biasanya unik → satu folder per sertifikat)
+        self.group_field=QComboBox(); self.group_field.setEnabled(False); self.group_field.setToolTip("Satu subfolder per nilai kolom ini (mis. Kelas / Kursus)")
+        self.chk_incremental=QCheckBox("Skip unchanged rows"); self.chk_incremental.setChecked(True)
+        self.chk_incremental.setToolTip("Hanya render baris yang berubah / file-nya hilang sejak generate terakhir ke folder yang sama")
+        self.chk_pipeline=QCheckBox("Overlap disk writes"); self.chk_pipeline.setToolTip("Render, encode & tulis file berjalan bersamaan (berguna untuk output ke network share / disk lambat)")
+        self.chk_zip=QCheckBox("Save as ZIP"); self.chk_zip.setToolTip("Semua file langsung ditulis ke satu arsip .zip (tanpa file per sertifikat di disk)")
         self.btn_preview=QPushButton("Preview"); self.btn_preview.setObjectName("primary")
         self.btn_generate=QPushButton("Generate"); self.btn_generate.setObjectName("primary")
 
@@ -406,10 +528,15 @@ class Main(QMainWindow):
         rowp=QFormLayout(); rowp.setLabelAlignment(Qt.AlignRight|Qt.AlignVCenter)
         rowp.addRow("Filename field", self.filename_field)
         rowp.addRow("Filename pattern", self.pattern_edit)
+        rowp.addRow("Subfolders", self.shard_combo)
+        rowp.addRow("Group column", self.group_field)
         ld.addLayout(rowp)
         ld.addWidget(self.pattern_help)
         ld.addWidget(self.pattern_preview)
-        bot=QHBoxLayout(); bot.addWidget(QLabel("Format")); bot.addWidget(self.format_combo); ld.addLayout(bot)
+        bot=QHBoxLayout(); bot.addWidget(QLabel("Format")); bot.addWidget(self.format_combo)
+        bot.addWidget(QLabel("Quality")); bot.addWidget(self.spin_quality)
+        bot.addWidget(QLabel("Workers")); bot.addWidget(self.spin_workers); ld.addLayout(bot)
+        ld.addWidget(self.chk_incremental); ld.addWidget(self.chk_zip); ld.addWidget(self.chk_pipeline)
         ld.addWidget(self.btn_preview); ld.addWidget(self.btn_generate)
 
         # Toolbar
@@ -469,7 +596,12 @@ class Main(QMainWindow):
         self.color_chip.colorChanged.connect(lambda s: (self.fld_color.setText(s), self._panel_changed()))
         self.pattern_edit.textEdited.connect(lambda _ : self._update_filename_preview())
         self.filename_field.currentTextChanged.connect(lambda _ : self._update_filename_preview())
+        self.shard_combo.currentIndexChanged.connect(lambda _ : self.group_field.setEnabled(self.shard_combo.currentData()=="field"))
         self.format_combo.currentTextChanged.connect(lambda _ : self._update_filename_preview())
+        self.format_combo.currentTextChanged.connect(lambda t: (self.spin_quality.setEnabled(t in ("jpeg","webp")), self.chk_incremental.setEnabled(t!=COMBINED_PDF), self.chk_zip.setEnabled(t!=COMBINED_PDF), self.chk_pipeline.setEnabled(t!=COMBINED_PDF)))
+
+        # font dicari tanpa menunggu index (timeout=0); field yang belum ketemu di-resolve ulang saat index siap
+        self._fontIndexReady.connect(self._on_font_index_ready); on_font_index_ready(self._fontIndexReady.emit)
 
         self.statusBar().showMessage("Tip: Enter = baris baru; Shift+Enter = baris atas. Drag file template atau CSV langsung ke sini!")
         self._refresh_filename_choices(); self._update_filename_preview()
@@ -508,16 +640,13 @@ class Main(QMainWindow):
                 break
 
     def _import_csv_direct(self, path):
-        import csv
         try:
-            with open(path, "r", encoding="utf-8-sig") as f:
-                rdr = csv.DictReader(f)
-                names = self._field_names() or ["Text-1"]
-                self.dataset = [{k: rec.get(k, "") for k in names} for rec in rdr] or [{k: "" for k in names}]
-                self._update_filename_preview()
-                QMessageBox.information(self, "CSV Imported", f"Imported {len(self.dataset)} rows from {os.path.basename(path)}")
+            names = self._field_names() or ["Text-1"]
+            ds = import_csv_dataset(self, path, names)
         except Exception as e:
-            QMessageBox.critical(self, "CSV error", str(e))
+            QMessageBox.critical(self, "CSV error", str(e)); return
+        self._set_dataset(ds)
+        QMessageBox.information(self, "CSV Imported", f"Imported {len(ds):,} rows from {os.path.basename(path)}")
 
     # ---------- menu ----------
     def _build_menu(self):
@@ -543,29 +672,39 @@ class Main(QMainWindow):
         path,_=QFileDialog.getOpenFileName(self,"Choose template image","","Images (*.png *.jpg *.jpeg *.webp)")
         if path: self.set_template(path)
     def set_template(self,path:str):
-        self.template_path=path; pm=QPixmap(path)
-        self.img_w,self.img_h=pm.width(),pm.height(); self.sf=1.0
+        self.template_path=path; sz=QImageReader(path).size()
+        self.img_w,self.img_h=max(1,sz.width()),max(1,sz.height()); self.sf=1.0
+        if isinstance(self.bg_item,TiledImageItem): self.bg_item.stop()
         self.scene.clear(); self._clear_overlay()
+        tiled=should_tile(self.img_w,self.img_h)
+        if tiled:
+            # bayangan murah: rect statis (DropShadowEffect me-render ulang seluruh item tiap paint)
+            sh=QGraphicsRectItem(0,4,self.img_w,self.img_h); sh.setBrush(QBrush(QColor(0,0,0,40))); sh.setPen(QPen(Qt.NoPen)); self.scene.addItem(sh)
         paper=QGraphicsRectItem(0,0,self.img_w,self.img_h); paper.setBrush(QBrush(Qt.white)); paper.setPen(QPen(QColor("#D1D5DB"),1)); self.scene.addItem(paper)
-        
-        # Shadow effect
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20); shadow.setXOffset(0); shadow.setYOffset(4)
-        shadow.setColor(QColor(0,0,0,60))
-        
-        self.bg_item=QGraphicsPixmapItem(pm)
-        try: self.bg_item.setTransformationMode(Qt.SmoothTransformation)
-        except Exception: pass
-        self.bg_item.setZValue(1); self.scene.addItem(self.bg_item)
-        
-        # Apply shadow to both paper and pixmap via a container if needed, 
-        # but GraphicsItem shadow is tricky. Apply to the pixmap item for now.
-        self.bg_item.setGraphicsEffect(shadow)
+
+        if tiled:
+            # template besar (mis. A3 600 dpi): piramida tile, hanya tile & level yang terlihat yang di-decode
+            self.bg_item=TiledImageItem(path)
+            self.bg_item.setZValue(1); self.scene.addItem(self.bg_item)
+        else:
+            # Shadow effect
+            shadow = QGraphicsDropShadowEffect()
+            shadow.setBlurRadius(20); shadow.setXOffset(0); shadow.setYOffset(4)
+            shadow.setColor(QColor(0,0,0,60))
+
+            self.bg_item=QGraphicsPixmapItem(QPixmap(path))
+            try: self.bg_item.setTransformationMode(Qt.SmoothTransformation)
+            except Exception: pass
+            self.bg_item.setZValue(1); self.scene.addItem(self.bg_item)
+
+            # Apply shadow to both paper and pixmap via a container if needed,
+            # but GraphicsItem shadow is tricky. Apply to the pixmap item for now.
+            self.bg_item.setGraphicsEffect(shadow)
 
         for f in self.fields:
             it=DraggableText(f,self.sf,self._on_item_moved); it.setZValue(2); self.scene.addItem(it); self._apply_canvas_alignment(it)
         self.scene.setSceneRect(-50,-50,self.img_w+100,self.img_h+100); self._fit_to_view()
-        self._update_empty_overlay()
+        self._update_empty_overlay(); self._preview_changed()
 
     # ---------- overlay ----------
     def _clear_overlay(self):
@@ -598,17 +737,19 @@ class Main(QMainWindow):
         cur=self.filename_field.currentText(); self.filename_field.clear()
         names=self._field_names() or ["Text-1"]; self.filename_field.addItems(names)
         if cur and cur in names: self.filename_field.setCurrentText(cur)
+        self._refresh_group_choices()
+    def _refresh_group_choices(self):
+        # semua kolom data (termasuk kolom CSV yang tidak digambar) + nama field
+        cur=self.group_field.currentText(); self.group_field.clear()
+        cols=list(dict.fromkeys([*self.dataset.columns,*self._field_names()])); self.group_field.addItems(cols)
+        if cur and cur in cols: self.group_field.setCurrentText(cur)
     def _ensure_dataset_columns(self):
         if not self.dataset: return
-        names=self._field_names()
-        for r in self.dataset:
-            for n in names:
-                if n not in r: r[n]=""
-    def _rename_dataset_column(self,old,new):
-        if old==new: return
-        for r in self.dataset:
-            if old in r and new not in r: r[new]=r.pop(old)
-            else: r.pop(old, None)
+        self.dataset.ensure_columns(self._field_names())
+    def _rename_dataset_column(self,old,new): self.dataset.rename_column(old,new)
+    def _set_dataset(self,ds:Dataset):
+        if ds is not self.dataset: self.dataset.close()  # SqliteDataset: hapus file sementara
+        self.dataset=ds; self._refresh_group_choices(); self._update_filename_preview()
 
     # ---------- sink panel → field ----------
     def _push_selected_panel_to_field(self):
@@ -619,12 +760,19 @@ class Main(QMainWindow):
         f.size=self.fld_size.value()
         f.color=self.fld_color.text().strip() or "#000000"
         f.align=self.fld_align.currentText().strip().lower()
-        f.font_family=self.font_combo.currentFont().family(); f.font_path=resolve_font_path(f.font_family)
+        f.font_family=self.font_combo.currentFont().family(); f.font_path=resolve_font_path(f.font_family,timeout=0)
         f.x, f.y = self.spin_x.value(), self.spin_y.value()
         it.setPlainText(f"{{{{{f.name}}}}}"); it.setFont(qfont_from_field(f)); it.setDefaultTextColor(QColor(f.color)); it.setPos(f.x*self.sf, f.y*self.sf)
         if old!=f.name: self._rename_dataset_column(old,f.name); self._ensure_dataset_columns(); self._refresh_filename_choices()
         self._update_overlay_for_item(it); self._update_filename_preview()
 
+    def _on_font_index_ready(self):
+        changed=False
+        for f in self.fields:
+            if f.font_family and not f.font_path:
+                f.font_path=resolve_font_path(f.font_family,timeout=0); changed=changed or bool(f.font_path)
+        if changed: self._preview_changed()
+
     # ---------- fields ----------
     def _next_field_name(self)->str:
         i, used = 1, set(self._field_names())
@@ -639,7 +787,7 @@ class Main(QMainWindow):
         fam=self.font_combo.currentFont().family()
         f=TextField(name=name,x=100,y=100,size=self.fld_size.value(),
                     color=self.fld_color.text().strip() or "#000000",
-                    align=self.fld_align.currentText(), font_family=fam, font_path=resolve_font_path(fam), box_width=0)
+                    align=self.fld_align.currentText(), font_family=fam, font_path=resolve_font_path(fam,timeout=0), box_width=0)
         self.fields.append(f)
         it=DraggableText(f,self.sf,self._on_item_moved); it.setZValue(3)
         self.scene.addItem(it); self._apply_canvas_alignment(it)
@@ -651,7 +799,7 @@ class Main(QMainWindow):
         for it in sel:
             name=it.field.name; self.scene.removeItem(it)
             self.fields=[f for f in self.fields if f.name!=name]
-            for r in self.dataset: r.pop(name, None)
+            self.dataset.drop_column(name)
         self._clear_overlay(); self._refresh_filename_choices(); self._update_filename_preview()
     def _selected_item(self)->Optional[DraggableText]:
         for it in self.scene.selectedItems():
@@ -689,7 +837,7 @@ class Main(QMainWindow):
     def open_manage_data(self):
         names=self._field_names() or ["Text-1"]; self._ensure_dataset_columns()
         dlg=ManageDataDialog(self,names,self.dataset)
-        if dlg.exec(): self.dataset=dlg.get_dataset(); self._update_filename_preview()
+        if dlg.exec(): self._set_dataset(dlg.get_dataset())
 
     # ---------- pilih folder (tanpa Save As) ----------
     def _select_output_dir(self)->str:
@@ -699,63 +847,134 @@ class Main(QMainWindow):
 
     # ---------- filename pattern ----------
     def _render_filename_from_pattern(self, row: Dict[str,str], idx:int, fallback_field:str)->str:
-        pat = (self.pattern_edit.text() or "").strip()
-        if not pat:
-            return row.get(fallback_field, f"row_{idx}") or f"row_{idx}"
-
-        # {index} or {index:03}
-        def repl_index(m):
-            pad = m.group(1)
-            return f"{idx:0{int(pad)}d}" if pad else str(idx)
-        s = re.sub(r"\{index(?::(\d+))?\}", repl_index, pat)
-
-        # {FieldName}
-        def repl_field(m):
-            key = m.group(1)
-            return str(row.get(key, "")).strip()
-        s = re.sub(r"\{([^{}:]+)\}", repl_field, s)
-
-        s = s or f"row_{idx}"
-        safe = "".join(c for c in s if c.isalnum() or c in "-_ ").strip().replace(" ","_")
-        return safe or f"row_{idx}"
+        return render_filename(self.pattern_edit.text(), row, idx, fallback_field)
 
     def _update_filename_preview(self):
+        self._preview_changed()  # field/data berubah → preview live ikut refresh
         if not self.dataset:
             self.pattern_preview.setText("Preview: (isi data dulu)")
             return
+        ext = self.format_combo.currentText().lower()
+        if ext == COMBINED_PDF:
+            self.pattern_preview.setText(f"Preview: 1 file PDF ({len(self.dataset)} halaman)")
+            return
         field = self.filename_field.currentText().strip() or (self._field_names()[0] if self.fields else "Text-1")
         name = self._render_filename_from_pattern(self.dataset[0], 1, field)
-        ext = self.format_combo.currentText().lower()
-        self.pattern_preview.setText(f"Preview: {name}.{ext}")
+        self.pattern_preview.setText(f"Preview: {name}{output_extension(ext)}")
 
     # ---------- preview / generate ----------
     def preview_dialog(self):
         if not self.template_path: QMessageBox.warning(self,"No template","Silakan load template dulu."); return
         if not self.dataset: QMessageBox.information(self,"Data kosong","Isi data di Manage Data."); return
         self._push_selected_panel_to_field()
-        try:
-            img=render_to_image(self.template_path,[asdict(f) for f in self.fields], self.dataset[0])
-            from PIL.ImageQt import ImageQt
-            qimg=ImageQt(img); pix=QPixmap.fromImage(qimg); PreviewDialog(pix,self).exec()
-        except Exception as e: QMessageBox.critical(self,"Error",str(e))
+        if self._preview_dlg is None:
+            dlg=PreviewDialog(self); dlg.setAttribute(Qt.WA_DeleteOnClose)
+            dlg.destroyed.connect(lambda *_: setattr(self,"_preview_dlg",None)); self._preview_dlg=dlg
+        self._preview_dlg.show(); self._preview_dlg.raise_(); self._preview_dlg.activateWindow(); self._preview_dlg.schedule()
+    def _preview_changed(self):
+        # dipanggil setiap field/data/template berubah → preview live ikut refresh (debounced)
+        if self._preview_dlg is not None: self._preview_dlg.schedule()
 
     def generate_all(self):
+        if self._gen_thread is not None: return  # batch masih berjalan
         if not self.template_path: QMessageBox.warning(self,"No template","Silakan load template dulu."); return
         if not self.dataset: QMessageBox.information(self,"Data kosong","Isi data di Manage Data."); return
         self._push_selected_panel_to_field()
-
-        out_dir=self._select_output_dir()
-        if not out_dir: return
+        from batch import TIMING_REPORT
+        from manifest import MANIFEST_NAME
 
         fmt=self.format_combo.currentText().lower().strip()
-        fallback_field=self.filename_field.currentText().strip() or (self._field_names()[0] if self.fields else "output")
-        fields=[asdict(f) for f in self.fields]; cnt=0
-        for idx,row in enumerate(self.dataset, start=1):
-            base=self._render_filename_from_pattern(row, idx, fallback_field)
-            out=os.path.join(out_dir, f"{base}.pdf" if fmt=="pdf" else f"{base}.png")
-            try: draw_certificate(self.template_path, fields, row, out, fmt=fmt); cnt+=1
-            except Exception as e: QMessageBox.warning(self,"Render error",f"Row {idx}: {e}")
-        QMessageBox.information(self,"Selesai",f"Generated {cnt} file(s) ke:\n{out_dir}")
+        fields=[asdict(f) for f in self.fields]
+        self._gen_planner=None
+        if fmt==COMBINED_PDF:
+            # satu file → pilih nama file, bukan folder
+            out,_=QFileDialog.getSaveFileName(self,"Save combined PDF","certificates.pdf","PDF (*.pdf)")
+            if not out: return
+            out_dir=os.path.dirname(out); jobs=((row,out) for row in self.dataset.iter_rows())
+        else:
+            zip_mode=self.chk_zip.isChecked()
+            if zip_mode:
+                out,_=QFileDialog.getSaveFileName(self,"Save ZIP","certificates.zip","ZIP (*.zip)")
+                if not out: return
+                if not out.lower().endswith(".zip"): out+=".zip"
+                out_dir=os.path.dirname(out)
+            else:
+                out_dir=self._select_output_dir()
+                if not out_dir: return
+            fallback_field=self.filename_field.currentText().strip() or (self._field_names()[0] if self.fields else "output")
+            # semua path dihitung di depan: pattern dikompilasi sekali, nama duplikat diberi akhiran, subfolder opsional
+            group=self.group_field.currentText().strip()
+            shard={"hash":"hash","field":f"field:{group}" if group else ""}.get(self.shard_combo.currentData(),"")
+            planner=OutputPlanner(self.pattern_edit.text(),fallback_field,output_extension(fmt),shard=shard); ds=self.dataset
+            def jobs():
+                # di thread worker: plan path (satu pass atas seluruh dataset) + buat subfolder → GUI tidak beku
+                paths=planner.plan(ds.iter_rows())
+                if not zip_mode: OutputPlanner.make_dirs(out_dir,paths)
+                # ZIP: path job = nama entry di dalam arsip
+                # baris dibaca per halaman selagi batch berjalan (SqliteDataset: tidak dimuat semua ke memori)
+                return ((row, rel if zip_mode else os.path.join(out_dir,rel)) for row,rel in zip(ds.iter_rows(),paths))
+            self._gen_planner=planner
+
+        total=len(self.dataset)
+        dlg=QProgressDialog("Menyiapkan…","Cancel",0,total,self)
+        dlg.setWindowTitle("Generate"); dlg.setWindowModality(Qt.WindowModal); dlg.setMinimumDuration(0); dlg.setAutoClose(False); dlg.setAutoReset(False)
+        dlg.setValue(0)
+        quality=self.spin_quality.value() if self.spin_quality.isEnabled() else None
+        zip_path=out if fmt!=COMBINED_PDF and self.chk_zip.isChecked() else ""
+        manifest=os.path.join(out_dir,MANIFEST_NAME) if fmt!=COMBINED_PDF and not zip_path and self.chk_incremental.isChecked() else None
+        worker=GenerateWorker(self.template_path,fields,jobs,fmt,self.spin_workers.value(),quality,os.path.join(out_dir,TIMING_REPORT),manifest,zip_path,self.chk_pipeline.isChecked(),total)
+        thread=QThread(self); worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.progress.connect(self._on_generate_progress)
+        worker.finished.connect(self._on_generate_finished)
+        worker.finished.connect(thread.quit); thread.finished.connect(worker.deleteLater); thread.finished.connect(thread.deleteLater)
+        dlg.canceled.connect(lambda: (worker.cancel(), dlg.setLabelText("Membatalkan…")))
+        self._gen_thread, self._gen_worker, self._gen_progress = thread, worker, dlg
+        self._gen_started=time.perf_counter(); self._gen_out_dir=out_dir; self._gen_target=zip_path or out_dir; self.btn_generate.setEnabled(False)
+        thread.start()
+
+    def _on_generate_progress(self,done:int,total:int):
+        dlg=self._gen_progress
+        if dlg is None or dlg.wasCanceled(): return
+        el=time.perf_counter()-self._gen_started; rate=done/el if el>0 else 0.0
+        eta=_fmt_eta((total-done)/rate) if rate>0 else "--:--"
+        dlg.setValue(done); dlg.setLabelText(f"{done}/{total} · {rate:.1f} rows/s · ETA {eta}")
+
+    def _on_generate_finished(self,res):
+        out_dir=self._gen_out_dir
+        if self._gen_progress is not None: self._gen_progress.close(); self._gen_progress.deleteLater()
+        self._gen_thread=self._gen_worker=self._gen_progress=None; self.btn_generate.setEnabled(True)
+        if isinstance(res,Exception): QMessageBox.critical(self,"Error",str(res)); return
+        renamed=self._gen_planner.renamed if self._gen_planner is not None else 0
+        if renamed: self.statusBar().showMessage(f"{renamed} nama file duplikat → diberi akhiran -2, -3, ...",8000)
+        head="Dibatalkan." if res.cancelled else "Selesai."
+        if res.cancelled and self._gen_target.lower().endswith(".zip"): head="Dibatalkan, ZIP tidak disimpan."
+        skip=f"\n{res.skipped} baris tidak berubah (di-skip)." if res.skipped else ""
+        msg=f"{head} Generated {res.done} file(s) ke:\n{self._gen_target}\n({res.elapsed:.1f}s · {res.rows_per_sec:.1f} rows/s){skip}"
+        failed=res.failed
+        if not failed: QMessageBox.information(self,"Selesai",msg); return
+        box=QMessageBox(QMessageBox.Warning,"Selesai dengan error",f"{msg}\n\n{len(failed)} baris gagal.",QMessageBox.Ok,self)
+        box.setDetailedText("\n".join(f"Row {r.index}: {r.error}" for r in failed))
+        btn_save=box.addButton("Save Report…",QMessageBox.ActionRole)
+        box.exec()
+        if box.clickedButton() is btn_save: self._save_error_report(failed,out_dir)
+
+    def _save_error_report(self,failed,out_dir:str):
+        import csv
+        path,_=QFileDialog.getSaveFileName(self,"Save error report",os.path.join(out_dir,"errors.csv"),"CSV (*.csv)")
+        if not path: return
+        try:
+            with open(path,"w",encoding="utf-8",newline="") as f:
+                w=csv.writer(f); w.writerow(["row","output","error"]); [w.writerow([r.index,r.out_path,r.error]) for r in failed]
+        except Exception as e: QMessageBox.critical(self,"Error",str(e))
+
+    def closeEvent(self,e):
+        # batalkan batch yang berjalan sebelum window ditutup
+        if self._gen_thread is not None:
+            self._gen_worker.cancel(); self._gen_thread.quit(); self._gen_thread.wait()
+        if self._preview_dlg is not None: self._preview_dlg.close()
+        self.dataset.close()
+        super().closeEvent(e)
 
     # ---------- presisi ----------
     def _apply_snap(self,x,y):
@@ -767,12 +986,12 @@ class Main(QMainWindow):
         self.spin_x.blockSignals(True); self.spin_y.blockSignals(True)
         self.spin_x.setValue(int(x)); self.spin_y.setValue(int(y))
         self.spin_x.blockSignals(False); self.spin_y.blockSignals(False)
-        self._update_overlay_for_item(it)
+        self._update_overlay_for_item(it); self._preview_changed()
     def _spins_changed(self):
         it=self._selected_item()
         if not it: return
         x,y=self._apply_snap(self.spin_x.value(), self.spin_y.value())
-        it.field.x, it.field.y = x,y; it.setPos(x*self.sf,y*self.sf); self._update_overlay_for_item(it)
+        it.field.x, it.field.y = x,y; it.setPos(x*self.sf,y*self.sf); self._update_overlay_for_item(it); self._preview_changed()
     def _on_nudge(self,dx,dy):
         it=self._selected_item()
         if not it: return
@@ -781,15 +1000,32 @@ class Main(QMainWindow):
         self.spin_x.blockSignals(True); self.spin_y.blockSignals(True)
         self.spin_x.setValue(int(x)); self.spin_y.setValue(int(y))
         self.spin_x.blockSignals(False); self.spin_y.blockSignals(False)
-        self._update_overlay_for_item(it)
+        self._update_overlay_for_item(it); self._preview_changed()
 
 
 def main():
     import sys
     app=QApplication(sys.argv)
+    start_font_index()  # index font dibangun di background, lookup berikutnya O(1)
     apply_fresh_theme(app, mode="dark")
     w=Main(); w.show()
     sys.exit(app.exec())
 
+CHECK_IMAGES_ENV="SERTIFIKITA_CHECK_IMAGES"  # scripts/check_bundle.py: daftar path (os.pathsep), tanpa window
+
+def _check_images(paths:List[str])->int:
+    # buka template lewat renderer di app hasil PyInstaller → plugin Pillow yang di-import lazy
+    # (mis. TiffImagePlugin untuk EXIF, MpoImagePlugin) ketahuan hilang sebelum rilis
+    from renderer import prepare_template
+    ok=True
+    for p in paths:
+        try: t=prepare_template(p); print(f"ok {p} {t.format} {t.width}x{t.height}",flush=True)
+        except Exception as e: ok=False; print(f"FAIL {p}: {e.__class__.__name__}: {e}",flush=True)
+    return 0 if ok else 1
+
 if __name__=="__main__":
+    # wajib untuk process pool di app hasil PyInstaller
+    import multiprocessing, sys
+    multiprocessing.freeze_support()
+    if os.environ.get(CHECK_IMAGES_ENV): sys.exit(_check_images(os.environ[CHECK_IMAGES_ENV].split(os.pathsep)))
     main()
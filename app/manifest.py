@@ -0,0 +1,115 @@
+"""
+Manifest output untuk generate inkremental (tanpa Qt).
+
+File sertifikita_manifest.json di folder output menyimpan:
+- hash konfigurasi: isi template + field hasil kompilasi (termasuk file font) + format/quality
+- hash tiap baris, per path output (relatif ke folder output)
+Run berikutnya hanya me-render baris yang hash-nya berubah atau file output-nya hilang.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from renderer import RenderPlan
+
+MANIFEST_NAME = "sertifikita_manifest.json"
+# naikkan bila output renderer berubah untuk input yang sama → semua baris di-render ulang
+_MANIFEST_VERSION = 1
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def config_hash(template_path: str, plan: RenderPlan, fmt: str, quality: Optional[int]) -> str:
+    fonts = {}
+    for f in plan.fields:
+        if f.font_key not in fonts and os.path.isfile(f.font_key):
+            st = os.stat(f.font_key)
+            fonts[f.font_key] = [st.st_size, st.st_mtime_ns]
+    try:
+        tpl_hash = _file_hash(template_path)
+    except OSError as e:
+        # dipanggil sebelum render apa pun → pesan jelas, bukan traceback FileNotFoundError
+        raise ValueError(f"Template tidak bisa dibaca: {template_path} ({e.strerror or e})") from e
+    cfg = {
+        "version": _MANIFEST_VERSION,
+        "template": tpl_hash,
+        "fields": [asdict(f) for f in plan.fields],
+        "fonts": fonts,
+        "format": (fmt or "png").lower().strip(),
+        "quality": quality,
+    }
+    return _sha1(json.dumps(cfg, sort_keys=True, default=str).encode("utf-8"))
+
+def row_hash(row: Mapping[str, str]) -> str:
+    # dict(): baris bisa berupa view (dataset.RowView), bukan dict
+    return _sha1(json.dumps(dict(row), sort_keys=True, ensure_ascii=False).encode("utf-8"))
+
+
+class Manifest:
+    """
+    State inkremental satu folder output.
+    - split(jobs): pisahkan job yang perlu di-render vs yang bisa di-skip
+    - record(path): tandai baris sukses; save(): tulis manifest (hanya baris run ini)
+    """
+
+    def __init__(self, path: str, config: str):
+        self.path = path
+        self.config = config
+        self._root = os.path.dirname(os.path.abspath(path))
+        self._old: Dict[str, str] = {}
+        self._new: Dict[str, str] = {}
+        self._pending: Dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: str, config: str) -> "Manifest":
+        m = cls(path, config)
+        try:
+            with open(path, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return m
+        # konfigurasi berubah (template/field/format) → semua baris kotor
+        if isinstance(data, dict) and data.get("config") == config and isinstance(data.get("rows"), dict):
+            m._old = {str(k): str(v) for k, v in data["rows"].items()}
+        return m
+
+    def _key(self, out_path: str) -> str:
+        return os.path.relpath(os.path.abspath(out_path), self._root).replace(os.sep, "/")
+
+    def split(self, jobs: List[Tuple[int, Dict[str, str], str]]):
+        """→ (job yang perlu di-render, job yang tidak berubah)."""
+        todo, same = [], []
+        for job in jobs:
+            _, row, out_path = job
+            key, h = self._key(out_path), row_hash(row)
+            if self._old.get(key) == h and os.path.exists(out_path):
+                self._new[key] = h
+                same.append(job)
+            else:
+                self._pending[key] = h
+                todo.append(job)
+        return todo, same
+
+    def record(self, out_path: str):
+        key = self._key(out_path)
+        h = self._pending.pop(key, None)
+        if h is not None:
+            self._new[key] = h
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump({"config": self.config, "rows": self._new}, fp, ensure_ascii=False)
+        os.replace(tmp, self.path)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+_RE_INDEX = re.compile(r"\{index(?::(\d+))?\}")
+_RE_FIELD = re.compile(r"\{([^{}:]+)\}")
+
+
+def render_filename(pattern: str, row: Dict[str, str], idx: int, fallback_field: str) -> str:
+    """
+    Nama file (tanpa ekstensi) dari pattern, mis. "{index:03}_{Name}".
+    - {index} / {index:03}: nomor baris (1-based)
+    - {FieldName}: nilai kolom pada baris
+    Pattern kosong → pakai nilai fallback_field.
+    """
+    pat = (pattern or "").strip()
+    if not pat:
+        return row.get(fallback_field, f"row_{idx}") or f"row_{idx}"
+
+    # {index} or {index:03}
+    def repl_index(m):
+        pad = m.group(1)
+        return f"{idx:0{int(pad)}d}" if pad else str(idx)
+    s = _RE_INDEX.sub(repl_index, pat)
+
+    # {FieldName}
+    def repl_field(m):
+        key = m.group(1)
+        return str(row.get(key, "")).strip()
+    s = _RE_FIELD.sub(repl_field, s)
+
+    s = s or f"row_{idx}"
+    return _safe_name(s) or f"row_{idx}"
+
+
+def _safe_name(s: str) -> str:
+    return "".join(c for c in s if c.isalnum() or c in "-_ ").strip().replace(" ","_")
+
+def _nested(pattern: str) -> bool:
+    # "{" / "}" literal yang mengapit {index} ikut membentuk {FieldName} setelah substitusi
+    # (mis. "{{index}}") → kasus langka ini tetap lewat render_filename agar hasilnya sama persis
+    return any("\0" in m.group(1) for m in _RE_FIELD.finditer(_RE_INDEX.sub("\0", pattern)))
+
+
+class CompiledPattern:
+    """
+    Pattern nama file yang di-parse sekali: list potongan literal / index / field.
+    render(row, idx) menghasilkan nama yang sama dengan render_filename, tanpa regex per baris.
+    """
+
+    def __init__(self, pattern: str, fallback_field: str):
+        self.pattern = (pattern or "").strip()
+        self.fallback_field = fallback_field
+        self._slow = _nested(self.pattern)
+        # ("lit", teks) / ("idx", pad) / ("fld", nama kolom)
+        self._parts: List[Tuple[str, Any]] = []
+        pos = 0
+        for m in _RE_INDEX.finditer(self.pattern):
+            self._literal(self.pattern[pos:m.start()])
+            self._parts.append(("idx", int(m.group(1)) if m.group(1) else 0))
+            pos = m.end()
+        self._literal(self.pattern[pos:])
+
+    def _literal(self, text: str):
+        pos = 0
+        for m in _RE_FIELD.finditer(text):
+            if m.start() > pos: self._parts.append(("lit", text[pos:m.start()]))
+            self._parts.append(("fld", m.group(1)))
+            pos = m.end()
+        if pos < len(text): self._parts.append(("lit", text[pos:]))
+
+    def render(self, row: Dict[str, str], idx: int) -> str:
+        if not self.pattern or self._slow:
+            return render_filename(self.pattern, row, idx, self.fallback_field)
+        out = []
+        for kind, val in self._parts:
+            if kind == "lit": out.append(val)
+            elif kind == "idx": out.append(f"{idx:0{val}d}" if val else str(idx))
+            else: out.append(str(row.get(val, "")).strip())
+        return _safe_name("".join(out) or f"row_{idx}") or f"row_{idx}"
+
+
+class OutputPlanner:
+    """
+    Semua path output dihitung sebelum render dimulai.
+    - pattern dikompilasi sekali (CompiledPattern)
+    - nama bentrok (case-insensitive, aman untuk Windows/macOS) → akhiran -2, -3, ...
+    - shard opsional supaya satu folder tidak berisi puluhan ribu file:
+      "hash" / "hash:N" → subfolder N digit hex dari hash nama (default 2 → 256 folder),
+      "field:Kolom"     → subfolder per nilai kolom (mis. kelas / kursus)
+    """
+
+    def __init__(self, pattern: str, fallback_field: str, ext: str, shard: str = ""):
+        self.compiled = CompiledPattern(pattern, fallback_field)
+        self.ext = ext
+        self.shard = (shard or "").strip()
+        self.renamed = 0  # jumlah nama yang diberi akhiran karena duplikat
+        kind, _, arg = self.shard.partition(":")
+        if kind not in ("", "hash", "field") or (kind == "field" and not arg):
+            raise ValueError(f"Shard tidak dikenal: {self.shard} (pakai hash, hash:N, atau field:Kolom)")
+        self._shard_kind = kind
+        self._shard_arg = (max(1, min(8, int(arg))) if arg else 2) if kind == "hash" else arg
+
+    def _subdir(self, name: str, row: Dict[str, str]) -> str:
+        if self._shard_kind == "hash":
+            return hashlib.md5(name.encode("utf-8")).hexdigest()[:self._shard_arg]
+        if self._shard_kind == "field":
+            return _safe_name(str(row.get(self._shard_arg, ""))) or "_"
+        return ""
+
+    def plan(self, rows: Iterable[Dict[str, str]]) -> List[str]:
+        """→ path relatif (pemisah "/") per baris, urut sesuai rows; semuanya unik."""
+        used = set()
+        paths = []
+        self.renamed = 0
+        for idx, row in enumerate(rows, start=1):
+            name = self.compiled.render(row, idx)
+            sub = self._subdir(name, row)
+            base = f"{sub}/{name}" if sub else name
+            rel, n = base + self.ext, 1
+            while rel.lower() in used:
+                n += 1; rel = f"{base}-{n}{self.ext}"
+            if n > 1: self.renamed += 1
+            used.add(rel.lower())
+            paths.append(rel)
+        return paths
+
+    @staticmethod
+    def make_dirs(root: str, paths: Iterable[str]):
+        """Buat subfolder shard sekali di depan (bukan per file)."""
+        for d in sorted({os.path.dirname(p) for p in paths} - {""}):
+            os.makedirs(os.path.join(root, d), exist_ok=True)
@@ -0,0 +1,186 @@
+"""
+Pipeline render → encode → write (tanpa Qt).
+
+- tiap tahap thread sendiri, dihubungkan queue.Queue terbatas: selagi baris N ditulis
+  (mis. ke network share yang lambat), baris N+1 di-encode dan N+2 di-render
+- backpressure: jumlah baris in-flight dibatasi semaphore → memori tetap kecil
+  walau tahap write jauh lebih lambat
+- cancel: producer berhenti mengambil baris baru, baris yang sudah jalan diselesaikan
+  (tidak ada file setengah jadi), semua thread di-join sebelum run() kembali
+- jobs boleh berupa aliran panjang (mis. chunk demi chunk dari antrian batch): pipeline
+  tetap penuh di batas chunk; hasil bisa di-stream per baris lewat on_result
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from renderer import (
+    FieldsLike, StageTimer, _pdf_bytes, compile_plan, encode_image, output_extension, render_to_image,
+)
+from sinks import DirSink
+
+# (nomor baris, data baris, path output) — sama dengan batch.Job
+Job = Tuple[int, Dict[str, str], str]
+
+_DONE = object()  # sentinel antar tahap
+
+
+class _Item:
+    __slots__ = ("seq", "index", "path", "timer", "payload", "error")
+
+    def __init__(self, seq: int, index: int, path: str, timer: Optional[StageTimer]):
+        self.seq, self.index, self.path, self.timer = seq, index, path, timer
+        self.payload: Any = None  # Image (render) → bytes (encode)
+        self.error = ""
+
+
+def _err(e: BaseException) -> str:
+    return str(e) or e.__class__.__name__
+
+
+class RenderPipeline:
+    """
+    Render banyak baris dengan tahap yang saling tumpang tindih.
+    - sink: tujuan bytes (default DirSink → path output apa adanya)
+    - keep_bytes: tidak menulis apa pun, bytes dikembalikan dari run() (mis. untuk ZipSink di proses induk)
+    - encoders: jumlah thread encode (zlib/libjpeg/libwebp melepas GIL)
+    - queue_size: kapasitas antrian antar tahap
+    - engine: engine raster (lihat renderer.ENGINES)
+    PDF: render + encode terjadi sekaligus di tahap render (ReportLab), tahap encode diteruskan.
+    """
+
+    def __init__(
+        self,
+        template_path: str,
+        fields: FieldsLike,
+        fmt: str = "png",
+        quality: Optional[int] = None,
+        sink: Optional[Any] = None,
+        keep_bytes: bool = False,
+        encoders: int = 1,
+        queue_size: int = 4,
+        timing: bool = True,
+        engine: str = "pil",
+    ):
+        self.template_path = template_path
+        self.plan = compile_plan(fields)
+        self.fmt = (fmt or "png").lower().strip()
+        self.quality = quality
+        self.sink = None if keep_bytes else (sink if sink is not None else DirSink())
+        self.encoders = max(1, int(encoders))
+        self.queue_size = max(1, int(queue_size))
+        self.timing = timing
+        self.engine = engine
+        self._ext = output_extension(self.fmt)
+
+    # ---------- tahap ----------
+    def _render(self, jobs: Iterable[Job], q_enc: "queue.Queue", slots: threading.Semaphore,
+                stop: threading.Event):
+        try:
+            for seq, (idx, row, path) in enumerate(jobs):
+                slots.acquire()
+                if stop.is_set():
+                    slots.release(); break
+                # sama dengan draw_certificate: pastikan ekstensi sesuai format
+                if not path.lower().endswith(self._ext):
+                    path = os.path.splitext(path)[0] + self._ext
+                it = _Item(seq, idx, path, StageTimer() if self.timing else None)
+                try:
+                    if self.fmt == "pdf":
+                        it.payload = _pdf_bytes(self.template_path, self.plan, row, timer=it.timer)
+                    else:
+                        it.payload = render_to_image(self.template_path, self.plan, row, timer=it.timer, engine=self.engine)
+                except Exception as e:
+                    it.error = _err(e)
+                q_enc.put(it)
+        finally:
+            for _ in range(self.encoders):
+                q_enc.put(_DONE)
+
+    def _encode(self, q_enc: "queue.Queue", q_write: "queue.Queue"):
+        while True:
+            it = q_enc.get()
+            if it is _DONE:
+                q_write.put(_DONE); return
+            if not it.error and isinstance(it.payload, Image.Image):
+                if it.timer: it.timer.start()  # jangan hitung waktu tunggu di antrian
+                try:
+                    it.payload = encode_image(it.payload, self.fmt, self.quality)
+                except Exception as e:
+                    it.error, it.payload = _err(e), None
+                if it.timer: it.timer.lap("encode")
+            q_write.put(it)
+
+    def _write(self, q_write: "queue.Queue", slots: threading.Semaphore, done: Callable[[_Item], None]):
+        remaining = self.encoders
+        while remaining:
+            it = q_write.get()
+            if it is _DONE:
+                remaining -= 1; continue
+            if not it.error and self.sink is not None:
+                if it.timer: it.timer.start()
+                try:
+                    self.sink.write(it.path, it.payload)
+                except Exception as e:
+                    it.error = _err(e)
+                it.payload = None
+                if it.timer: it.timer.lap("write")
+            done(it)
+            slots.release()
+
+    # ---------- run ----------
+    def run(self, jobs: Iterable[Job], cancel: Optional[Callable[[], bool]] = None,
+            on_result: Optional[Callable[[Tuple["RowResult", Optional[bytes]]], None]] = None
+            ) -> List[Tuple["RowResult", Optional[bytes]]]:
+        """
+        Jalankan semua job; kembali setelah semua tahap selesai.
+        → [(RowResult, bytes|None)] urut sesuai jobs (bytes hanya bila keep_bytes).
+        cancel dicek sebelum tiap baris di-render; baris yang belum mulai tidak ada di hasil.
+        on_result: dipanggil (dari thread write) begitu tiap baris selesai, urutan selesai;
+        hasil tidak dikumpulkan dan run() mengembalikan [].
+        """
+        from batch import RowResult  # hindari import melingkar (batch memakai pipeline)
+
+        stop = threading.Event()
+        slots = threading.Semaphore(2 * self.queue_size + self.encoders + 1)
+        q_enc: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        q_write: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        out: List[_Item] = []
+
+        def _done(it: _Item):
+            if on_result is None:
+                out.append(it)
+            else:
+                on_result(_result(it))
+
+        def _result(it: _Item) -> Tuple["RowResult", Optional[bytes]]:
+            return (RowResult(it.index, it.path, it.error, it.timer.totals if it.timer else None),
+                    it.payload if self.sink is None and not it.error else None)
+
+        def _jobs():
+            for job in jobs:
+                if cancel and cancel():
+                    stop.set()
+                if stop.is_set():
+                    return
+                yield job
+
+        threads = [threading.Thread(target=self._encode, args=(q_enc, q_write), name=f"encode-{i}", daemon=True)
+                   for i in range(self.encoders)]
+        threads.append(threading.Thread(target=self._write, args=(q_write, slots, _done), name="write", daemon=True))
+        for t in threads:
+            t.start()
+        try:
+            # tahap render di thread pemanggil: cache template/font/tile tidak dibagi antar thread
+            self._render(_jobs(), q_enc, slots, stop)
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+        out.sort(key=lambda it: it.seq)
+        return [_result(it) for it in out]
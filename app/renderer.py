@@ -1,10 +1,144 @@
 from __future__ import annotations
 
+import io
+import math
 import os
-from typing import Dict, List, Tuple, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, List, Tuple, Any, Optional, Callable, Sequence, Union
 
 from PIL import Image, ImageDraw, ImageFont
 
+# profil encoder & ekstensi ada di formats.py (tanpa PIL); di-export ulang dari sini
+from formats import ENCODER_PROFILES, EncoderProfile, get_encoder_profile, output_extension
+from sinks import write_atomic
+
+
+# ========= Cache =========
+class _LRUCache:
+    """LRU kecil yang thread-safe, dengan counter hit/miss (opsional dibatasi total bobot)."""
+
+    def __init__(self, maxsize: int, maxweight: int = 0, weigh: Optional[Callable[[Any], int]] = None):
+        self.maxsize = max(1, int(maxsize))
+        self.maxweight = max(0, int(maxweight))
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._weigh = weigh
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _weight_of(self, value: Any) -> int:
+        return self._weigh(value) if self._weigh else 0
+
+    def get_or_create(self, key: Any, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # factory dijalankan di luar lock (decode/parse bisa lama)
+        value = factory()
+        with self._lock:
+            if key in self._data:
+                self.weight -= self._weight_of(self._data[key])
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self.weight += self._weight_of(value)
+            while len(self._data) > self.maxsize or (self.maxweight and self.weight > self.maxweight and len(self._data) > 1):
+                _, old = self._data.popitem(last=False)
+                self.weight -= self._weight_of(old)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = self.hits = self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            info = {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+            if self.maxweight:
+                info.update(weight=self.weight, maxweight=self.maxweight)
+            return info
+
+
+# ========= Template =========
+class PreparedTemplate:
+    """
+    Template yang sudah di-decode sekali dan siap dipakai ulang per baris.
+    - image: PIL.Image mode RGBA (jangan diubah; copy() dulu sebelum menggambar)
+    - rgb: versi RGB (dibuat saat pertama dibutuhkan, mis. untuk PDF)
+    - pdf_image(): sumber background untuk Canvas.drawImage (path JPEG / ImageReader)
+    - pixels(): array uint8 (H, W, 4) read-only untuk engine "numpy"
+    """
+
+    def __init__(self, path: str, mtime_ns: int):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        with Image.open(path) as src:
+            self.format = src.format or ""
+            self.mode = src.mode
+            self.image = src.convert("RGBA")
+        self.size: Tuple[int, int] = self.image.size
+        self._rgb: Optional[Image.Image] = None
+        self._pdf_image = None
+        self._pixels = None
+        self.opaque = True  # tidak ada pixel alpha 0 (diisi oleh pixels())
+        self._lock = threading.Lock()
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    @property
+    def rgb(self) -> Image.Image:
+        with self._lock:
+            if self._rgb is None:
+                self._rgb = self.image.convert("RGB")
+            return self._rgb
+
+    def pixels(self):
+        # layout RGBA = layout internal Pillow untuk RGB (4 byte/pixel) → bisa di-map tanpa konversi
+        with self._lock:
+            if self._pixels is None:
+                arr = _numpy().array(self.image)
+                arr.flags.writeable = False
+                self.opaque = bool(arr[:, :, 3].min() > 0)
+                self._pixels = arr
+            return self._pixels
+
+    def pdf_image(self):
+        # sumber drawImage dibuat sekali (ImageReader menyimpan data RGB-nya), dipakai di setiap PDF
+        rgb = self.rgb
+        with self._lock:
+            if self._pdf_image is None:
+                self._pdf_image = _pdf_image_source(self, rgb)
+            return self._pdf_image
+
+
+_TEMPLATE_CACHE = _LRUCache(maxsize=4)
+
+def prepare_template(template_path: str) -> PreparedTemplate:
+    """
+    Ambil template yang sudah di-decode dari cache (key: path + mtime).
+    File yang diubah di disk otomatis di-decode ulang.
+    """
+    path = os.path.abspath(template_path)
+    mtime_ns = os.stat(path).st_mtime_ns
+    return _TEMPLATE_CACHE.get_or_create((path, mtime_ns), lambda: PreparedTemplate(path, mtime_ns))
+
+def template_cache_info() -> Dict[str, int]:
+    return _TEMPLATE_CACHE.info()
+
+
 # ========= Helpers =========
 def _hex_to_rgb(hx: str) -> Tuple[int, int, int]:
     try:
@@ -20,20 +154,37 @@ def _hex_to_rgb(hx: str) -> Tuple[int, int, int]:
     except Exception:
         return (0, 0, 0)
 
-def _load_font(path: Optional[str], size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+_FONT_CACHE = _LRUCache(maxsize=64)
+_FALLBACK_FONT = "DejaVuSans.ttf"
+
+def _resolve_font_key(path: Optional[str]) -> str:
     # Prioritas: font_path valid → DejaVuSans (bundled Pillow) → default
     if path and os.path.isfile(path):
+        return os.path.realpath(path)
+    return _FALLBACK_FONT
+
+def _open_font(key: str, size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    if key != _FALLBACK_FONT:
         try:
-            return ImageFont.truetype(path, size=size)
+            return ImageFont.truetype(key, size=size)
         except Exception:
             pass
     try:
         # DejaVuSans hampir selalu tersedia bersama Pillow
-        from PIL import ImageFont
-        return ImageFont.truetype("DejaVuSans.ttf", size=size)
+        return ImageFont.truetype(_FALLBACK_FONT, size=size)
     except Exception:
         return ImageFont.load_default()
 
+def _load_font(path: Optional[str], size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    return _load_font_key(_resolve_font_key(path), size)
+
+def _load_font_key(key: str, size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    # cache per (path resolved, size) → file TTF hanya di-parse sekali
+    return _FONT_CACHE.get_or_create((key, size), lambda: _open_font(key, size))
+
+def font_cache_info() -> Dict[str, int]:
+    return _FONT_CACHE.info()
+
 def _text_size(font: ImageFont.FreeTypeFont, text: str) -> Tuple[int, int]:
     # gunakan getbbox agar akurat
     if not text:
@@ -47,6 +198,62 @@ def _text_size(font: ImageFont.FreeTypeFont, text: str) -> Tuple[int, int]:
         # fallback
         return font.getsize(text)
 
+class _TextTile:
+    """Teks yang sudah di-raster jadi mask "L" (tanpa warna) + offset dari titik origin."""
+    __slots__ = ("width", "mask", "left", "top", "_arr")
+
+    def __init__(self, width: int, mask: Optional[Image.Image], left: int, top: int):
+        self.width = width
+        self.mask = mask
+        self.left = left
+        self.top = top
+        self._arr = None
+
+    def array(self):
+        # mask sebagai array uint16 (H, W, 1) siap blend; dibuat sekali per tile
+        if self._arr is None:
+            self._arr = _numpy().asarray(self.mask, dtype="uint16")[:, :, None]
+        return self._arr
+
+    @property
+    def nbytes(self) -> int:
+        return self.mask.width * self.mask.height if self.mask is not None else 0
+
+
+# Nilai kolom yang berulang (nama kursus, tanggal, penandatangan, ...) cukup
+# di-layout & di-raster sekali; baris berikutnya hanya paste mask + warna.
+_TILE_CACHE = _LRUCache(maxsize=4096, maxweight=64 * 1024 * 1024, weigh=lambda t: t.nbytes)
+_SUBPIXEL = 64  # posisi pecahan dikuantisasi ke 1/64 px (presisi FreeType 26.6)
+
+def _make_text_tile(font, text: str, fx: float, fy: float) -> _TextTile:
+    tw, _ = _text_size(font, text)
+    if hasattr(font, "getmask2"):
+        # sama persis dengan draw.text: FreeType menerima pecahan bertanda (modf), origin int()
+        core, (ox, oy) = font.getmask2(text, "L", start=(fx, fy))
+        mask = Image.new("L", core.size, 0)
+        ImageDraw.Draw(mask).draw.draw_bitmap((0, 0), core, 255)
+    else:
+        # font bitmap (load_default tanpa FreeType): tidak ada posisi sub-pixel
+        left, top, right, bottom = (int(v) for v in font.getbbox(text))
+        ox, oy = min(0, left), min(0, top)
+        mask = Image.new("L", (max(right, 0) - ox + 1, max(bottom, 0) - oy + 1), 0)
+        ImageDraw.Draw(mask).text((-ox, -oy), text, font=font, fill=255)
+    bb = mask.getbbox()
+    if not bb:
+        return _TextTile(tw, None, 0, 0)
+    return _TextTile(tw, mask.crop(bb), ox + bb[0], oy + bb[1])
+
+def _text_tile(font_key: str, size: int, font, text: str, fx: float = 0.0, fy: float = 0.0) -> _TextTile:
+    # mask tidak bergantung warna → satu tile dipakai untuk semua warna
+    qx, qy = round(fx * _SUBPIXEL), round(fy * _SUBPIXEL)
+    return _TILE_CACHE.get_or_create(
+        (font_key, size, text, qx, qy),
+        lambda: _make_text_tile(font, text, qx / _SUBPIXEL, qy / _SUBPIXEL),
+    )
+
+def text_tile_cache_info() -> Dict[str, int]:
+    return _TILE_CACHE.info()
+
 def _place_x(x: float, w_box: int, w_text: int, align: str) -> float:
     a = (align or "left").strip().lower()
     if w_box and w_box > 0:
@@ -59,144 +266,566 @@ def _place_x(x: float, w_box: int, w_text: int, align: str) -> float:
     # tanpa box width (tight): treat as left
     return x
 
+# ========= Render plan =========
+@dataclass(frozen=True)
+class FieldSpec:
+    """Satu field yang sudah di-parse: warna RGB, align ter-normalisasi, font ter-resolve."""
+    name: str
+    x: float
+    y: float
+    size: int
+    color: Tuple[int, int, int]
+    align: str
+    box_width: int
+    font_key: str   # path font (realpath) atau DejaVuSans fallback, untuk raster
+    pdf_font: str   # path font valid untuk PDF, "" → Helvetica
+
+    @classmethod
+    def from_dict(cls, f: Dict[str, Any]) -> "FieldSpec":
+        font_path = f.get("font_path") or ""
+        align = str(f.get("align", "left") or "left").strip().lower()
+        font_key = _resolve_font_key(font_path)
+        return cls(
+            name=str(f.get("name", "")),
+            x=float(f.get("x", 0)),
+            y=float(f.get("y", 0)),
+            size=int(f.get("size", 32) or 32),
+            color=_hex_to_rgb(str(f.get("color", "#000000") or "#000000")),
+            align=align if align in ("left", "center", "right") else "left",
+            box_width=int(f.get("box_width", 0) or 0),
+            font_key=font_key,
+            pdf_font=font_key if font_key != _FALLBACK_FONT else "",
+        )
+
+
+class RenderPlan:
+    """
+    Daftar field yang dikompilasi sekali lalu dipakai untuk banyak baris.
+    Per baris hanya tersisa ukur teks + gambar; parsing warna, align,
+    pengecekan file font, dll. sudah dikerjakan di compile().
+
+        plan = RenderPlan.compile(fields)
+        for row in rows:
+            draw_certificate(template_path, plan, row, out_path)
+    """
+
+    def __init__(self, fields: Sequence[FieldSpec]):
+        self.fields: Tuple[FieldSpec, ...] = tuple(fields)
+        self._fonts: Optional[tuple] = None
+        self._pdf: Optional["PdfSession"] = None
+
+    @classmethod
+    def compile(cls, fields: Sequence[Dict[str, Any]]) -> "RenderPlan":
+        return cls(FieldSpec.from_dict(f) for f in fields)
+
+    @property
+    def names(self) -> List[str]:
+        return [f.name for f in self.fields]
+
+    def fonts(self) -> tuple:
+        # objek font di-resolve sekali per plan per proses (tidak ikut di-pickle)
+        if self._fonts is None:
+            self._fonts = tuple(_load_font_key(f.font_key, f.size) for f in self.fields)
+        return self._fonts
+
+    def pdf_session(self, template_path: str) -> "PdfSession":
+        # sesi PDF dibuat sekali per plan + template per proses (tidak ikut di-pickle)
+        s = self._pdf
+        if s is None or s.tpl is not prepare_template(template_path):
+            s = self._pdf = PdfSession(template_path, self)
+        return s
+
+    def scaled(self, s: float) -> "RenderPlan":
+        """Plan untuk kanvas yang diskalakan s (mis. preview draft); font tetap di-resolve ulang per ukuran."""
+        return RenderPlan(
+            replace(f, x=f.x * s, y=f.y * s, size=max(1, round(f.size * s)), box_width=round(f.box_width * s))
+            for f in self.fields
+        )
+
+    def __getstate__(self):
+        return {"fields": self.fields}
+
+    def __setstate__(self, state):
+        self.fields = state["fields"]
+        self._fonts = None
+        self._pdf = None
+
+    def __repr__(self):
+        return f"RenderPlan({list(self.fields)!r})"
+
+
+FieldsLike = Union[RenderPlan, Sequence[Dict[str, Any]]]
+
+def compile_plan(fields: FieldsLike) -> RenderPlan:
+    """RenderPlan dari list dict field; plan yang sudah jadi dikembalikan apa adanya."""
+    return fields if isinstance(fields, RenderPlan) else RenderPlan.compile(fields)
+
+
+# ========= Instrumentasi =========
+# urutan tahap per baris (PDF tidak punya "convert")
+STAGES = ("decode", "font", "layout", "draw", "convert", "encode", "write")
+
+class StageTimer:
+    """
+    Stopwatch per tahap render (detik). Cukup murah untuk selalu aktif:
+    satu perf_counter per tahap, tanpa alokasi per panggilan.
+    - mulai menghitung saat dibuat (atau start()); lap(stage) menambahkan waktu sejak lap sebelumnya
+    - totals: dict {stage: detik}, bisa langsung di-pickle dari worker proses
+    """
+    __slots__ = ("totals", "_t")
+
+    def __init__(self):
+        self.totals: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self._t = time.perf_counter()
+
+    def start(self):
+        self._t = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.totals[stage] += now - self._t
+        self._t = now
+
+
+# ========= Engine =========
+# "pil"  : kanvas RGBA di-copy, teks di-paste, lalu convert("RGB") (default, tanpa dependensi tambahan)
+# "numpy": base uint8 disimpan sekali; per baris satu copy + alpha blend di area teks saja,
+#          buffer langsung dipakai encoder tanpa convert (opsional, butuh numpy). Hasil pixel identik.
+ENGINES = ("pil", "numpy")
+
+def _numpy():
+    import numpy
+    return numpy
+
+def numpy_available() -> bool:
+    try:
+        _numpy()
+        return True
+    except ImportError:
+        return False
+
+def check_engine(engine: Optional[str]) -> str:
+    engine = (engine or "pil").lower().strip()
+    if engine not in ENGINES:
+        raise ValueError(f"Engine tidak dikenal: {engine} (pilih: {', '.join(ENGINES)})")
+    if engine == "numpy" and not numpy_available():
+        raise RuntimeError("Engine 'numpy' butuh paket numpy (pip install numpy)")
+    return engine
+
+
 # ========= Public API =========
 def render_to_image(
     template_path: str,
-    fields: List[Dict[str, Any]],
+    fields: FieldsLike,
     row: Dict[str, str],
+    timer: Optional[StageTimer] = None,
+    engine: str = "pil",
 ) -> Image.Image:
     """
     Menghasilkan PIL.Image dari template + field + satu baris data.
     - template_path: path gambar (PNG/JPG/WEBP)
-    - fields: list dict {name,x,y,size,color,align,font_path,box_width}
+    - fields: RenderPlan, atau list dict {name,x,y,size,color,align,font_path,box_width}
     - row: mapping {field_name: value}
+    - timer: StageTimer opsional (decode/font/layout/draw/convert)
+    - engine: "pil" atau "numpy" (lihat ENGINES)
     """
-    base = Image.open(template_path).convert("RGBA")
-    canvas = base.copy()
-    draw = ImageDraw.Draw(canvas)
+    plan = compile_plan(fields)
+    tpl = prepare_template(template_path)
+    if engine == "numpy":
+        return _render_numpy(tpl, plan, row, timer)
+    canvas = tpl.image.copy()
+    if timer: timer.lap("decode")
+    _draw_fields(canvas, plan, row, timer)
+
+    # pastikan kembali ke RGB (tanpa alpha) untuk kompatibilitas luas
+    rgb = canvas.convert("RGB")
+    if timer: timer.lap("convert")
+    return rgb
+
 
-    for f in fields:
-        name = f.get("name", "")
-        text = str(row.get(name, "") or "")
+def _placed_tiles(plan: RenderPlan, row: Dict[str, str], timer: Optional[StageTimer] = None):
+    """Layout semua field → (tile, x, y, color) top-left pixel mask; dipakai kedua engine."""
+    fonts = plan.fonts()
+    if timer: timer.lap("font")
+
+    for f, font in zip(plan.fields, fonts):
+        text = str(row.get(f.name, "") or "")
         if not text:
             continue
 
-        x = float(f.get("x", 0))
-        y = float(f.get("y", 0))
-        size = int(f.get("size", 32) or 32)
-        color = _hex_to_rgb(str(f.get("color", "#000000") or "#000000"))
-        align = str(f.get("align", "left") or "left")
-        font_path = f.get("font_path") or ""
-        box_width = int(f.get("box_width", 0) or 0)
+        # split origin / pecahan sama dengan draw.text: int() + modf (pecahan negatif untuk
+        # koordinat negatif), tile di-raster dengan pecahan itu → pixel identik
+        ty = f.y  # pos dihitung sebagai top-left (sesuai kanvas)
+        fy, iy = math.modf(ty); iy = int(iy)
+        tile = _text_tile(f.font_key, f.size, font, text, 0.0, fy)
+        tx = _place_x(f.x, f.box_width, tile.width, f.align)
+        fx, ix = math.modf(tx); ix = int(ix)
+        if fx:
+            tile = _text_tile(f.font_key, f.size, font, text, fx, fy)
+        if timer: timer.lap("layout")  # termasuk raster tile saat cache miss
+        if tile.mask is not None:
+            yield tile, ix + tile.left, iy + tile.top, f.color
 
-        font = _load_font(font_path, size)
-        tw, th = _text_size(font, text)
-        tx = _place_x(x, box_width, tw, align)
-        ty = y  # pos dihitung sebagai top-left (sesuai kanvas)
 
-        # Gambar teks (Pillow text() default anchor = top-left)
-        draw.text((tx, ty), text, font=font, fill=color)
+def _draw_fields(canvas: Image.Image, plan: RenderPlan, row: Dict[str, str], timer: Optional[StageTimer] = None):
+    for tile, x, y, color in _placed_tiles(plan, row, timer):
+        # Paste mask teks (sama dengan draw.text anchor top-left, tapi mask dari cache)
+        canvas.paste(color + (255,), (x, y), tile.mask)
+        if timer: timer.lap("draw")
 
-    # pastikan kembali ke RGB (tanpa alpha) untuk kompatibilitas luas
-    return canvas.convert("RGB")
+
+def _render_numpy(tpl: PreparedTemplate, plan: RenderPlan, row: Dict[str, str],
+                  timer: Optional[StageTimer] = None) -> Image.Image:
+    np = _numpy()
+    buf = tpl.pixels().copy()
+    if timer: timer.lap("decode")
+    h, w = buf.shape[:2]
+    for tile, x, y, color in _placed_tiles(plan, row, timer):
+        m = tile.array()
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + m.shape[1], w), min(y + m.shape[0], h)
+        if x0 < x1 and y0 < y1:
+            m = m[y0 - y:y1 - y, x0 - x:x1 - x]
+            if tpl.opaque:
+                _blend(buf[y0:y1, x0:x1, :3], m, np.array(color, np.uint16))
+            else:
+                # Pillow: di pixel kanvas RGBA yang transparan penuh (alpha 0), warna teks ditimpa penuh
+                dst = buf[y0:y1, x0:x1]
+                mc = np.where((dst[:, :, 3:] == 0) & (m != 0), np.uint16(255), m)
+                _blend(dst[:, :, :3], mc, np.array(color, np.uint16))
+                _blend(dst[:, :, 3:], m, np.uint16(255))
+        if timer: timer.lap("draw")
+    img = _image_from_rgbx(buf)
+    if timer: timer.lap("convert")
+    return img
+
+def _blend(dst, m, ink):
+    # rumus blend Pillow (paste warna + mask "L"), pembulatan sama → pixel identik
+    t = dst * (255 - m) + ink * m + 128
+    dst[...] = (t + (t >> 8)) >> 8
+
+def _image_from_rgbx(buf) -> Image.Image:
+    """Array (H, W, 4) → Image RGB (byte ke-4 dibuang)."""
+    h, w = buf.shape[:2]
+    # API publik: satu copy lewat unpacker RGBX (±4x lebih cepat dari fromarray(buf[:, :, :3]))
+    return Image.frombytes("RGB", (w, h), buf, "raw", "RGBX")
+
+
+def encode_image(img: Image.Image, fmt: str = "png", quality: Optional[int] = None) -> bytes:
+    """Encode gambar ke bytes memakai profil encoder (tanpa menulis ke disk)."""
+    profile = get_encoder_profile(fmt)
+    buf = io.BytesIO()
+    img.save(buf, profile.pil_format, **profile.save_params(quality))
+    return buf.getvalue()
+
+def _write_bytes(out_path: str, data: bytes):
+    # .part → os.replace: file output tidak pernah terlihat setengah jadi
+    write_atomic(out_path, data)
 
 
 def draw_certificate(
     template_path: str,
-    fields: List[Dict[str, Any]],
+    fields: FieldsLike,
     row: Dict[str, str],
     out_path: str,
     fmt: str = "png",
+    quality: Optional[int] = None,
+    timer: Optional[StageTimer] = None,
+    engine: str = "pil",
 ):
     """
     Render dan simpan ke file.
-    - fmt: 'png' atau 'pdf'
+    - fields: RenderPlan atau list dict field
+    - fmt: 'pdf' atau nama profil encoder (lihat ENCODER_PROFILES: png, png-fast, png-small, jpeg, webp)
+    - quality: 1-100 untuk jpeg/webp (None → default profil)
+    - timer: StageTimer opsional; encode (ke memori) dan write (ke disk) dicatat terpisah
+    - engine: engine raster (lihat ENGINES); diabaikan untuk PDF
     """
     fmt = (fmt or "png").lower().strip()
     if fmt == "pdf":
-        _save_as_pdf(template_path, fields, row, out_path)
+        _save_as_pdf(template_path, fields, row, out_path, timer=timer)
     else:
-        img = render_to_image(template_path, fields, row)
+        profile = get_encoder_profile(fmt)
+        data = render_bytes(template_path, fields, row, fmt, quality, timer, engine)
         # pastikan ekstensi
-        if not out_path.lower().endswith(".png"):
-            out_path = os.path.splitext(out_path)[0] + ".png"
-        img.save(out_path, "PNG")
+        if not out_path.lower().endswith(profile.ext):
+            out_path = os.path.splitext(out_path)[0] + profile.ext
+        _write_bytes(out_path, data)
+        if timer: timer.lap("write")
 
 
-# ========= PDF (ReportLab) =========
-def _save_as_pdf(
+def render_bytes(
     template_path: str,
-    fields: List[Dict[str, Any]],
+    fields: FieldsLike,
     row: Dict[str, str],
-    out_path: str,
-):
-    from reportlab.pdfgen import canvas as pdfcanvas
-    from reportlab.lib.utils import ImageReader
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
+    fmt: str = "png",
+    quality: Optional[int] = None,
+    timer: Optional[StageTimer] = None,
+    engine: str = "pil",
+) -> bytes:
+    """
+    Seperti draw_certificate, tapi hasil file (PNG/JPEG/WEBP/PDF) dikembalikan sebagai bytes
+    tanpa menulis ke disk (mis. untuk ZIP / sink lain).
+    """
+    fmt = (fmt or "png").lower().strip()
+    if fmt == "pdf":
+        return _pdf_bytes(template_path, fields, row, timer=timer)
+    img = render_to_image(template_path, fields, row, timer=timer, engine=engine)
+    data = encode_image(img, fmt, quality)
+    if timer: timer.lap("encode")
+    return data
 
-    # Muat template untuk tahu ukuran
-    base = Image.open(template_path).convert("RGB")
-    w_px, h_px = base.size
 
-    # Buat canvas ukuran pixel-1:1 (ReportLab pakai point; asumsikan 72dpi ~ pixel)
-    c = pdfcanvas.Canvas(out_path, pagesize=(w_px, h_px))
+# ========= Draft (preview) =========
+class DraftBase:
+    """Template yang sudah diperkecil untuk preview: image RGBA + skala terhadap ukuran asli."""
+    __slots__ = ("image", "scale")
 
-    # Lukis background
-    c.drawImage(ImageReader(base), 0, 0, width=w_px, height=h_px, preserveAspectRatio=False, mask='auto')
+    def __init__(self, image: Image.Image, scale: float):
+        self.image = image
+        self.scale = scale
 
-    # cache font terdaftar agar tidak double-register
-    registered = set(pdfmetrics.getRegisteredFontNames())
+_DRAFT_CACHE = _LRUCache(maxsize=4)
+_DRAFT_STEP = 256  # ukuran target dibulatkan ke atas → resize dialog tidak selalu decode ulang
 
-    for f in fields:
-        name = f.get("name", "")
-        text = str(row.get(name, "") or "")
-        if not text:
-            continue
+def _open_draft(path: str, max_w: int, max_h: int) -> DraftBase:
+    with Image.open(path) as src:
+        full_w, full_h = src.size
+        s = min(1.0, max_w / full_w, max_h / full_h)
+        tw, th = max(1, round(full_w * s)), max(1, round(full_h * s))
+        if src.format == "JPEG" and s < 1.0:
+            # JPEG: decoder DCT langsung di 1/2, 1/4, 1/8 (hasil ≥ target), jauh lebih murah dari full decode
+            src.draft("RGB" if src.mode == "RGB" else None, (tw, th))
+        img = src.convert("RGBA")
+    if img.size != (tw, th):
+        # reducing_gap → reduce() integer yang cepat dulu, lalu resample halus sisanya
+        img = img.resize((tw, th), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    return DraftBase(img, tw / full_w)
 
-        x = float(f.get("x", 0))
-        y = float(f.get("y", 0))
-        size = int(f.get("size", 32) or 32)
-        color = _hex_to_rgb(str(f.get("color", "#000000") or "#000000"))
-        align = str(f.get("align", "left") or "left")
-        font_path = f.get("font_path") or ""
-        box_width = int(f.get("box_width", 0) or 0)
+def prepare_draft(template_path: str, max_size: Tuple[int, int]) -> DraftBase:
+    """Template versi kecil (muat di max_size) dari cache; key: path + mtime + ukuran dibulatkan."""
+    path = os.path.abspath(template_path)
+    mtime_ns = os.stat(path).st_mtime_ns
+    bw = max(_DRAFT_STEP, -(-int(max_size[0]) // _DRAFT_STEP) * _DRAFT_STEP)
+    bh = max(_DRAFT_STEP, -(-int(max_size[1]) // _DRAFT_STEP) * _DRAFT_STEP)
+    return _DRAFT_CACHE.get_or_create((path, mtime_ns, bw, bh), lambda: _open_draft(path, bw, bh))
+
+def render_draft(
+    template_path: str,
+    fields: FieldsLike,
+    row: Dict[str, str],
+    max_size: Tuple[int, int],
+) -> Image.Image:
+    """
+    Preview cepat seukuran layar: base kecil dari cache + field diskalakan.
+    Hasil bisa sedikit lebih besar dari max_size (lihat _DRAFT_STEP); posisi teks
+    mengikuti render_to_image, ketajaman/kerning bisa beda tipis karena ukuran font dibulatkan.
+    """
+    base = prepare_draft(template_path, max_size)
+    canvas = base.image.copy()
+    _draw_fields(canvas, compile_plan(fields).scaled(base.scale), row)
+    return canvas.convert("RGB")
+
+
+def warm_caches(template_path: str, fields: FieldsLike, fmt: str = "png", engine: str = "pil"):
+    """
+    Isi cache template + font sekali di awal (mis. di tiap worker proses),
+    supaya baris pertama tidak menanggung biaya decode/parse.
+    """
+    tpl = prepare_template(template_path)
+    if (fmt or "png").lower().strip().startswith("pdf"):
+        tpl.pdf_image()
+    elif engine == "numpy":
+        tpl.pixels()
+    compile_plan(fields).fonts()
+
+
+# ========= PDF (ReportLab) =========
+_PDF_BG_FORM = "SertifikitaBackground"
 
-        # Pilih font
-        face = "Helvetica"
-        if font_path and os.path.isfile(font_path):
+def _pdf_image_source(tpl: PreparedTemplate, rgb: Image.Image):
+    # JPEG: nama file → ReportLab memakai byte DCT asli apa adanya (tanpa decode/encode ulang);
+    # selain JPEG: ImageReader dari RGB yang sudah di-decode (ReportLab meng-encode Flate per dokumen)
+    ext = os.path.splitext(tpl.path)[1].lower()
+    if tpl.format == "JPEG" and tpl.mode in ("RGB", "L") and ext in (".jpg", ".jpeg"):
+        return tpl.path
+    from reportlab.lib.utils import ImageReader
+    return ImageReader(rgb)
+
+def _pdf_config():
+    # stream biner (tanpa ASCII85): byte JPEG disalin apa adanya, PDF lebih kecil
+    from reportlab import rl_config
+    rl_config.useA85 = 0
+
+def _pdf_draw_background(c, tpl: PreparedTemplate):
+    # Background disimpan sekali sebagai Form XObject; tiap halaman cukup mereferensikannya
+    w_px, h_px = tpl.size
+    if not c.hasForm(_PDF_BG_FORM):
+        c.beginForm(_PDF_BG_FORM, 0, 0, w_px, h_px)
+        c.drawImage(tpl.pdf_image(), 0, 0, w_px, h_px)
+        c.endForm()
+    c.doForm(_PDF_BG_FORM)
+
+_PDF_FACES: Dict[str, str] = {}   # path font → nama face ReportLab (per proses)
+_PDF_FACES_LOCK = threading.Lock()
+
+def _pdf_face(font_path: str) -> str:
+    """
+    Daftarkan TTF sekali per proses; nama face unik per file (nama + hash path), jadi dua file
+    dengan basename sama (mis. Regular.ttf dari family berbeda) tidak saling menimpa.
+    Font gagal dibaca → Helvetica (dicatat juga, tidak dicoba ulang tiap baris).
+    """
+    if not font_path:
+        return "Helvetica"
+    face = _PDF_FACES.get(font_path)
+    if face is not None:
+        return face
+    import hashlib
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    with _PDF_FACES_LOCK:
+        face = _PDF_FACES.get(font_path)
+        if face is None:
+            stem = os.path.splitext(os.path.basename(font_path))[0]
+            face = f"{stem}-{hashlib.md5(font_path.encode('utf-8')).hexdigest()[:8]}"
             try:
-                font_key = os.path.basename(font_path)
-                name_no_ext = os.path.splitext(font_key)[0]
-                if name_no_ext not in registered:
-                    pdfmetrics.registerFont(TTFont(name_no_ext, font_path))
-                    registered.add(name_no_ext)
-                face = name_no_ext
+                pdfmetrics.registerFont(TTFont(face, font_path))
             except Exception:
                 face = "Helvetica"
+            _PDF_FACES[font_path] = face
+    return face
 
-        c.setFont(face, size)
-        c.setFillColorRGB(color[0]/255.0, color[1]/255.0, color[2]/255.0)
 
-        # Ukuran teks
-        tw = pdfmetrics.stringWidth(text, face, size)
-        if box_width and box_width > 0:
-            if align.lower() == "center":
-                tx = x + (box_width - tw) / 2.0
-            elif align.lower() == "right":
-                tx = x + (box_width - tw)
-            else:
-                tx = x
-        else:
-            tx = x
+class PdfSession:
+    """
+    State PDF yang dipakai ulang sepanjang batch (per proses): template, face, metrik, posisi.
+    - face tiap field didaftarkan sekali (lihat _pdf_face); warna, baseline y dan perlu-tidaknya
+      lebar teks dihitung di depan
+    - lebar string di-memo per (teks, face, ukuran)
+    Per baris tersisa: ambil teks, (lookup lebar), drawString.
+
+        session = RenderPlan.compile(fields).pdf_session(template_path)
+        for row in rows: data = session.render(row)
+    """
+
+    _MAX_WIDTHS = 65536  # batas memo lebar string (dikosongkan bila penuh)
+
+    def __init__(self, template_path: str, fields: FieldsLike):
+        from reportlab.pdfbase import pdfmetrics
+
+        self.plan = compile_plan(fields)
+        self.tpl = prepare_template(template_path)
+        self.tpl.pdf_image()  # sumber background sekali
+        _pdf_config()
+        self.size = self.tpl.size
+        h_px = self.tpl.height
+        self._string_width = pdfmetrics.stringWidth
+        self._widths: Dict[Tuple[str, str, int], float] = {}
+        self._fields = tuple(
+            (f.name, _pdf_face(f.pdf_font), f.size, tuple(c / 255.0 for c in f.color), f.x, f.box_width, f.align,
+             # ReportLab drawString menempatkan baseline di y → agar mirip top-left, geser turun
+             # kira-kira ukuran font * 0.8; koordinat PDF (0,0) di kiri-bawah
+             h_px - (f.y + f.size * 0.8),
+             bool(f.box_width and f.box_width > 0 and f.align in ("center", "right")))
+            for f in self.plan.fields
+        )
+
+    def _width(self, text: str, face: str, size: int) -> float:
+        key = (text, face, size)
+        w = self._widths.get(key)
+        if w is None:
+            if len(self._widths) >= self._MAX_WIDTHS:
+                self._widths.clear()
+            w = self._widths[key] = self._string_width(text, face, size)
+        return w
+
+    def draw_page(self, c, row: Dict[str, str], timer: Optional[StageTimer] = None):
+        """Background + semua field ke halaman aktif canvas c (showPage oleh pemanggil)."""
+        _pdf_draw_background(c, self.tpl)
+        if timer: timer.lap("draw")
+        for name, face, size, rgb, x, box_w, align, ty, measure in self._fields:
+            text = str(row.get(name, "") or "")
+            if not text:
+                continue
+            # lebar hanya perlu untuk center/right di dalam box
+            tx = _place_x(x, box_w, self._width(text, face, size), align) if measure else x
+            if timer: timer.lap("layout")
+            c.setFont(face, size)
+            c.setFillColorRGB(*rgb)
+            c.drawString(tx, ty, text)
+            if timer: timer.lap("draw")
+
+    def render(self, row: Dict[str, str], timer: Optional[StageTimer] = None) -> bytes:
+        """Satu baris → bytes PDF satu halaman."""
+        from reportlab.pdfgen import canvas as pdfcanvas
 
-        # ReportLab drawString menempatkan baseline di y → agar mirip top-left,
-        # geser turun sedikit: kira-kira ukuran font * 0.8 untuk memposisikan top.
-        # Namun tampilan top-left vs baseline beda antar font. Compromise:
-        ty = h_px - (y + size * 0.8)  # koordinat PDF (0,0) di kiri-bawah
+        # Buat canvas ukuran pixel-1:1 (ReportLab pakai point; asumsikan 72dpi ~ pixel)
+        c = pdfcanvas.Canvas(io.BytesIO(), pagesize=self.size)
+        self.draw_page(c, row, timer)
+        c.showPage()
+        data = c.getpdfdata()
+        if timer: timer.lap("encode")
+        return data
+
+
+def _save_as_pdf(
+    template_path: str,
+    fields: FieldsLike,
+    row: Dict[str, str],
+    out_path: str,
+    timer: Optional[StageTimer] = None,
+):
+    data = _pdf_bytes(template_path, fields, row, timer=timer)
+    _write_bytes(out_path, data)
+    if timer: timer.lap("write")
+
+def _pdf_bytes(
+    template_path: str,
+    fields: FieldsLike,
+    row: Dict[str, str],
+    timer: Optional[StageTimer] = None,
+) -> bytes:
+    # sesi (template, face, metrik) dari plan → per baris hanya gambar string
+    session = compile_plan(fields).pdf_session(template_path)
+    if timer: timer.lap("decode")
+    return session.render(row, timer)
+
+
+class CombinedPdf:
+    """
+    Satu file PDF, satu halaman per baris data. Background template hanya
+    disimpan sekali (Form XObject) dan direferensikan dari setiap halaman.
+
+        with CombinedPdf(template_path, fields, "semua.pdf") as doc:
+            for row in rows: doc.add_page(row)
+    """
+
+    def __init__(self, template_path: str, fields: FieldsLike, out_path: str):
+        from reportlab.pdfgen import canvas as pdfcanvas
+
+        self.plan = compile_plan(fields)
+        self.out_path = out_path
+        self.pages = 0
+        self._session = self.plan.pdf_session(template_path)
+        self._c = pdfcanvas.Canvas(out_path, pagesize=self._session.size)
+
+    def add_page(self, row: Dict[str, str], timer: Optional[StageTimer] = None):
+        # halaman tetap ditutup walau ada error, supaya nomor halaman = nomor baris
+        try:
+            self._session.draw_page(self._c, row, timer)
+        finally:
+            self._c.showPage()
+            self.pages += 1
+            if timer: timer.lap("draw")
 
-        c.drawString(tx, ty, text)
+    def close(self):
+        if self._c is not None:
+            self._c.save()
+            self._c = None
 
-    c.showPage()
-    c.save()
+    def __enter__(self) -> "CombinedPdf":
+        return self
 
+    def __exit__(self, *exc):
+        self.close()
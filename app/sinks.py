@@ -0,0 +1,153 @@
+"""
+Tujuan output batch (tanpa Qt): bytes hasil render → folder atau satu file ZIP.
+
+- DirSink: tulis tiap file ke folder (perilaku lama, dipakai pipeline); atomik lewat write_atomic
+- ZipSink: stream langsung ke ZIP lewat writer thread + antrian terbatas; kompresi
+  (zlib melepas GIL) berjalan paralel dengan render, tanpa file sementara per sertifikat
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+import zipfile
+from typing import Optional, Tuple
+
+# sudah terkompresi → disimpan apa adanya (deflate hanya buang CPU)
+_STORED_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def write_atomic(path: str, data: bytes):
+    """
+    Tulis ke <path>.part lalu os.replace → path hanya pernah berisi file utuh.
+    Run yang di-kill di tengah tulis tidak meninggalkan file terpotong yang lalu
+    di-skip run inkremental berikutnya (manifest hanya cek file ada).
+    """
+    tmp = path + ".part"
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+
+class DirSink:
+    """Simpan file ke folder; name relatif terhadap root (atau path absolut)."""
+
+    def __init__(self, root: str = ""):
+        self.root = root
+        self.busy = 0.0
+
+    def write(self, name: str, data: bytes):
+        t0 = time.perf_counter()
+        path = os.path.join(self.root, name) if self.root else name
+        write_atomic(path, data)
+        self.busy += time.perf_counter() - t0
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "DirSink":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ZipSink:
+    """
+    Satu file .zip sebagai output batch.
+    - write(name, data) cukup memasukkan ke antrian (blok bila antrian penuh → memori terbatas)
+    - file ditulis ke <path>.part lalu di-rename saat close(), jadi ZIP setengah jadi tidak tertinggal;
+      batch yang dibatalkan harus memanggil abort() (bukan close()) → .part dihapus
+    - error writer (mis. disk penuh) dilempar ulang di write()/close() berikutnya
+    """
+
+    def __init__(self, path: str, compresslevel: int = 6, queue_size: int = 64):
+        self.path = path
+        self.compresslevel = compresslevel
+        self.busy = 0.0   # detik kerja writer thread (kompresi + tulis)
+        self.count = 0
+        self._part = path + ".part"
+        self._zf = zipfile.ZipFile(self._part, "w", allowZip64=True)
+        self._q: "queue.Queue[Optional[Tuple[str, bytes]]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._err: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="zip-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, name: str, data: bytes):
+        if self._err is not None:
+            raise self._err
+        self._q.put((name.replace(os.sep, "/"), data))
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            if self._err is not None:
+                continue  # kosongkan antrian supaya write() tidak macet
+            name, data = item
+            t0 = time.perf_counter()
+            try:
+                info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                info.external_attr = 0o644 << 16
+                if name.lower().endswith(_STORED_EXTS):
+                    info.compress_type = zipfile.ZIP_STORED
+                    self._zf.writestr(info, data)
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    self._zf.writestr(info, data, compresslevel=self.compresslevel)
+                self.count += 1
+            except BaseException as e:
+                self._err = e
+            self.busy += time.perf_counter() - t0
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._q.put(None)
+        self._thread.join()
+        try:
+            self._zf.close()
+        except BaseException as e:
+            self._err = self._err or e
+        if self._err is not None:
+            self._remove_part()  # ZIP tidak lengkap → jangan tinggalkan .part
+            raise self._err
+        os.replace(self._part, self.path)
+
+    def abort(self):
+        """Hentikan writer & hapus .part (batch gagal / dibatalkan); <path> tidak dibuat."""
+        if self._closed:
+            return
+        self._closed = True
+        self._err = self._err or RuntimeError("dibatalkan")
+        self._q.put(None)
+        self._thread.join()
+        try:
+            self._zf.close()
+        except BaseException:
+            pass
+        self._remove_part()
+
+    def _remove_part(self):
+        try:
+            os.remove(self._part)
+        except OSError:
+            pass
+
+    def __enter__(self) -> "ZipSink":
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,306 @@
+"""
+Background kanvas untuk template besar: piramida tile (level of detail).
+
+- level 0 = resolusi asli, level k = 1/2^k; tile TILE px di koordinat level
+- paint() hanya menggambar tile yang terlihat, di level yang cukup untuk zoom saat ini
+- tile di-decode di thread loader per baris tile (band): JPEG lewat QImageReader clip +
+  scaled size (decode sebagian, tanpa memuat gambar penuh); format lain di-decode sekali lalu dipotong
+- level paling kasar juga dibuat di thread loader (item langsung tampil: kertas putih dulu);
+  selama tile belum siap, level kasar di-upscale sebagai placeholder
+- yang disimpan di source hanya level kasar + satu level penuh terakhir (format tanpa clip),
+  dan ikut dihitung ke budget pixmap; level penuh itu dibatasi _WORK_BUDGET (format tanpa clip
+  tidak punya level lebih detail dari min_level → tile di-upscale sedikit saat zoom sangat dekat)
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from PySide6.QtCore import QRect, QRectF, QSize, Qt, Signal
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader, QPainter, QPixmap
+from PySide6.QtWidgets import QGraphicsObject
+
+TILE = 512
+LARGE_TEMPLATE_SIDE = 4096      # di atas ini kanvas pakai tile, di bawahnya QGraphicsPixmapItem biasa
+_COARSE_SIDE = 1024             # level paling kasar: sisi terpanjang ≤ ini
+_PIXMAP_BUDGET = 256 * 1024 * 1024
+_WORK_BUDGET = _PIXMAP_BUDGET // 4   # level penuh yang disimpan (format tanpa clip), bagian dari budget
+_QUEUE_MAX = 256
+_MARGIN = 1                     # tile menyimpan 1px tetangga → tidak ada garis seam di zoom pecahan
+
+TileKey = Tuple[int, int, int]  # (level, tx, ty)
+
+
+def should_tile(w: int, h: int) -> bool:
+    return max(w, h) > LARGE_TEMPLATE_SIDE
+
+def _reader(path: str) -> QImageReader:
+    r = QImageReader(path)
+    r.setAllocationLimit(0)  # default Qt 256 MB → template 600 dpi A3 gagal di-decode
+    return r
+
+
+class _TileSource:
+    """Decode tile dari file (dipanggil dari thread loader)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        r = _reader(path)
+        self.width, self.height = r.size().width(), r.size().height()
+        self.partial = (r.supportsOption(QImageIOHandler.ImageOption.ClipRect)
+                        and r.supportsOption(QImageIOHandler.ImageOption.ScaledSize))
+        self.max_level = 0
+        while max(self.width, self.height) / (1 << self.max_level) > _COARSE_SIDE:
+            self.max_level += 1
+        # format tanpa clip: level paling detail yang boleh disimpan utuh (≤ _WORK_BUDGET)
+        self.min_level = 0
+        if not self.partial:
+            while self.min_level < self.max_level and self.level_bytes(self.min_level) > _WORK_BUDGET:
+                self.min_level += 1
+        self._coarse: Optional[QImage] = None
+        self._work: Optional[Tuple[int, QImage]] = None  # format tanpa clip: level penuh terakhir
+        self._lock = threading.RLock()
+
+    @property
+    def cached_bytes(self) -> int:
+        coarse, work = self._coarse, self._work
+        return (coarse.sizeInBytes() if coarse is not None else 0) + (work[1].sizeInBytes() if work else 0)
+
+    def level_size(self, level: int) -> Tuple[int, int]:
+        s = 1 << level
+        return max(1, -(-self.width // s)), max(1, -(-self.height // s))
+
+    def level_bytes(self, level: int) -> int:
+        lw, lh = self.level_size(level)
+        return lw * lh * 4
+
+    def tile_rect(self, key: TileKey) -> QRect:
+        level, tx, ty = key
+        lw, lh = self.level_size(level)
+        x, y = tx * TILE, ty * TILE
+        return QRect(x, y, min(TILE, lw - x), min(TILE, lh - y))
+
+    def read_level(self, level: int) -> QImage:
+        """Seluruh level sebagai satu QImage (dipakai untuk level kasar / format tanpa clip).
+        Hanya level kasar yang disimpan permanen; level lain menggantikan level penuh sebelumnya.
+        Format tanpa clip: level < min_level tidak diminta (lihat TiledImageItem._level_for); decode
+        penuh untuk menurunkan level hanya sementara, tidak disimpan."""
+        with self._lock:
+            if level == self.max_level and self._coarse is not None:
+                return self._coarse
+            work = self._work
+            if work is not None and work[0] == level:
+                return work[1]
+            lw, lh = self.level_size(level)
+            if work is not None and work[0] < level:
+                # turunkan dari level lebih detail yang masih ada → tanpa decode ulang
+                img = work[1].scaled(lw, lh, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            elif self.partial or level == 0:
+                r = _reader(self.path)
+                if level: r.setScaledSize(QSize(lw, lh))
+                img = r.read()
+            else:
+                img = _reader(self.path).read().scaled(lw, lh, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            if level == self.max_level:
+                self._coarse = img
+            elif not self.partial:
+                self._work = (level, img)
+            return img
+
+    def padded_rect(self, key: TileKey) -> QRect:
+        """Area tile + margin (dipotong di tepi gambar), koordinat level."""
+        lw, lh = self.level_size(key[0])
+        return self.tile_rect(key).adjusted(-_MARGIN, -_MARGIN, _MARGIN, _MARGIN).intersected(QRect(0, 0, lw, lh))
+
+    def read_band(self, level: int, ty: int) -> List[Tuple[TileKey, QImage]]:
+        """Semua tile di baris ty (plus margin). Decoder JPEG tetap membaca baris-baris di atas
+        clip, jadi satu decode selebar gambar jauh lebih murah daripada satu decode per tile."""
+        lw, lh = self.level_size(level)
+        band_rect = self.padded_rect((level, 0, ty))
+        y0, band_h = band_rect.y(), band_rect.height()
+        if level == self.max_level or not self.partial:
+            band = self.read_level(level).copy(0, y0, lw, band_h)
+        else:
+            s = 1 << level
+            r = _reader(self.path)
+            r.setClipRect(QRect(0, y0 * s, self.width, min(band_h * s, self.height - y0 * s)))
+            r.setScaledSize(QSize(lw, band_h))
+            band = r.read()
+        if band.isNull():
+            return []
+        tiles = []
+        for tx in range(-(-lw // TILE)):
+            pr = self.padded_rect((level, tx, ty))
+            tiles.append(((level, tx, ty), band.copy(pr.x(), 0, pr.width(), band_h)))
+        return tiles
+
+
+class _TileLoader:
+    """Satu thread background; request terbaru dikerjakan dulu (tile yang baru terlihat)."""
+
+    def __init__(self, source: _TileSource, on_loaded, on_coarse):
+        self.source = source
+        self._on_loaded = on_loaded
+        self._on_coarse = on_coarse
+        self._queue: "OrderedDict[TileKey, None]" = OrderedDict()
+        self._cv = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="tile-loader", daemon=True)
+        self._thread.start()
+
+    def request(self, key: TileKey) -> Optional[TileKey]:
+        """Antrikan tile; mengembalikan key yang dibuang dari antrian (terlalu lama) bila ada."""
+        dropped = None
+        with self._cv:
+            self._queue[key] = None
+            self._queue.move_to_end(key)
+            if len(self._queue) > _QUEUE_MAX:
+                dropped, _ = self._queue.popitem(last=False)
+            self._cv.notify()
+        return dropped
+
+    def stop(self, *_):
+        with self._cv:
+            self._stopped = True
+            self._queue.clear()
+            self._cv.notify()
+
+    def _run(self):
+        # level kasar dulu (format tanpa clip: decode penuh + downscale) → tidak di GUI thread
+        try:
+            coarse = self.source.read_level(self.source.max_level)
+        except Exception:
+            coarse = QImage()
+        try:
+            if not self._stopped: self._on_coarse(coarse)
+        except RuntimeError:  # item sudah dihapus dari scene
+            return
+        while True:
+            with self._cv:
+                while not self._queue and not self._stopped:
+                    self._cv.wait()
+                if self._stopped:
+                    return
+                level, _, ty = self._queue.popitem(last=True)[0]
+                # tile lain di band yang sama ikut selesai → keluarkan dari antrian
+                for k in [k for k in self._queue if k[0] == level and k[2] == ty]:
+                    del self._queue[k]
+            try:
+                tiles = self.source.read_band(level, ty)
+            except Exception:
+                tiles = []
+            for key, img in tiles:
+                if self._stopped:
+                    return
+                try:
+                    self._on_loaded(key, img)
+                except RuntimeError:  # item sudah dihapus dari scene
+                    return
+
+
+class TiledImageItem(QGraphicsObject):
+    """Pengganti QGraphicsPixmapItem untuk template besar (koordinat item = pixel asli)."""
+    _tileLoaded = Signal(int, int, int, QImage)  # level, tx, ty, tile
+    _coarseLoaded = Signal(QImage)
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self.setFlag(QGraphicsObject.ItemUsesExtendedStyleOption, True)
+        self._src = _TileSource(path)
+        self._coarse: Optional[QPixmap] = None  # diisi thread loader; sampai itu kertas putih di bawahnya terlihat
+        self._cache: "OrderedDict[TileKey, QPixmap]" = OrderedDict()
+        self._cache_bytes = 0
+        self._pending: set = set()
+        self._tileLoaded.connect(self._on_tile_loaded)  # queued: dipancarkan dari thread loader
+        self._coarseLoaded.connect(self._on_coarse_loaded)
+        self._loader = _TileLoader(self._src, lambda key, img: self._tileLoaded.emit(*key, img), self._coarseLoaded.emit)
+        self.destroyed.connect(self._loader.stop)
+
+    # ---------- geometri ----------
+    @property
+    def width(self) -> int:
+        return self._src.width
+
+    @property
+    def height(self) -> int:
+        return self._src.height
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(0, 0, self._src.width, self._src.height)
+
+    def stop(self):
+        self._loader.stop()
+
+    # ---------- cache ----------
+    def _cached(self, key: TileKey) -> Optional[QPixmap]:
+        pm = self._cache.get(key)
+        if pm is not None:
+            self._cache.move_to_end(key)
+        return pm
+
+    def _on_coarse_loaded(self, img: QImage):
+        if not img.isNull():
+            self._coarse = QPixmap.fromImage(img); self.update()
+
+    def _on_tile_loaded(self, level: int, tx: int, ty: int, img: QImage):
+        key = (level, tx, ty)
+        self._pending.discard(key)
+        if img.isNull():
+            return
+        pm = QPixmap.fromImage(img)
+        self._cache[key] = pm
+        self._cache_bytes += pm.width() * pm.height() * 4
+        # level penuh yang disimpan source (format tanpa clip) ikut memakai budget
+        while self._cache_bytes + self._src.cached_bytes > _PIXMAP_BUDGET and len(self._cache) > 1:
+            _, old = self._cache.popitem(last=False)
+            self._cache_bytes -= old.width() * old.height() * 4
+        self.update(self._item_rect(key))
+
+    def _item_rect(self, key: TileKey) -> QRectF:
+        s = 1 << key[0]
+        r = self._src.tile_rect(key)
+        return QRectF(r.x() * s, r.y() * s, r.width() * s, r.height() * s).intersected(self.boundingRect())
+
+    # ---------- paint ----------
+    def _level_for(self, lod: float) -> int:
+        # level dengan resolusi ≥ yang dibutuhkan layar (tidak pernah upscale kecuali placeholder)
+        # format tanpa clip: tidak lebih detail dari min_level (level penuh harus muat _WORK_BUDGET)
+        if lod <= 0:
+            return self._src.max_level
+        return max(self._src.min_level, min(self._src.max_level, int(math.floor(math.log2(1.0 / lod))) if lod < 1 else 0))
+
+    def visible_tiles(self, rect: QRectF, level: int) -> List[TileKey]:
+        s = TILE * (1 << level)
+        rect = rect.intersected(self.boundingRect())
+        if rect.isEmpty():
+            return []
+        x0, y0 = int(rect.left() // s), int(rect.top() // s)
+        x1, y1 = int(math.ceil(rect.right() / s)), int(math.ceil(rect.bottom() / s))
+        return [(level, tx, ty) for ty in range(y0, y1) for tx in range(x0, x1)]
+
+    def paint(self, painter: QPainter, option, widget=None):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        dev = painter.device()
+        lod *= dev.devicePixelRatioF() if hasattr(dev, "devicePixelRatioF") else 1.0
+        level = self._level_for(lod)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+        cs = float(1 << self._src.max_level)
+        for key in self.visible_tiles(option.exposedRect, level):
+            target = self._item_rect(key)
+            pm = self._cached(key) if level != self._src.max_level else None
+            if pm is not None:
+                # pixmap berisi margin tetangga → tile saling tumpang 1px, tepi pecahan tidak bolong
+                pr, s = self._src.padded_rect(key), 1 << level
+                painter.drawPixmap(QRectF(pr.x() * s, pr.y() * s, pr.width() * s, pr.height() * s), pm, QRectF(pm.rect()))
+                continue
+            # placeholder dari level kasar (bila sudah ada), lalu minta tile level ini ke loader
+            if self._coarse is not None:
+                painter.drawPixmap(target, self._coarse,
+                                   QRectF(target.x() / cs, target.y() / cs, target.width() / cs, target.height() / cs))
+            if level != self._src.max_level and key not in self._pending:
+                self._pending.add(key)
+                dropped = self._loader.request(key)
+                if dropped is not None:
+                    self._pending.discard(dropped)
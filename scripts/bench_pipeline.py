@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Ukur overlap render / encode / write mode --pipeline di disk lambat (simulasi, tanpa Qt).
+
+Tiap tulis file diberi jeda --write-ms (network share / disk lambat). Bila pipeline tetap
+penuh di batas chunk, waktu total ≈ total waktu tulis per worker (write-bound) dan
+"write util" mendekati 100%; bila pipeline dikuras tiap chunk, writer menganggur di tiap batas.
+
+Contoh:
+    python scripts/bench_pipeline.py                            # 96 baris, 40 ms / file, chunk 8
+    python scripts/bench_pipeline.py --workers 1 2 --write-ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rows", type=int, default=96)
+    p.add_argument("--write-ms", type=float, default=40.0, help="jeda per file yang ditulis")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    p.add_argument("--chunksize", type=int, default=8)
+    p.add_argument("--format", default="jpeg")
+    args = p.parse_args(argv)
+
+    from PIL import Image
+    import batch
+    import renderer
+    import sinks
+
+    delay = args.write_ms / 1000
+    dir_write, write_bytes = sinks.DirSink.write, renderer._write_bytes
+    # fork: worker mewarisi patch ini (spawn: jeda hanya di proses ini)
+    sinks.DirSink.write = lambda self, name, data: (time.sleep(delay), dir_write(self, name, data))[1]
+    renderer._write_bytes = lambda path, data: (time.sleep(delay), write_bytes(path, data))[1]
+
+    with tempfile.TemporaryDirectory(prefix="sertifikita-pipe-") as tmp:
+        tpl = os.path.join(tmp, "bg.png")
+        Image.new("RGB", (1600, 1100), "white").save(tpl)
+        fields = [{"name": f"F{i}", "x": 50, "y": 60 + 70 * i, "size": 40, "color": "#000000", "align": "left",
+                   "font_path": "", "box_width": 0} for i in range(6)]
+
+        def jobs(n):
+            return [({f"F{i}": f"Peserta {r} baris {i}" for i in range(6)}, os.path.join(tmp, f"{r}.out"))
+                    for r in range(n)]
+
+        print(f"{'workers':>7} {'pipeline':>8} {'elapsed':>8} {'write':>7} {'write util':>10}")
+        for workers in args.workers:
+            for pipe in (False, True):
+                kw = dict(fmt=args.format, workers=workers, chunksize=args.chunksize, pipeline=pipe)
+                batch.run_batch(tpl, fields, jobs(args.chunksize), **kw)  # warmup
+                t0 = time.perf_counter()
+                res = batch.run_batch(tpl, fields, jobs(args.rows), **kw)
+                elapsed = time.perf_counter() - t0
+                write = batch.timing_report(res)["stages"].get("write", {}).get("total_sec", 0.0)
+                util = write / (elapsed * workers) if elapsed > 0 else 0.0
+                print(f"{workers:>7} {str(pipe):>8} {elapsed:>7.2f}s {write:>6.2f}s {util:>9.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Benchmark hot path renderer (offline, tanpa Qt, tanpa file dari luar).
+
+Mengukur render_to_image, draw_certificate (png/jpeg/webp/pdf) dan _save_as_pdf
+(engine raster pil dan numpy)
+dengan template sintetis beberapa resolusi, jumlah field berbeda dan N baris data.
+Tiap skenario jalan di subprocess sendiri supaya peak memory (RSS) tidak tercampur.
+
+Contoh:
+    python scripts/bench_render.py                          # matriks default
+    python scripts/bench_render.py --quick                  # cepat (smoke)
+    python scripts/bench_render.py --json bench.json        # simpan hasil
+    python scripts/bench_render.py --baseline bench.json    # exit 1 bila rows/sec turun > toleransi
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "app")
+
+# render_to_image saja ("image"), profil encoder lewat draw_certificate, PDF lewat draw_certificate & _save_as_pdf;
+# akhiran "-numpy" = target yang sama dengan engine numpy
+TARGETS = ("image", "png", "png-fast", "jpeg", "webp", "pdf", "save_as_pdf", "image-numpy", "png-numpy", "jpeg-numpy")
+DEFAULT_RESOLUTIONS = ("1280x720", "2480x1754", "3508x2480")   # HD, A4 @300dpi, A3 @300dpi
+DEFAULT_FIELDS = (2, 8, 24)
+
+_WORDS = ("Sertifikat", "Workshop", "Nasional", "Penulisan", "Ilmiah", "Peserta", "Juara", "Panitia")
+
+
+# ===================== child: satu skenario =====================
+def _make_template(path: str, w: int, h: int):
+    from PIL import Image, ImageDraw, ImageFilter
+    # gradien + noise halus + bingkai: mirip foto/desain, bukan warna flat (yang terlalu mudah dikompres)
+    base = Image.linear_gradient("L").resize((w, h)).convert("RGB")
+    noise = Image.effect_noise((w, h), 24).convert("RGB").filter(ImageFilter.GaussianBlur(1))
+    img = Image.blend(base, noise, 0.35)
+    d = ImageDraw.Draw(img)
+    m = max(8, w // 40)
+    d.rectangle([m, m, w - m, h - m], outline=(120, 90, 30), width=max(2, m // 4))
+    img.save(path, quality=90) if path.lower().endswith((".jpg", ".jpeg")) else img.save(path)
+
+def _make_fields(n: int, w: int, h: int) -> List[Dict[str, Any]]:
+    aligns = ("left", "center", "right")
+    fields = []
+    for i in range(n):
+        size = max(12, int(h * (0.06 if i == 0 else 0.025)))
+        fields.append({
+            "name": f"F{i}", "x": w * 0.1, "y": h * 0.1 + (h * 0.8) * i / max(1, n),
+            "size": size, "color": "#1f2937" if i % 2 else "#7c2d12",
+            "align": aligns[i % 3], "box_width": int(w * 0.8) if i % 3 else 0,
+        })
+    return fields
+
+def _make_rows(n_rows: int, n_fields: int) -> List[Dict[str, str]]:
+    # field 0 unik per baris (nama), sisanya berulang (kursus, tanggal, ...) seperti data nyata
+    rows = []
+    for r in range(n_rows):
+        row = {"F0": f"Peserta Nomor {r:05d}"}
+        for i in range(1, n_fields):
+            row[f"F{i}"] = f"{_WORDS[i % len(_WORDS)]} {_WORDS[(i * 3) % len(_WORDS)]} 2026"
+        rows.append(row)
+    return rows
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil  # type: ignore
+            return psutil.Process().memory_info().peak_wset / 2**20
+        except Exception:
+            return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024  # macOS: byte, Linux: KiB
+
+def run_scenario(spec: Dict[str, Any]) -> Dict[str, Any]:
+    sys.path.insert(0, APP_DIR)
+    import renderer
+    from batch import percentile  # nearest-rank yang sama dengan timing report
+
+    w, h = (int(v) for v in spec["resolution"].split("x"))
+    target, n_fields, n_rows, warmup = spec["target"], spec["fields"], spec["rows"], spec["warmup"]
+    with tempfile.TemporaryDirectory(prefix="sertifikita-bench-") as tmp:
+        tpl = os.path.join(tmp, "template" + spec["template_ext"])
+        _make_template(tpl, w, h)
+        fields = _make_fields(n_fields, w, h)
+        rows = _make_rows(n_rows + warmup, n_fields)
+        plan = renderer.compile_plan(fields)
+        engine = "pil"
+        if target.endswith("-numpy"):
+            target, engine = target[:-len("-numpy")], "numpy"
+
+        if target == "image":
+            fn = lambda row, out: renderer.render_to_image(tpl, plan, row, engine=engine)
+            ext = ""
+        elif target == "save_as_pdf":
+            fn = lambda row, out: renderer._save_as_pdf(tpl, plan, row, out)
+            ext = ".pdf"
+        else:
+            fn = lambda row, out, fmt=target: renderer.draw_certificate(tpl, plan, row, out, fmt=fmt, engine=engine)
+            ext = renderer.output_extension(target)
+
+        lat: List[float] = []
+        t_all = 0.0
+        for i, row in enumerate(rows):
+            out = os.path.join(tmp, f"{i:05d}{ext}")
+            t0 = time.perf_counter()
+            fn(row, out)
+            dt = time.perf_counter() - t0
+            if i >= warmup:  # baris warmup menanggung decode template + parse font
+                lat.append(dt); t_all += dt
+        out_bytes = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)
+                        if f.endswith(ext) and ext and not f.startswith("template"))
+
+    lat.sort()
+    return {
+        **spec,
+        "rows_per_sec": n_rows / t_all if t_all > 0 else 0.0,
+        "p50_ms": percentile(lat, 50) * 1000,
+        "p95_ms": percentile(lat, 95) * 1000,
+        "p99_ms": percentile(lat, 99) * 1000,
+        "max_ms": lat[-1] * 1000 if lat else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "avg_out_kb": out_bytes / max(1, n_rows + warmup) / 1024 if ext else None,
+    }
+
+
+# ===================== parent: matriks skenario =====================
+def _key(r: Dict[str, Any]) -> str:
+    return f"{r['target']}|{r['resolution']}|{r['fields']}f"
+
+def _spawn(spec: Dict[str, Any]) -> Dict[str, Any]:
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--_child", json.dumps(spec)],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {**spec, "error": (proc.stderr.strip().splitlines() or ["gagal"])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def _print_table(results: List[Dict[str, Any]]):
+    hdr = f"{'target':<12} {'resolution':>10} {'fields':>6} {'rows/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'out KB':>8}"
+    print(hdr); print("-" * len(hdr))
+    for r in results:
+        if "error" in r:
+            print(f"{r['target']:<12} {r['resolution']:>10} {r['fields']:>6}  ERROR: {r['error']}")
+            continue
+        rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] is not None else "-"
+        kb = f"{r['avg_out_kb']:.0f}" if r["avg_out_kb"] is not None else "-"
+        print(f"{r['target']:<12} {r['resolution']:>10} {r['fields']:>6} {r['rows_per_sec']:>9.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {rss:>8} {kb:>8}")
+
+def _compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> int:
+    with open(baseline_path, "r", encoding="utf-8") as fp:
+        base = {_key(r): r for r in json.load(fp).get("results", []) if "error" not in r}
+    regressions = 0
+    print(f"\nBandingkan dengan {baseline_path} (toleransi {tolerance:.0%}):")
+    for r in results:
+        b = base.get(_key(r))
+        if b is None or "error" in r:
+            continue
+        ratio = r["rows_per_sec"] / b["rows_per_sec"] if b["rows_per_sec"] else 1.0
+        bad = ratio < 1 - tolerance
+        regressions += bad
+        print(f"  {'REGRESI' if bad else 'ok':<8} {_key(r):<32} {b['rows_per_sec']:>8.1f} → {r['rows_per_sec']:>8.1f} rows/s ({ratio - 1:+.0%})")
+    return 1 if regressions else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Benchmark renderer Sertifikita (offline).")
+    p.add_argument("--targets", default=",".join(TARGETS), help=f"subset dari: {', '.join(TARGETS)}")
+    p.add_argument("--resolutions", default=",".join(DEFAULT_RESOLUTIONS), help="mis. 1280x720,3508x2480")
+    p.add_argument("--fields", default=",".join(map(str, DEFAULT_FIELDS)), help="jumlah field, mis. 2,8,24")
+    p.add_argument("--rows", type=int, default=40, help="baris yang diukur per skenario")
+    p.add_argument("--warmup", type=int, default=2, help="baris awal yang tidak diukur")
+    p.add_argument("--template-ext", default=".jpg", choices=[".jpg", ".png"], help="format template sintetis")
+    p.add_argument("--quick", action="store_true", help="1 resolusi, 2 set field, 10 baris")
+    p.add_argument("--json", help="simpan hasil ke file JSON (bisa dipakai sebagai --baseline)")
+    p.add_argument("--baseline", help="JSON hasil run sebelumnya; exit 1 bila ada regresi rows/sec")
+    p.add_argument("--tolerance", type=float, default=0.15, help="penurunan rows/sec yang masih diterima")
+    p.add_argument("--_child", help=argparse.SUPPRESS)
+    return p
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args._child:
+        print(json.dumps(run_scenario(json.loads(args._child))))
+        return 0
+
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        print(f"target tidak dikenal: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    resolutions = [r.strip() for r in args.resolutions.split(",") if r.strip()]
+    field_sets = [int(n) for n in args.fields.split(",") if n.strip()]
+    rows = args.rows
+    if args.quick:
+        resolutions, field_sets, rows = resolutions[:1], field_sets[:2], min(rows, 10)
+
+    results = []
+    for res in resolutions:
+        for nf in field_sets:
+            for t in targets:
+                spec = {"target": t, "resolution": res, "fields": nf, "rows": rows,
+                        "warmup": args.warmup, "template_ext": args.template_ext}
+                results.append(_spawn(spec))
+                print(f"  {_key(spec)} selesai", file=sys.stderr)
+
+    print()
+    _print_table(results)
+    if args.json:
+        import platform
+        meta = {"python": sys.version.split()[0], "platform": platform.platform(), "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+        try:
+            import PIL, reportlab
+            meta.update(pillow=PIL.__version__, reportlab=reportlab.Version)
+        except Exception:
+            pass
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump({"meta": meta, "results": results}, fp, indent=2)
+        print(f"\nHasil disimpan ke {args.json}")
+    rc = 1 if any("error" in r for r in results) else 0
+    if args.baseline:
+        rc = max(rc, _compare(results, args.baseline, args.tolerance))
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Cek app hasil PyInstaller bisa membuka template yang plugin Pillow-nya di-import lazy.
+
+Sertifikita.spec hanya membawa plugin Pillow yang dipakai; plugin yang di-import saat file
+dibuka (TiffImagePlugin lewat Image.Exif.load, MpoImagePlugin) tidak terlihat di cold start.
+Script ini membuat sampel (PNG, JPEG, JPEG ber-EXIF tanpa density JFIF, MPO, WEBP) lalu
+menjalankan executable bundle dengan SERTIFIKITA_CHECK_IMAGES (lihat main._check_images):
+tiap file dibuka lewat renderer.prepare_template, tanpa window. Gagal (exit 1) bila ada
+file yang tidak bisa dibuka.
+
+Contoh:
+    python scripts/check_bundle.py dist-python/Sertifikita.app/Contents/MacOS/Sertifikita
+    python scripts/check_bundle.py                   # tanpa bundle: python app/main.py (sanity)
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_PY = os.path.join(ROOT, "app", "main.py")
+CHECK_IMAGES_ENV = "SERTIFIKITA_CHECK_IMAGES"
+
+
+def _samples(tmp: str) -> List[str]:
+    from PIL import Image
+
+    im = Image.new("RGB", (64, 48), (200, 120, 40))
+    exif = Image.Exif()
+    exif[0x010F] = "Sertifikita"  # Make; tanpa dpi → Pillow membaca EXIF saat open
+    paths = {name: os.path.join(tmp, name) for name in
+             ("plain.png", "plain.jpg", "exif.jpg", "camera.mpo", "plain.webp")}
+    im.save(paths["plain.png"])
+    im.save(paths["plain.jpg"], dpi=(300, 300))
+    im.save(paths["exif.jpg"], exif=exif.tobytes())
+    im.save(paths["camera.mpo"], format="MPO", save_all=True, append_images=[Image.new("RGB", (64, 48), "blue")])
+    im.save(paths["plain.webp"])
+    return list(paths.values())
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("exe", nargs="?", default="", help="executable bundle (default: python app/main.py)")
+    args = p.parse_args(argv)
+
+    cmd = [args.exe] if args.exe else [sys.executable, MAIN_PY]
+    with tempfile.TemporaryDirectory(prefix="sertifikita-bundle-") as tmp:
+        paths = _samples(tmp)
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        env[CHECK_IMAGES_ENV] = os.pathsep.join(paths)
+        out = subprocess.run(cmd, capture_output=True, text=True, env=env, timeout=120)
+    print(out.stdout.strip())
+    opened = sum(line.startswith("ok ") for line in out.stdout.splitlines())
+    if out.returncode != 0 or opened != len(paths):
+        print(f"FAIL: {opened}/{len(paths)} sampel terbuka (exit {out.returncode})\n{out.stderr[-2000:]}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Budget waktu cold start GUI: `python app/main.py` sampai window pertama tampil, tanpa display.
+
+Tiap run = subprocess baru (cache import Python tidak terbawa), Qt memakai platform
+offscreen. main.py dijalankan sebagai __main__ (freeze_support, QApplication, index font,
+theme, Main().show()); waktu diambil saat main() masuk ke event loop (app.exec), setelah
+event pertama diproses. Gagal (exit 1) bila:
+- median waktu start melewati --budget-ms
+- modul berat sudah ter-import saat start (PIL, ReportLab, numpy, batch, ...): harus
+  di-import saat preview / generate pertama, bukan saat window dibuka
+
+Contoh:
+    python scripts/check_startup.py                     # 5 run, budget default
+    python scripts/check_startup.py --budget-ms 900     # budget lebih ketat (mesin cepat)
+    python scripts/check_startup.py --json startup.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "app")
+
+# tidak boleh ada di sys.modules setelah window pertama tampil
+# (paket multiprocessing sendiri boleh: blok __main__ memanggil freeze_support)
+LAZY_MODULES = ("PIL", "reportlab", "numpy", "renderer", "batch", "pipeline", "manifest", "sinks",
+                "concurrent.futures.process", "multiprocessing.pool")
+
+_CHILD = r"""
+import json, os, runpy, sys, time
+t0 = time.perf_counter()
+app_dir, lazy = sys.argv[1], json.loads(sys.argv[2])
+sys.path.insert(0, app_dir)
+from PySide6.QtWidgets import QApplication
+
+def _exec(*_):
+    # main() memanggil app.exec() tepat setelah w.show() → window pertama sudah dibuat
+    QApplication.processEvents()
+    t1 = time.perf_counter()
+    print(json.dumps({"startup_ms": (t1 - t0) * 1000, "loaded": [m for m in lazy if m in sys.modules]}))
+    sys.stdout.flush()
+    os._exit(0)  # lewati teardown Qt (tidak diukur)
+
+QApplication.exec = _exec
+sys.argv = [os.path.join(app_dir, "main.py")]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def _run_once() -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    out = subprocess.run([sys.executable, "-c", _CHILD, APP_DIR, json.dumps(LAZY_MODULES)],
+                         capture_output=True, text=True, env=env, timeout=120)
+    if out.returncode != 0 or not out.stdout.strip():
+        raise RuntimeError(f"child gagal (exit {out.returncode}):\n{out.stderr[-2000:]}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv: List[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--budget-ms", type=float, default=1000.0, help="batas median start sampai window pertama (ms)")
+    p.add_argument("--json", default="", help="simpan hasil ke file JSON")
+    args = p.parse_args(argv)
+
+    runs = [_run_once() for _ in range(max(1, args.runs))]
+    summary = {
+        "runs": len(runs),
+        "total_ms": round(statistics.median(r["startup_ms"] for r in runs), 1),
+        "min_ms": round(min(r["startup_ms"] for r in runs), 1),
+        "budget_ms": args.budget_ms,
+        "loaded": sorted({m for r in runs for m in r["loaded"]}),
+    }
+    print(f"startup sampai window pertama: {summary['total_ms']:.0f} ms "
+          f"(median {len(runs)} run, min {summary['min_ms']:.0f} ms, budget {args.budget_ms:.0f} ms)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    ok = True
+    if summary["loaded"]:
+        print(f"FAIL: modul berat ter-import saat start: {', '.join(summary['loaded'])}", file=sys.stderr)
+        ok = False
+    if summary["total_ms"] > args.budget_ms:
+        print(f"FAIL: start {summary['total_ms']:.0f} ms > budget {args.budget_ms:.0f} ms", file=sys.stderr)
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# modul app di-import flat (sama seperti main.py / cli.py)
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
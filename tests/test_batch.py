@@ -0,0 +1,60 @@
+import batch
+
+
+FIELDS = [{"name": "Name", "x": 10, "y": 10, "size": 24, "color": "#000000", "align": "left",
+           "font_path": "", "box_width": 0}]
+
+
+def _jobs(tmp_path, n):
+    return [({"Name": f"Row {i}"}, str(tmp_path / f"{i}.png")) for i in range(n)]
+
+
+def test_bad_template_is_reported_per_row(tmp_path):
+    for workers in (1, 2):
+        res = batch.run_batch(str(tmp_path / "missing.png"), FIELDS, _jobs(tmp_path, 3), workers=workers, timing=False)
+        assert len(res.results) == 3
+        assert all(r.error for r in res.results)
+
+
+def test_percentile_nearest_rank():
+    ten = [float(i) for i in range(1, 11)]
+    assert batch.percentile(ten, 50) == 5.0
+    assert batch.percentile(ten, 95) == 10.0
+    assert batch.percentile(ten, 100) == 10.0
+    assert batch.percentile(ten, 0) == 1.0
+    assert batch.percentile([float(i) for i in range(1, 21)], 95) == 19.0
+    assert batch.percentile([float(i) for i in range(1, 101)], 95) == 95.0
+    assert batch.percentile([float(i) for i in range(1, 101)], 50) == 50.0
+    assert batch.percentile([7.0], 50) == 7.0
+    assert batch.percentile([], 95) == 0.0
+
+
+def _template(tmp_path):
+    from PIL import Image
+    path = tmp_path / "bg.png"
+    Image.new("RGB", (160, 80), "white").save(path)
+    return str(path)
+
+
+def test_pipeline_streams_all_rows_in_order(tmp_path):
+    tpl = _template(tmp_path)
+    for workers in (1, 2):
+        out = tmp_path / f"w{workers}"
+        out.mkdir()
+        jobs = [({"Name": f"Row {i}"}, str(out / f"{i}.png")) for i in range(37)]
+        seen = []
+        res = batch.run_batch(tpl, FIELDS, jobs, workers=workers, chunksize=4, pipeline=True,
+                              progress=lambda r: seen.append(r.index))
+        assert seen == list(range(1, 38))
+        assert res.done == 37 and len(list(out.glob("*.png"))) == 37
+
+
+def test_pipeline_cancel_stops_feeding(tmp_path):
+    tpl = _template(tmp_path)
+    jobs = [({"Name": f"Row {i}"}, str(tmp_path / f"{i}.png")) for i in range(200)]
+    done = []
+    # batal setelah hasil ke-3 (bukan setelah N cek: cek bisa habis sebelum hasil pertama datang)
+    res = batch.run_batch(tpl, FIELDS, jobs, workers=2, chunksize=4, pipeline=True,
+                          progress=done.append, cancel=lambda: len(done) >= 3)
+    assert res.cancelled and 3 <= len(res.results) < 200
+    assert [r.index for r in res.results] == list(range(1, len(res.results) + 1))
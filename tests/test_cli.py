@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from PIL import Image
+
+import cli
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    Image.new("RGB", (120, 60), "white").save(tmp_path / "bg.png")
+    (tmp_path / "fields.json").write_text(json.dumps([{"name": "Name", "x": 5, "y": 5, "size": 12, "color": "#000000",
+                                                       "align": "left", "font_path": "", "box_width": 0}]))
+    (tmp_path / "data.csv").write_text("Name\nA\nB\n")
+    return tmp_path
+
+
+def _argv(d, **over):
+    args = {"--template": d / "bg.png", "--fields": d / "fields.json", "--csv": d / "data.csv", "--out": d / "out"}
+    args.update(over)
+    return [str(x) for kv in args.items() for x in kv] + ["-q", "--workers", "1"]
+
+
+@pytest.mark.parametrize("opt", ["--template", "--fields", "--csv"])
+def test_missing_input_is_a_usage_error(inputs, capsys, opt):
+    with pytest.raises(SystemExit) as exc:
+        cli.main(_argv(inputs, **{opt: inputs / "typo"}))
+    assert exc.value.code == 2
+    err = capsys.readouterr().err
+    assert f"{opt}: file tidak ditemukan" in err and "Traceback" not in err
+
+
+def test_unreadable_template_and_fields(inputs, capsys):
+    (inputs / "bad.png").write_text("bukan gambar")
+    (inputs / "bad.json").write_text("{x")
+    for over in ({"--template": inputs / "bad.png"}, {"--fields": inputs / "bad.json"}):
+        with pytest.raises(SystemExit) as exc:
+            cli.main(_argv(inputs, **over))
+        assert exc.value.code == 2
+
+
+def test_valid_inputs_generate(inputs):
+    assert cli.main(_argv(inputs)) == 0
+    assert len(list((inputs / "out").glob("*.png"))) == 2
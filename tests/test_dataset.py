@@ -0,0 +1,192 @@
+import csv
+import pickle
+import random
+
+import pytest
+
+import dataset
+from dataset import ColumnarDataset, Dataset, SqliteDataset
+
+COLS = ["Name", "Kelas"]
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    # halaman kecil → insert / remove sering jatuh tepat di batas halaman
+    monkeypatch.setattr(dataset, "PAGE_SIZE", 8)
+
+
+@pytest.fixture(params=["columnar", "sqlite"])
+def make(request):
+    made = []
+
+    def _make(rows):
+        ds = ColumnarDataset(COLS) if request.param == "columnar" else SqliteDataset()
+        ds.ensure_columns(COLS)
+        ds.insert_rows(0, len(rows))
+        for i, row in enumerate(rows):
+            for c, v in row.items():
+                ds.set_value(i, c, v)
+        made.append(ds)
+        return ds
+
+    yield _make
+    for ds in made:
+        ds.close()
+
+
+def _rows(n, tag="r"):
+    return [{"Name": f"{tag}{i}", "Kelas": f"K{i % 3}"} for i in range(n)]
+
+
+def _check(ds, model):
+    cols = ds.columns
+    assert len(ds) == len(model)
+    assert [dict(r) for r in ds.iter_rows(page_size=5)] == [{c: r.get(c, "") for c in cols} for r in model]
+    assert ds.page(0, len(model) + 3) == [{c: r.get(c, "") for c in cols} for r in model]
+    for i in range(0, len(model), 3):
+        assert dict(ds[i]) == {c: model[i].get(c, "") for c in cols}
+
+
+def test_dataset_is_abstract():
+    with pytest.raises(TypeError):
+        Dataset()
+
+
+def test_insert_remove_at_page_boundaries_match_list(make):
+    model = _rows(40)
+    ds = make(model)
+    rnd = random.Random(7)
+    for step in range(60):
+        n = len(model)
+        at = min(n, max(0, rnd.choice([0, 7, 8, 9, 15, 16, 17, 24, n - 1, n]) + rnd.choice([-1, 0, 1])))
+        op = rnd.choice(["ins", "ins", "del", "set"])
+        if op == "ins":
+            k = rnd.choice([1, 2, 8, 9])
+            ds.insert_rows(at, k)
+            model[at:at] = [{} for _ in range(k)]
+            for j in range(k):
+                ds.set_value(at + j, "Name", f"s{step}.{j}")
+                model[at + j] = {"Name": f"s{step}.{j}"}
+        elif op == "del" and n:
+            k = rnd.choice([1, 3, 8])
+            ds.remove_rows(at, k)
+            del model[at:at + k]
+        elif n:
+            i = min(at, n - 1)
+            ds.set_value(i, "Kelas", f"e{step}")
+            model[i] = {**model[i], "Kelas": f"e{step}"}
+        _check(ds, model)
+
+
+def test_respace_when_gap_runs_out(monkeypatch):
+    ds = SqliteDataset()
+    ds.ensure_columns(COLS)
+    ds.insert_rows(0, 20)
+    model = [{} for _ in range(20)]
+    calls = []
+    real = ds._respace
+    monkeypatch.setattr(ds, "_respace", lambda at, count: (calls.append(at), real(at, count)))
+    # sisip berulang di titik yang sama: celah ord terbelah dua tiap kali → habis setelah ±20x
+    for k in range(60):
+        ds.insert_rows(10, 1)
+        ds.set_value(10, "Name", f"x{k}")
+        model.insert(10, {"Name": f"x{k}"})
+    assert calls
+    _check(ds, model)
+    ds.close()
+
+
+def test_rollback_restores_cells_rows_and_columns(make):
+    model = _rows(30)
+    ds = make(model)
+    ds.begin_edit()
+    ds.set_value(3, "Name", "changed")
+    ds.insert_rows(8, 5)
+    ds.remove_rows(16, 9)
+    ds.ensure_columns(["Extra"])
+    ds.set_value(0, "Extra", "x")
+    ds.rename_column("Kelas", "Class")
+    ds.rollback_edit()
+    assert ds.columns == COLS
+    _check(ds, model)
+
+    ds.begin_edit()
+    ds.set_value(3, "Name", "kept")
+    ds.remove_rows(0, 1)
+    ds.commit_edit()
+    model[3]["Name"] = "kept"
+    del model[0]
+    _check(ds, model)
+
+
+def test_export_during_edit_session_sees_uncommitted(make, tmp_path):
+    ds = make(_rows(20))
+    ds.begin_edit()
+    ds.set_value(2, "Name", "edited")
+    ds.ensure_columns(["Nilai"])
+    ds.set_value(5, "Nilai", "A")
+    ds.insert_rows(0, 1)
+    ds.set_value(0, "Name", "baru")
+
+    out = tmp_path / "export.csv"
+    ds.write_csv(str(out))
+    with open(out, encoding="utf-8", newline="") as f:
+        got = list(csv.DictReader(f))
+    assert len(got) == 21
+    assert got[0]["Name"] == "baru" and got[3]["Name"] == "edited" and got[6]["Nilai"] == "A"
+    assert [r["Nilai"] for r in ds.iter_rows(["Nilai"])].count("A") == 1
+    ds.rollback_edit()
+    assert len(ds) == 20 and ds.columns == COLS
+
+
+def test_columnar_rollback_restores_cells_and_rows():
+    ds = ColumnarDataset(COLS)
+    ds.insert_rows(0, 4)
+    for i in range(4):
+        ds.set_value(i, "Name", f"n{i}")
+    # kolom "Kelas" belum pernah diisi (codes None) → diisi di sesi edit lalu di-rollback
+    ds.begin_edit()
+    ds.set_value(1, "Name", "ubah")
+    ds.set_value(2, "Kelas", "X")
+    ds.insert_rows(1, 2)
+    ds.set_value(1, "Name", "sisip")
+    ds.remove_rows(4, 2)
+    ds.drop_column("Name")
+    ds.rollback_edit()
+    assert ds.columns == COLS
+    assert [dict(r) for r in ds] == [{"Name": f"n{i}", "Kelas": ""} for i in range(4)]
+
+    ds.begin_edit()
+    ds.set_value(0, "Name", "baru")  # nilai baru di tabel nilai bersama → tidak bocor saat rollback
+    ds.rollback_edit()
+    assert ds.value(0, "Name") == "n0"
+
+
+def test_row_view_mapping_semantics():
+    ds = ColumnarDataset(COLS)
+    ds.insert_rows(0, 2)
+    ds.set_value(0, "Name", "Ayu")
+    row = ds[0]
+    assert isinstance(row, dataset.RowView)
+    assert list(row) == COLS and len(row) == 2
+    assert row["Name"] == "Ayu" and row["Kelas"] == ""
+    assert row.get("Missing", "-") == "-" and "Name" in row and "Missing" not in row
+    with pytest.raises(KeyError):
+        row["Missing"]
+    assert row == {"Name": "Ayu", "Kelas": ""}
+    assert dict(row.items()) == {"Name": "Ayu", "Kelas": ""}
+
+    # view membaca nilai saat diakses; dict(row) salinan tetap
+    snap = dict(row)
+    ds.set_value(0, "Name", "Budi")
+    assert row["Name"] == "Budi" and snap["Name"] == "Ayu"
+
+    # subset kolom lewat iter_rows(columns); pickle → dict biasa (dikirim ke worker)
+    sub = next(ds.iter_rows(["Kelas"]))
+    assert list(sub) == ["Kelas"]
+    assert pickle.loads(pickle.dumps(ds[1])) == {"Name": "", "Kelas": ""}
+    assert type(pickle.loads(pickle.dumps(ds[1]))) is dict
+    with pytest.raises(IndexError):
+        ds[2]
+    assert dict(ds[-1]) == {"Name": "", "Kelas": ""}
@@ -0,0 +1,48 @@
+import threading
+import time
+
+import fontindex
+
+
+def test_resolve_does_not_block_and_on_ready_fires(tmp_path, monkeypatch):
+    (tmp_path / "Lato-Regular.ttf").write_bytes(b"")
+    gate = threading.Event()
+    real_scan = fontindex._scan
+
+    def slow_scan(dirs):
+        gate.wait(5)  # index dingin: scan folder font lama
+        return real_scan(dirs)
+
+    monkeypatch.setattr(fontindex, "_scan", slow_scan)
+    idx = fontindex.FontIndex(cache_path=str(tmp_path / "cache" / "index.json"), dirs=[str(tmp_path)])
+    fired = threading.Event()
+    idx.on_ready(fired.set)
+
+    t0 = time.perf_counter()
+    assert idx.resolve("Lato", timeout=0) == ""
+    assert time.perf_counter() - t0 < 0.5 and not idx.ready
+
+    gate.set()
+    assert fired.wait(5)
+    assert idx.resolve("Lato", timeout=0).endswith("Lato-Regular.ttf")
+
+    late = []
+    idx.on_ready(lambda: late.append(1))  # sudah siap → langsung dipanggil
+    assert late == [1]
+
+
+def test_fill_missing_waits_for_index(tmp_path, monkeypatch):
+    (tmp_path / "Lato-Regular.ttf").write_bytes(b"")
+    gate = threading.Event()
+    real_scan = fontindex._scan
+    monkeypatch.setattr(fontindex, "_scan", lambda dirs: (gate.wait(5), real_scan(dirs))[1])
+    idx = fontindex.FontIndex(cache_path=str(tmp_path / "cache" / "index.json"), dirs=[str(tmp_path)])
+    fields = [{"name": "A", "font_family": "Lato", "font_path": ""},
+              {"name": "B", "font_family": "Lato", "font_path": "/x/Keep.ttf"},
+              {"name": "C", "font_family": "", "font_path": ""}]
+    assert idx.resolve("Lato", timeout=0) == ""  # GUI: index belum siap
+
+    threading.Timer(0.1, gate.set).start()
+    idx.fill_missing(fields, timeout=5)  # worker: blok sampai index siap
+    assert fields[0]["font_path"].endswith("Lato-Regular.ttf")
+    assert fields[1]["font_path"] == "/x/Keep.ttf" and fields[2]["font_path"] == ""
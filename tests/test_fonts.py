@@ -0,0 +1,35 @@
+import os
+import shutil
+
+import pytest
+from PIL import ImageFont
+
+import renderer
+
+
+@pytest.fixture
+def custom_font(tmp_path):
+    try:
+        src = ImageFont.truetype(renderer._FALLBACK_FONT, size=10).path
+    except OSError:
+        pytest.skip("DejaVuSans tidak tersedia")
+    dst = tmp_path / "Custom.ttf"
+    shutil.copyfile(src, dst)
+    return str(dst)
+
+
+def _field(font_path):
+    return {"name": "Name", "x": 10, "y": 10, "size": 32, "color": "#000000",
+            "align": "left", "font_path": font_path, "box_width": 0}
+
+
+def test_configured_font_is_used(custom_font):
+    plan = renderer.compile_plan([_field(custom_font)])
+    assert plan.fields[0].font_key == os.path.realpath(custom_font)
+    assert plan.fonts()[0].path == os.path.realpath(custom_font)
+
+
+def test_missing_font_falls_back(tmp_path):
+    plan = renderer.compile_plan([_field(str(tmp_path / "missing.ttf"))])
+    assert plan.fields[0].font_key == renderer._FALLBACK_FONT
+
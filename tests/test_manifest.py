@@ -0,0 +1,10 @@
+import pytest
+
+import manifest
+import renderer
+
+
+def test_config_hash_missing_template_is_a_clear_error(tmp_path):
+    plan = renderer.compile_plan([])
+    with pytest.raises(ValueError, match="Template tidak bisa dibaca: .*missing.png"):
+        manifest.config_hash(str(tmp_path / "missing.png"), plan, "png", None)
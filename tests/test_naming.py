@@ -0,0 +1,55 @@
+import hashlib
+
+import pytest
+
+from naming import CompiledPattern, OutputPlanner, render_filename
+
+ROWS = [
+    {"Name": "Ayu Wg", "Kelas": "X-1", "1": "satu", "Kota": " Bandung/Jabar "},
+    {"Name": "", "Kelas": "", "2": "dua"},
+    {"Name": "Budi_#3", "Kelas": "XII IPA"},
+]
+
+
+@pytest.mark.parametrize("pattern", [
+    "", "{index}", "{index:03}_{Name}", "{Name}-{Kelas}", "cert {Kota} {Missing}",
+    "{{index}}", "x{{index}}y_{Name}", "{index:02}{index}", "plain",
+])
+def test_compiled_pattern_matches_render_filename(pattern):
+    cp = CompiledPattern(pattern, "Name")
+    for idx, row in enumerate(ROWS, start=1):
+        assert cp.render(row, idx) == render_filename(pattern, row, idx, "Name")
+
+
+def test_nested_placeholder_uses_slow_path():
+    cp = CompiledPattern("{{index}}", "Name")
+    assert cp._slow
+    assert cp.render(ROWS[0], 1) == "satu"  # {index} → 1 → {1} → nilai kolom "1"
+
+
+def test_duplicate_names_get_case_insensitive_suffix():
+    planner = OutputPlanner("{Name}", "Name", ".png")
+    paths = planner.plan([{"Name": "Ayu"}, {"Name": "ayu"}, {"Name": "AYU"}, {"Name": "Budi"}])
+    assert paths == ["Ayu.png", "ayu-2.png", "AYU-3.png", "Budi.png"]
+    assert planner.renamed == 2
+
+
+@pytest.mark.parametrize("shard,digits", [("hash", 2), ("hash:3", 3)])
+def test_hash_shard(shard, digits):
+    paths = OutputPlanner("{Name}", "Name", ".png", shard=shard).plan([{"Name": "Ayu"}])
+    assert paths == [f"{hashlib.md5(b'Ayu').hexdigest()[:digits]}/Ayu.png"]
+
+
+def test_field_shard_and_make_dirs(tmp_path):
+    rows = [{"Name": "Ayu", "Kelas": "X 1"}, {"Name": "Budi", "Kelas": "X 1"}, {"Name": "Citra", "Kelas": ""}]
+    paths = OutputPlanner("{Name}", "Name", ".pdf", shard="field:Kelas").plan(rows)
+    assert paths == ["X_1/Ayu.pdf", "X_1/Budi.pdf", "_/Citra.pdf"]
+    OutputPlanner.make_dirs(str(tmp_path), paths)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["X_1", "_"]
+
+
+def test_unknown_shard_rejected():
+    with pytest.raises(ValueError):
+        OutputPlanner("{Name}", "Name", ".png", shard="field")
+    with pytest.raises(ValueError):
+        OutputPlanner("{Name}", "Name", ".png", shard="bogus")
@@ -0,0 +1,65 @@
+import os
+import shutil
+
+import pytest
+from PIL import Image, ImageChops, ImageFont
+
+import renderer
+
+
+def _field(font_path=""):
+    return {"name": "Name", "x": 10, "y": 10, "size": 24, "color": "#000000",
+            "align": "left", "font_path": font_path, "box_width": 0}
+
+
+@pytest.fixture
+def ttf_src():
+    try:
+        return ImageFont.truetype(renderer._FALLBACK_FONT, size=10).path
+    except OSError:
+        pytest.skip("DejaVuSans tidak tersedia")
+
+
+def test_same_stem_fonts_get_distinct_faces(tmp_path, ttf_src):
+    paths = []
+    for family in ("FamA", "FamB"):
+        os.makedirs(tmp_path / family)
+        dst = tmp_path / family / "Regular.ttf"
+        shutil.copyfile(ttf_src, dst)
+        paths.append(str(dst))
+    a, b = (renderer._pdf_face(p) for p in paths)
+    assert a != b
+    assert a.startswith("Regular-") and b.startswith("Regular-")
+    assert renderer._pdf_face(paths[0]) == a  # cache per path
+
+
+def test_jpeg_background_is_embedded_as_dct(tmp_path):
+    tpl = tmp_path / "bg.jpg"
+    Image.new("RGB", (120, 80), (200, 120, 40)).save(tpl, quality=85)
+    jpeg = tpl.read_bytes()
+    data = renderer._pdf_bytes(str(tpl), [_field()], {"Name": "Ayu"})
+    assert b"/DCTDecode" in data
+    assert jpeg in data  # byte JPEG asli, tanpa decode/encode ulang
+
+
+def test_combined_pdf_shares_one_background_image(tmp_path):
+    tpl = tmp_path / "bg.png"
+    bg = Image.new("RGB", (120, 80), (250, 245, 230))
+    for x in range(0, 120, 7):
+        bg.paste((x * 2, 90, 200 - x), (x, 0, x + 3, 80))
+    bg.save(tpl)
+    out = tmp_path / "all.pdf"
+    with renderer.CombinedPdf(str(tpl), [_field()], str(out)) as doc:
+        for name in ("", "", "Ayu"):
+            doc.add_page({"Name": name})
+    data = out.read_bytes()
+    assert data.count(b"/Subtype /Image") == 1
+
+    fitz = pytest.importorskip("pymupdf")
+    pdf = fitz.open(str(out))
+    assert pdf.page_count == 3
+    pages = [pdf[i].get_pixmap(alpha=False) for i in range(2)]
+    assert pages[0].samples == pages[1].samples  # background tiap halaman sama
+    got = Image.frombytes("RGB", (pages[0].width, pages[0].height), pages[0].samples)
+    assert got.size == bg.size
+    assert max(hi for _, hi in ImageChops.difference(got, bg).getextrema()) == 0  # Flate lossless, 1 px = 1 pt
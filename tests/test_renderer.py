@@ -0,0 +1,45 @@
+import pytest
+from PIL import Image, ImageDraw
+
+import renderer
+
+
+def _reference(tpl_path, field, text):
+    # cara lama (tanpa tile cache): draw.text langsung di kanvas
+    canvas = Image.open(tpl_path).convert("RGBA")
+    font = renderer._load_font(field["font_path"], field["size"])
+    tw, _ = renderer._text_size(font, text)
+    tx = renderer._place_x(field["x"], field["box_width"], tw, field["align"])
+    ImageDraw.Draw(canvas).text((tx, field["y"]), text, font=font, fill=renderer._hex_to_rgb(field["color"]))
+    return canvas.convert("RGB")
+
+
+@pytest.mark.parametrize("x,y,align", [
+    (-7.25, -3.5, "left"), (12.0, -0.75, "left"), (-0.5, 8.3, "left"),
+    (-40.0, -2.25, "center"), (-13.6, -11.9, "right"), (20.5, 4.75, "center"),
+])
+def test_tiles_match_direct_draw_for_negative_coords(tmp_path, x, y, align):
+    tpl = tmp_path / "bg.png"
+    Image.new("RGB", (160, 60), (250, 245, 230)).save(tpl)
+    field = {"name": "Name", "x": x, "y": y, "size": 28, "color": "#203040", "align": align,
+             "font_path": "", "box_width": 60}
+    got = renderer.render_to_image(str(tpl), [field], {"Name": "Ayu Wg"})
+    assert got.tobytes() == _reference(str(tpl), field, "Ayu Wg").tobytes()
+
+
+@pytest.mark.parametrize("bg", [(250, 245, 230, 255), (250, 245, 230, 0), (30, 60, 90, 128)])
+def test_numpy_engine_matches_pil(tmp_path, bg):
+    pytest.importorskip("numpy")
+    tpl = tmp_path / "bg.png"
+    Image.new("RGBA", (200, 90), bg).save(tpl)
+    fields = [
+        {"name": "Name", "x": -6.5, "y": 10.25, "size": 30, "color": "#203040", "align": "left",
+         "font_path": "", "box_width": 0},
+        {"name": "Role", "x": 20.0, "y": 50.5, "size": 18, "color": "#C03010", "align": "center",
+         "font_path": "", "box_width": 160},
+    ]
+    row = {"Name": "Ayu Wg", "Role": "Peserta"}
+    got = renderer.render_to_image(str(tpl), fields, row, engine="numpy")
+    ref = renderer.render_to_image(str(tpl), fields, row, engine="pil")
+    assert got.mode == ref.mode == "RGB"
+    assert got.tobytes() == ref.tobytes()
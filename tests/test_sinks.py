@@ -0,0 +1,52 @@
+import zipfile
+
+import pytest
+
+from sinks import ZipSink
+
+
+def test_close_renames_part(tmp_path):
+    out = tmp_path / "out.zip"
+    with ZipSink(str(out)) as sink:
+        sink.write("a.png", b"png")
+    assert out.exists() and not (tmp_path / "out.zip.part").exists()
+    assert zipfile.ZipFile(out).namelist() == ["a.png"]
+
+
+def test_abort_leaves_nothing(tmp_path):
+    out = tmp_path / "out.zip"
+    sink = ZipSink(str(out))
+    sink.write("a.png", b"png")
+    sink.abort()
+    sink.close()  # sesudah abort: no-op, tidak me-rename
+    assert not out.exists() and not (tmp_path / "out.zip.part").exists()
+
+
+def test_writer_error_removes_part(tmp_path):
+    out = tmp_path / "out.zip"
+    sink = ZipSink(str(out))
+    sink.write("bad.png", 123)  # writer thread gagal (bukan bytes)
+    with pytest.raises(TypeError):
+        sink.close()
+    assert not out.exists() and not (tmp_path / "out.zip.part").exists()
+
+
+def test_dir_sink_write_is_atomic(tmp_path, monkeypatch):
+    import os
+    from sinks import DirSink
+
+    out = tmp_path / "a.png"
+    out.write_bytes(b"old-complete")
+
+    def killed(src, dst):
+        raise KeyboardInterrupt  # proses mati sebelum rename
+
+    monkeypatch.setattr(os, "replace", killed)
+    with pytest.raises(KeyboardInterrupt):
+        DirSink(str(tmp_path)).write("a.png", b"new")
+    assert out.read_bytes() == b"old-complete"  # tidak pernah terpotong
+    assert not (tmp_path / "a.png.part").exists()
+
+    monkeypatch.undo()
+    DirSink(str(tmp_path)).write("a.png", b"new")
+    assert out.read_bytes() == b"new"
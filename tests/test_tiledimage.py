@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("PySide6.QtGui")
+from PIL import Image
+
+import tiledimage
+
+
+def test_full_level_kept_by_source_is_capped(tmp_path, monkeypatch):
+    path = tmp_path / "big.png"  # PNG: tanpa clip/scaled decode
+    Image.new("RGB", (4200, 3000), (240, 230, 210)).save(path)
+    monkeypatch.setattr(tiledimage, "_WORK_BUDGET", 8 * 1024 * 1024)
+    src = tiledimage._TileSource(str(path))
+    assert not src.partial
+    assert src.min_level > 0 and src.level_bytes(src.min_level) <= tiledimage._WORK_BUDGET
+
+    tiles = src.read_band(src.min_level, 0)
+    assert tiles and not tiles[0][1].isNull()
+    coarse = src.level_bytes(src.max_level)
+    assert src.cached_bytes - coarse <= tiledimage._WORK_BUDGET  # level 0 tidak ikut tersimpan